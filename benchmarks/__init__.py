@@ -0,0 +1 @@
+"""Benchmarks of configalchemy hot paths, run by ``python -m benchmarks``."""
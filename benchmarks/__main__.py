@@ -0,0 +1,6 @@
+import sys
+
+from benchmarks import bench_apollo, bench_config, bench_lazy  # noqa: F401
+from benchmarks.runner import main
+
+sys.exit(main())
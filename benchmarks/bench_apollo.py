@@ -0,0 +1,57 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from benchmarks.runner import benchmark
+
+try:
+    from configalchemy.contrib.apollo import ApolloBaseConfig
+except ImportError:  # pragma: no cover
+    ApolloBaseConfig = None  # type: ignore
+
+CONFIGURATIONS = {f"KEY_{i}": str(i) for i in range(100)}
+
+
+class StubApolloHandler(BaseHTTPRequestHandler):
+    """Always notify a change of application namespace."""
+
+    notification_id = 0
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/notifications/v2"):
+            StubApolloHandler.notification_id += 1
+            body = [
+                {
+                    "namespaceName": "application",
+                    "notificationId": StubApolloHandler.notification_id,
+                }
+            ]
+        else:
+            body = {"namespaceName": "application", "configurations": CONFIGURATIONS}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+if ApolloBaseConfig is not None:
+
+    @benchmark("apollo.refresh")
+    def apollo_refresh():
+        server = HTTPServer(("127.0.0.1", 0), StubApolloHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        class BenchConfig(ApolloBaseConfig):
+            APOLLO_SERVER_URL = f"http://127.0.0.1:{server.server_port}"
+            APOLLO_APP_ID = "bench"
+
+        config = BenchConfig()
+        yield config.long_poll_from_apollo
+        server.shutdown()
+        server.server_close()
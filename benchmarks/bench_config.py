@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+from typing import Optional
+
+from benchmarks.runner import benchmark
+from configalchemy import BaseConfig, computed
+from configalchemy.field import Field
+from configalchemy.meta import ConfigMeta
+from configalchemy.types import FrozenJson, Json
+
+FIELDS = 100
+ENV_SIZE = 10000
+FILE_SIZE = 10000
+HISTORY = 1000
+
+
+def make_config_class(fields: int = FIELDS, **attrs) -> type:
+    namespace = {f"KEY_{i}": i for i in range(fields)}
+    namespace.update(attrs)
+    return type("BenchConfig", (BaseConfig,), namespace)
+
+
+@benchmark(f"config.init.{FIELDS}_fields")
+def config_init():
+    config_class = make_config_class()
+    yield config_class
+
+
+@benchmark(f"config.from_env.{ENV_SIZE}_env")
+def config_from_env():
+    environ = {f"BENCH_ENV_KEY_{i}": str(i) for i in range(ENV_SIZE)}
+    os.environ.update(environ)
+    config_class = make_config_class(CONFIGALCHEMY_ENV_PREFIX="BENCH_ENV_")
+    yield config_class
+    for key in environ:
+        del os.environ[key]
+
+
+@benchmark(f"config.from_file.{FILE_SIZE}_keys")
+def config_from_file():
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({f"KEY_{i}": str(i) for i in range(FILE_SIZE)}, f)
+    config_class = make_config_class(CONFIGALCHEMY_CONFIG_FILE=f.name)
+    yield config_class
+    os.remove(f.name)
+
+
+@benchmark("config.read.attribute")
+def config_read_attribute():
+    config = make_config_class()()
+    yield lambda: config.KEY_0
+
+
+@benchmark("config.read.getitem")
+def config_read_getitem():
+    config = make_config_class()()
+    yield lambda: config["KEY_0"]
+
+
+@benchmark("config.read.computed")
+def config_read_computed():
+    def url(self):
+        return f"postgres://{self.KEY_0}:{self.KEY_1}"
+
+    config = make_config_class(URL=computed(url))()
+    yield lambda: config.URL
+
+
+@benchmark(f"meta.set.{HISTORY}_history")
+def meta_set():
+    field = Field(name="TEST", default_value=0, annotation=None)
+    meta = ConfigMeta(default_value=0, field=field)
+    for priority in range(2, HISTORY * 2, 2):
+        meta.set(priority, priority)
+
+    def set_and_remove():
+        meta.set(HISTORY - 1, 1)
+        meta.remove(HISTORY - 1)
+
+    yield set_and_remove
+
+
+@benchmark(f"meta.pop.{HISTORY}_same_priority")
+def meta_pop():
+    field = Field(name="TEST", default_value=0, annotation=None)
+    meta = ConfigMeta(default_value=0, field=field)
+    for value in range(HISTORY):
+        meta.set(10, value)
+        meta.set(20, value)
+
+    def set_and_pop():
+        meta.set(10, 1)
+        meta.pop(10)
+
+    yield set_and_pop
+
+
+def validate(name: str, default_value, annotation, value):
+    @benchmark(f"field.validate.{name}")
+    def field_validate():
+        field = Field(name="TEST", default_value=default_value, annotation=annotation)
+        yield lambda: field.validate(value)
+
+
+def json_write(name: str, annotation, read: bool):
+    @benchmark(f"config.json.{name}")
+    def config_json_write():
+        config = make_config_class(ROUTES={}, __annotations__={"ROUTES": annotation})()
+        routes = json.dumps({f"/path/{i}": [f"host-{i}"] for i in range(100)})
+
+        def write():
+            config.ROUTES = routes
+            if read:
+                config.ROUTES
+            del config["ROUTES"]
+
+        yield write
+
+
+json_write("write_unread", Json[dict], False)
+json_write("write_read", Json[dict], True)
+json_write("frozen_write_read", FrozenJson[dict], True)
+
+validate("str", "", None, "value")
+validate("int_from_str", 0, None, "1")
+validate("bool_from_str", False, None, "true")
+validate("optional_int_from_str", None, Optional[int], "1")
+validate("json_list_from_str", [], Json[list], json.dumps(list(range(100))))
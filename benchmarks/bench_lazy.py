@@ -0,0 +1,96 @@
+from benchmarks.runner import benchmark
+from configalchemy.lazy import Pool, lazy, local, proxy, scoped
+
+
+def value() -> int:
+    return 1
+
+
+@benchmark("lazy.baseline_add")
+def baseline_add():
+    number = value()
+    yield lambda: number + 1
+
+
+@benchmark("lazy.lazy_add")
+def lazy_add():
+    number = lazy(value)
+    yield lambda: number + 1
+
+
+@benchmark("lazy.local_add")
+def local_add():
+    number = local(value)
+    yield lambda: number + 1
+
+
+@benchmark("lazy.proxy_add")
+def proxy_add():
+    number = proxy(value)
+    yield lambda: number + 1
+
+
+@benchmark("lazy.pool_enter_exit")
+def pool_enter_exit():
+    pool = Pool(value)
+
+    def enter_exit():
+        with pool:
+            pass
+
+    yield enter_exit
+
+
+def _local_tasks(scope: str, tasks: int = 100):
+    import asyncio
+
+    calls = 0
+
+    def client() -> dict:
+        # an expensive client, eg. connection pool
+        nonlocal calls
+        calls += 1
+        return dict.fromkeys(range(1000))
+
+    current = scoped(scope)(client)
+
+    async def handle() -> None:
+        len(current)
+
+    async def serve() -> None:
+        await asyncio.gather(*[handle() for _ in range(tasks)])
+
+    loop = asyncio.new_event_loop()
+    runs = 0
+
+    def run() -> None:
+        nonlocal runs
+        runs += 1
+        loop.run_until_complete(serve())
+
+    try:
+        yield run
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+        print(f"scoped({scope!r}): {calls} factory calls in {runs * tasks} tasks")
+
+
+@benchmark("lazy.local_100_tasks.context")
+def local_tasks_context():
+    yield from _local_tasks("context")
+
+
+@benchmark("lazy.local_100_tasks.task")
+def local_tasks_task():
+    yield from _local_tasks("task")
+
+
+@benchmark("lazy.local_100_tasks.loop")
+def local_tasks_loop():
+    yield from _local_tasks("loop")
+
+
+@benchmark("lazy.local_100_tasks.thread")
+def local_tasks_thread():
+    yield from _local_tasks("thread")
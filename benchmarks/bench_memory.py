@@ -0,0 +1,63 @@
+"""Benchmark of memory used by configs with many keys in :any:`BaseConfig` and
+:any:`CompactBaseConfig`.
+
+Usage::
+
+    python benchmarks/bench_memory.py [keys]
+"""
+import subprocess
+import sys
+
+KEYS = 100000
+
+SCRIPT = """
+import sys
+import tracemalloc
+
+from configalchemy import BaseConfig
+from configalchemy.compact import CompactBaseConfig
+
+base = {base}
+keys = {keys}
+flags = {{f"FLAG_{{index}}": index % 2 == 0 for index in range(keys)}}
+overrides = {{f"FLAG_{{index}}": True for index in range(0, keys, 10)}}
+
+
+class FeatureFlags(base):
+    CONFIGALCHEMY_ENABLE_FUNCTION = True
+
+    def configuration_function(self):
+        return flags
+
+
+tracemalloc.start()
+config = FeatureFlags()
+config.update(overrides)
+current, _ = tracemalloc.get_traced_memory()
+print(current)
+"""
+
+
+def run(base: str, keys: int) -> int:
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT.format(base=base, keys=keys)]
+    )
+    return int(output)
+
+
+def main() -> None:
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else KEYS
+    default = run("BaseConfig", keys)
+    compact = run("CompactBaseConfig", keys)
+    print(f"{keys} keys, 10% overridden")
+    print(
+        f"BaseConfig:        {default / 2 ** 20:.1f} MiB ({default / keys:.0f} B/key)"
+    )
+    print(
+        f"CompactBaseConfig: {compact / 2 ** 20:.1f} MiB ({compact / keys:.0f} B/key, "
+        f"{default / compact:.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark of config writes with and without ``CONFIG_ALCHEMY_VERBOSITY``.
+
+Usage::
+
+    python benchmarks/bench_provenance.py
+"""
+import os
+import subprocess
+import sys
+
+NUMBER = 100000
+
+SCRIPT = f"""
+import timeit
+from configalchemy import BaseConfig
+
+class DefaultConfig(BaseConfig):
+    TEST = 0
+
+config = DefaultConfig()
+meta = config.meta["TEST"]
+
+def write():
+    config["TEST"] = 1
+    meta.pop()
+
+print(min(timeit.repeat(write, number={NUMBER}, repeat=5)) / {NUMBER} * 1e9)
+"""
+
+
+def run(verbosity: str) -> float:
+    env = dict(os.environ, CONFIG_ALCHEMY_VERBOSITY=verbosity)
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT], env=env)
+    return float(output)
+
+
+def main() -> None:
+    quiet = run("")
+    verbose = run("1")
+    print(f"non-verbose write: {quiet:.0f} ns")
+    print(f"verbose write:     {verbose:.0f} ns ({verbose / quiet:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional
+
+BenchmarkFactory = Callable[[], Iterator[Callable[[], None]]]
+
+BENCHMARKS: Dict[str, BenchmarkFactory] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkFactory], BenchmarkFactory]:
+    """Register a generator which sets up, yields the callable to time and tears down::
+
+    @benchmark("config.read")
+    def read():
+        config = DefaultConfig()
+        yield lambda: config.TEST
+    """
+
+    def decorator(factory: BenchmarkFactory) -> BenchmarkFactory:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return decorator
+
+
+def measure(func: Callable[[], None], repeat: int = 5, min_time: float = 0.2) -> float:
+    """Return the best nanoseconds per call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run(pattern: str = "*", repeat: int = 5) -> Dict[str, float]:
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        generator = factory()
+        func = next(generator)
+        try:
+            results[name] = measure(func, repeat=repeat)
+        finally:
+            generator.close()
+        print(f"{name:<40} {format_time(results[name]):>12}", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Print the ratio to baseline and return the names of regressions."""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:<40} {'-':>12} {format_time(current):>12}  MISSING")
+            continue
+        ratio = current / baseline[name]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<40} {format_time(baseline[name]):>12} "
+            f"{format_time(current):>12} {ratio:>7.2f}x{flag}"
+        )
+    return regressions
+
+
+def format_time(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", "--filter", default="*", help="glob of benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="save results as baseline JSON file")
+    parser.add_argument("--compare", help="compare results with baseline JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="fail if slower than baseline by the ratio",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, repeat=args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+        missing = [name for name in results if name not in baseline]
+        if missing:
+            print(
+                f"\n{len(missing)} benchmarks are missing in {args.compare}, "
+                "save the baseline by `make benchmark-save`"
+            )
+            return 1
+    return 0
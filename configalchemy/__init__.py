@@ -1,5 +1,52 @@
 """Top-level package for ConfigAlchemy."""
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
-from configalchemy.configalchemy import BaseConfig, ConfigType, SingletonMetaClass
+if TYPE_CHECKING:  # pragma: no cover
+    from configalchemy.compact import CompactBaseConfig
+    from configalchemy.configalchemy import (
+        BaseConfig,
+        ConfigType,
+        SingletonMetaClass,
+        computed,
+    )
+    from configalchemy.frozen import FrozenConfig
+    from configalchemy.sources import (
+        ConfigSource,
+        DirectorySource,
+        EnvSource,
+        FileSource,
+        FunctionSource,
+    )
 
 __version__ = "0.5.5"
+
+#: the attributes imported from submodules on first access (PEP 562)
+_lazy_attributes = {
+    "BaseConfig": "configalchemy.configalchemy",
+    "ConfigType": "configalchemy.configalchemy",
+    "SingletonMetaClass": "configalchemy.configalchemy",
+    "computed": "configalchemy.configalchemy",
+    "CompactBaseConfig": "configalchemy.compact",
+    "FrozenConfig": "configalchemy.frozen",
+    "ConfigSource": "configalchemy.sources",
+    "DirectorySource": "configalchemy.sources",
+    "EnvSource": "configalchemy.sources",
+    "FileSource": "configalchemy.sources",
+    "FunctionSource": "configalchemy.sources",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name: str) -> Any:
+    module = _lazy_attributes.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,86 @@
+"""The command line of configalchemy::
+
+    python -m configalchemy compile myapp.config.DefaultConfig -o config.bundle
+    python -m configalchemy agent myapp.config.DefaultConfig -s /run/myapp/config.sock
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m configalchemy")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser(
+        "compile", help="compile the resolved config into a bundle"
+    )
+    compile_parser.add_argument(
+        "config", help="the config class, eg. myapp.config.DefaultConfig"
+    )
+    compile_parser.add_argument(
+        "-o",
+        "--output",
+        help="the filename of bundle, CONFIGALCHEMY_BUNDLE of the config by default",
+    )
+    agent_parser = commands.add_parser(
+        "agent", help="serve the config to the processes on the node"
+    )
+    agent_parser.add_argument(
+        "config", help="the config class, eg. myapp.config.DefaultConfig"
+    )
+    agent_parser.add_argument(
+        "-s",
+        "--socket",
+        help="the path of Unix domain socket, AGENT_SOCKET of the config by default",
+    )
+    agent_parser.add_argument(
+        "--check-interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks of the values set directly",
+    )
+    args = parser.parse_args(argv)
+
+    from configalchemy.utils import import_reference
+
+    config_class = import_reference(args.config.replace(":", "."))
+    if args.command == "agent":
+        return _agent(parser, args, config_class)
+
+    from configalchemy.bundle import compile_bundle
+
+    output = args.output
+    if not output:
+        if not config_class.CONFIGALCHEMY_BUNDLE:
+            parser.error("the output is required without CONFIGALCHEMY_BUNDLE")
+        output = os.path.join(
+            config_class.CONFIGALCHEMY_ROOT_PATH, config_class.CONFIGALCHEMY_BUNDLE
+        )
+    config = compile_bundle(config_class, output)
+    print(f"Compiled {len(config)} keys of {args.config} into {output}")
+    return 0
+
+
+def _agent(parser: argparse.ArgumentParser, args: argparse.Namespace, config_class):
+    from configalchemy.contrib.agent import start_agent
+
+    path = args.socket or getattr(config_class, "AGENT_SOCKET", "")
+    if not path:
+        parser.error("the socket is required without AGENT_SOCKET")
+    try:
+        agent = start_agent(config_class, path, check_interval=args.check_interval)
+    except OSError as e:
+        parser.error(f"can not serve on {path}: {e}")
+    print(f"Serving {len(agent.config)} keys of {args.config} on {path}")
+    try:
+        agent.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agent.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
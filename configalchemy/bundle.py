@@ -0,0 +1,152 @@
+"""The bundle of resolved config compiled at build or deploy time::
+
+    python -m configalchemy compile myapp.config.DefaultConfig -o config.bundle
+
+The bundle holds the validated values of every priority and the fingerprints of
+the sources, and it is loaded straight into ``meta`` if the fingerprints still match.
+"""
+import logging
+import os
+import pickle
+import sys
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from configalchemy.configalchemy import BaseConfig
+
+__all__ = ["BundleMismatch", "compile_bundle", "load_bundle"]
+
+BUNDLE_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+#: key -> ([(priority, value, index of owner source or ``None``)],
+#: state of nested config or ``None``)
+BundleState = Dict[
+    str, Tuple[List[Tuple[int, Any, Optional[int]]], Optional[Dict[str, Any]]]
+]
+
+
+class BundleMismatch(Exception):
+    """The bundle is stale, eg. the environment variables or the config file changed."""
+
+
+def class_fingerprint(cls: Type[BaseConfig]) -> str:
+    """Return the digest of the name and source files of the config class and its bases."""
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for klass in cls.__mro__:
+        if not issubclass(klass, BaseConfig):
+            continue
+        digest.update(f"{klass.__module__}.{klass.__qualname__}\0".encode())
+        filename = getattr(sys.modules.get(klass.__module__), "__file__", None)
+        if filename:
+            with open(filename, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _state(config: BaseConfig, owners: Dict[int, int]) -> BundleState:
+    state: BundleState = {}
+    for key, config_meta in config.meta.items():
+        items = [
+            (item.priority, item.value, owners.get(id(item.owner)))
+            for item in config_meta.items
+        ]
+        nested = config_meta.value
+        if isinstance(nested, BaseConfig):
+            # the nested config is the instance declared in class
+            state[key] = (
+                [(priority, None, owner) for priority, _, owner in items],
+                _state(nested, owners),
+            )
+        else:
+            state[key] = (items, None)
+    return state
+
+
+def _restore(config: BaseConfig, state: BundleState, sources: List[Any]) -> None:
+    cls = config.__class__
+    for key, (items, nested_state) in state.items():
+        owned = [
+            (priority, value, None if owner is None else sources[owner])
+            for priority, value, owner in items
+        ]
+        if nested_state is not None:
+            nested = getattr(cls, key)
+            nested._init_storage()
+            _restore(nested, nested_state, sources)
+            owned = [(priority, nested, owner) for priority, _, owner in owned]
+        config._restore_key(key, owned)
+    config._frozen = None
+
+
+def _header(config: BaseConfig) -> Dict[str, Any]:
+    return {
+        "version": BUNDLE_VERSION,
+        "class": class_fingerprint(config.__class__),
+        "sources": [
+            (source.name, source.fingerprint(config))
+            for source in config._enabled_sources()
+        ],
+    }
+
+
+def compile_bundle(cls: Type[BaseConfig], filename: str) -> BaseConfig:
+    """Load the config from the sources and write the bundle, return the loaded config.
+
+    .. note:: The bundle contains the values of secrets as they are.
+    """
+    config = cls.__new__(cls)
+    config._use_bundle = False
+    config.__init__()  # type: ignore
+    header = _header(config)
+    sources = config._enabled_sources()
+    owners = {id(source): index for index, source in enumerate(sources)}
+    payload = {
+        "state": _state(config, owners),
+        "caches": [source._cache for source in sources],
+        "keys": [source._keys for source in sources],
+    }
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_filename, filename)
+    return config
+
+
+def _check(config: BaseConfig, header: Dict[str, Any]) -> None:
+    if header.get("version") != BUNDLE_VERSION:
+        raise BundleMismatch(f"version {header.get('version')} != {BUNDLE_VERSION}")
+    current = _header(config)
+    if header["class"] != current["class"]:
+        raise BundleMismatch(f"{config.__class__.__qualname__} changed")
+    if header["sources"] != current["sources"]:
+        raise BundleMismatch(f"sources {header['sources']} != {current['sources']}")
+
+
+def load_bundle(config: BaseConfig, filename: str) -> bool:
+    """Load the values of the prepared config from the bundle, return ``False`` if the
+    bundle is missing or stale and the config should be loaded from the sources.
+    """
+    config.config_sources = config.sources()
+    try:
+        with open(filename, "rb") as f:
+            _check(config, pickle.load(f))
+            payload = pickle.load(f)
+    except (OSError, BundleMismatch) as e:
+        logger.info(f"Skip the bundle {filename}: {e}")
+        return False
+    except Exception as e:
+        logger.warning(f"Failed to read the bundle {filename}: {e!r}")
+        return False
+    sources = config._enabled_sources()
+    with config._record_source("bundle") as source_stats:
+        _restore(config, payload["state"], sources)
+        source_stats.keys += len(payload["state"])
+    for source, cache, keys in zip(sources, payload["caches"], payload["keys"]):
+        source._cache = cache
+        source._keys = keys
+    config._enable_stats()
+    return True
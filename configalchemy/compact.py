@@ -0,0 +1,364 @@
+import threading
+from array import array
+from typing import Any, Dict, Iterator, KeysView, List, Mapping, Optional, Tuple
+
+from configalchemy.configalchemy import BaseConfig, _set_attribute, computed
+from configalchemy.field import Field, ValidateException
+from configalchemy.meta import ConfigMetaItem
+from configalchemy.utils import current_owner
+
+__all__ = ["CompactBaseConfig"]
+
+#: the fields shared by keys with the same default type and annotation
+_field_table: List[Field] = []
+_field_ids: Dict[Tuple[type, Any], int] = {}
+_field_lock = threading.Lock()
+
+_MISSING: Any = object()
+
+
+def _shared_field_id(default_value: Any, annotation: Any) -> int:
+    """Return the index of shared field in the table, -1 if the field is bound to
+    the default value (eg. nested config) and can not be shared.
+    """
+    if hasattr(default_value, "__typecast__") or hasattr(
+        default_value, "__type_check__"
+    ):
+        return -1
+    key = (type(default_value), annotation)
+    try:
+        field_id = _field_ids.get(key)
+    except TypeError:  # unhashable annotation
+        return -1
+    if field_id is None:
+        with _field_lock:
+            field_id = _field_ids.get(key)
+            if field_id is None:
+                _field_table.append(
+                    Field(
+                        name=type(default_value).__name__,
+                        annotation=annotation,
+                        default_value=default_value,
+                    )
+                )
+                field_id = _field_ids[key] = len(_field_table) - 1
+    return field_id
+
+
+class CompactBaseConfig(BaseConfig):
+    """The config storing the values in columns indexed by key id for very large configs
+    (eg. 10^5+ feature flags)::
+
+        class FeatureFlags(CompactBaseConfig):
+            CONFIGALCHEMY_CONFIG_FILE = "flags.json"
+
+        flags = FeatureFlags()
+        flags.NEW_CHECKOUT
+
+    The fields are shared by keys with the same default type and annotation,
+    and only the keys declared in the class get descriptors, the other keys are
+    resolved by ``__getattr__``. The values of lower priorities are only kept for keys
+    with more than one value.
+
+    ``meta`` is a read-only view building :any:`ConfigMeta`-like objects on access,
+    and the provenance of values is not tracked.
+    """
+
+    def _init_storage(self) -> None:
+        #: key -> key id
+        self._index: Dict[str, int] = {}
+        #: the current value of every key id
+        self._values: List[Any] = []
+        #: the priority of current value of every key id
+        self._priorities = array("i")
+        #: the index in shared field table of every key id, -1 for own field
+        self._field_ids = array("i")
+        self._own_fields: Dict[int, Field] = {}
+        #: the ``(priority, value, owner)`` stacks of key ids with more than one value
+        self._stacks: Dict[int, List[Tuple[int, Any, Any]]] = {}
+        #: the owner of current value of key ids without stack, if it is owned
+        self._owners: Dict[int, Any] = {}
+        #: the key ids of removed keys, reused by the keys added later
+        self._free_ids: List[int] = []
+
+    @property  # type: ignore
+    def meta(self) -> "CompactMetaView":  # type: ignore
+        return CompactMetaView(self)
+
+    def derive(
+        self,
+        mapping: Optional[Mapping[str, Any]] = None,
+        priority: Optional[int] = None,
+    ) -> "CompactBaseConfig":
+        raise NotImplementedError("compact config can not be derived")
+
+    def _field(self, key_id: int) -> Field:
+        field_id = self._field_ids[key_id]
+        if field_id < 0:
+            return self._own_fields[key_id]
+        return _field_table[field_id]
+
+    def _validate(self, key: str, key_id: int, value: Any, priority: int) -> Any:
+        try:
+            return self._field(key_id).validate(value, priority)
+        except ValidateException as e:
+            raise ValidateException(key, value) from e.__cause__
+
+    def _apply_value(self, key: str, value: Any, priority: int):
+        self._frozen = None
+        split_key = key.split(".", 1)
+        if len(split_key) == 2:
+            key, nested_key = split_key
+            value = {nested_key: value}
+
+        key_id = self._index.get(key)
+        if key_id is None:
+            """Setup"""
+            if isinstance(getattr(self.__class__, key, None), computed):
+                raise AttributeError(f"{key} is computed and can not be set")
+            annotation = getattr(self, "__annotations__", {}).get(key)
+            field_id = _shared_field_id(value, annotation)
+            if self._free_ids:
+                key_id = self._free_ids.pop()
+                self._field_ids[key_id] = field_id
+                self._values[key_id] = value
+                self._priorities[key_id] = priority
+            else:
+                key_id = len(self._values)
+                self._field_ids.append(field_id)
+                self._values.append(value)
+                self._priorities.append(priority)
+            self._index[key] = key_id
+            if field_id < 0:
+                self._own_fields[key_id] = Field(
+                    name=key, annotation=annotation, default_value=value
+                )
+            owner = current_owner.get()
+            if owner is not None:
+                self._owners[key_id] = owner
+            cls = self.__class__
+            if hasattr(cls, key):
+                # only the keys declared in class get descriptors
+                _set_attribute(cls, key, value)
+            self._invalidate(key)
+            return
+        value = self._validate(key, key_id, value, priority)
+        item = (priority, value, current_owner.get())
+        stack = self._stacks.get(key_id)
+        if stack is None:
+            current = (
+                self._priorities[key_id],
+                self._values[key_id],
+                self._owners.pop(key_id, None),
+            )
+            if priority < current[0]:
+                self._stacks[key_id] = [item, current]
+                self._invalidate(key)
+                return
+            stack = self._stacks[key_id] = [current]
+        for index in range(len(stack), 0, -1):
+            if stack[index - 1][0] <= priority:
+                stack.insert(index, item)
+                break
+        else:
+            stack.insert(0, item)
+        self._values[key_id], self._priorities[key_id] = stack[-1][1], stack[-1][0]
+        # after writing, so that the computed value read in the meantime is not cached
+        self._invalidate(key)
+
+    def _set_items(self, key_id: int, items: List[Tuple[int, Any, Any]]) -> None:
+        self._owners.pop(key_id, None)
+        if not items:
+            self._values[key_id] = _MISSING
+            self._stacks.pop(key_id, None)
+            return
+        self._priorities[key_id], self._values[key_id], owner = items[-1]
+        if len(items) == 1:
+            self._stacks.pop(key_id, None)
+            if owner is not None:
+                self._owners[key_id] = owner
+        else:
+            self._stacks[key_id] = items
+
+    def _release(self, key: str, key_id: int) -> None:
+        """Delete the key without values and free its id for the keys added later."""
+        del self._index[key]
+        self._own_fields.pop(key_id, None)
+        self._free_ids.append(key_id)
+
+    def _restore_key(self, key: str, items: List[Tuple[int, Any, Any]]) -> None:
+        # the first value sets up the key and field without validation
+        priority, default_value, _ = items[0]
+        self._apply_value(key, default_value, priority)
+        self._set_items(self._index[key], list(items))
+
+    def _items(self, key_id: int) -> List[Tuple[int, Any, Any]]:
+        stack = self._stacks.get(key_id)
+        if stack is not None:
+            return list(stack)
+        return [
+            (
+                self._priorities[key_id],
+                self._values[key_id],
+                self._owners.get(key_id),
+            )
+        ]
+
+    def _remove_value(self, key: str, priority: int, owner: Any = None) -> None:
+        key, _, nested_key = key.partition(".")
+        key_id = self._index.get(key)
+        if key_id is None:
+            return
+        self._frozen = None
+        value = self._values[key_id]
+        if isinstance(value, BaseConfig):
+            for nested in [nested_key] if nested_key else list(value.keys()):
+                value._remove_value(nested, priority, owner)
+        self._set_items(
+            key_id,
+            [
+                item
+                for item in self._items(key_id)
+                if item[0] != priority or (owner is not None and item[2] is not owner)
+            ],
+        )
+        if self._values[key_id] is _MISSING:
+            self._release(key, key_id)
+        self._invalidate(key)
+
+    def __getitem__(self, key: str) -> Any:
+        """x.__getitem__(y) <==> x[y]"""
+        if self._sample_reads:
+            self._stats.record_read(key)
+        if self._tracking:
+            self._record_read(key)
+        if self._has_overlay:
+            overlay = self._overlay.get()
+            if overlay is not None and key in overlay:
+                return overlay[key]
+        return self._values[self._index[key]]
+
+    def __getattr__(self, key: str) -> Any:
+        if key.isupper():
+            try:
+                return self[key]
+            except KeyError:
+                pass
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{key}'"
+        )
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        index = self.__dict__.get("_index")
+        if index is not None and key in index and not hasattr(self.__class__, key):
+            self[key] = value
+        else:
+            super().__setattr__(key, value)
+
+    def items(self) -> List[Tuple[str, Any]]:  # type: ignore
+        values = self._values
+        return self._apply_overlay(
+            [(key, values[key_id]) for key, key_id in self._index.items()]
+        )
+
+    def keys(self) -> KeysView[str]:
+        return self._index.keys()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __delitem__(self, key) -> None:
+        self.delete(key)
+
+    def delete(self, key: str, priority: Optional[int] = None) -> None:
+        key_id = self._index[key]
+        items = self._items(key_id)
+        if priority is None:
+            priority = items[-1][0]
+        for index in range(len(items) - 1, -1, -1):
+            if items[index][0] == priority:
+                del items[index]
+                break
+        else:
+            raise KeyError(priority)
+        self._frozen = None
+        self._set_items(key_id, items)
+        if self._values[key_id] is _MISSING:
+            self._release(key, key_id)
+        self._invalidate(key)
+
+    def get(self, key: str, default=None):
+        if key not in self._index:
+            return default
+        return self[key]
+
+    def __bool__(self) -> bool:
+        return bool(self._index)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class CompactConfigMeta:
+    """The :any:`ConfigMeta`-like view of key in :any:`CompactBaseConfig`."""
+
+    __slots__ = ("config", "key", "key_id")
+
+    def __init__(self, config: CompactBaseConfig, key: str, key_id: int):
+        self.config = config
+        self.key = key
+        self.key_id = key_id
+
+    @property
+    def field(self) -> Field:
+        return self.config._field(self.key_id)
+
+    @property
+    def items(self) -> Tuple[ConfigMetaItem, ...]:
+        return tuple(
+            ConfigMetaItem(priority, value, owner)
+            for priority, value, owner in self.config._items(self.key_id)
+        )
+
+    @property
+    def value(self) -> Any:
+        return self.config._values[self.key_id]
+
+    def set(self, priority: int, value: Any) -> None:
+        self.config._apply_value(self.key, value, priority)
+
+    def remove(self, priority: int) -> None:
+        self.config._remove_value(self.key, priority)
+
+    def __repr__(self) -> str:
+        return repr(self.value)
+
+
+class CompactMetaView(Mapping):
+    __slots__ = ("config",)
+
+    def __init__(self, config: CompactBaseConfig):
+        self.config = config
+
+    def __getitem__(self, key: str) -> CompactConfigMeta:
+        return CompactConfigMeta(self.config, key, self.config._index[key])
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:  # type: ignore
+        if key in self.config._index:
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.config._index)
+
+    def __len__(self) -> int:
+        return len(self.config._index)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.config._index
@@ -1,11 +1,14 @@
-import asyncio
 import errno
-import inspect
-import json
 import logging
 import os
-from threading import Thread
+import weakref
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import partial
+from threading import Lock
+from time import perf_counter
 from typing import (
+    TYPE_CHECKING,
     Any,
     KeysView,
     List,
@@ -16,15 +19,51 @@ from typing import (
     Type,
     TextIO,
     Mapping,
+    Iterator,
+    TypeVar,
+    Callable,
+    ContextManager,
+    Set,
 )
 
-from configalchemy.field import Field
-from configalchemy.meta import ConfigMeta, ConfigMetaJSONEncoder
+from configalchemy.field import Field, ValidateException, interned_field
+from configalchemy.frozen import FrozenConfig, frozen_class
+from configalchemy.meta import (
+    ConfigMeta,
+    ConfigMetaItem,
+    config_source,
+)
+from configalchemy.sources import (
+    STREAMING,
+    ConfigSource,
+    DirectorySource,
+    EnvSource,
+    FileSource,
+    FunctionSource,
+)
+from configalchemy.stats import ConfigStats, SourceStats, emit
+from configalchemy.types import SecretStr, SECRET_MASK, freeze_json
+
+if TYPE_CHECKING:  # pragma: no cover
+    from threading import Event, Thread
+
+    from configalchemy.encoder import ConfigMetaJSONEncoder
 
 ConfigType = MutableMapping[str, Any]
+_ConfigT = TypeVar("_ConfigT", bound="BaseConfig")
 
 logger = logging.getLogger(__name__)
 
+#: the (config, key) pairs read by the computed value being evaluated
+_computed_reads: ContextVar[Optional[Set[Tuple["BaseConfig", str]]]] = ContextVar(
+    "configalchemy_computed_reads", default=None
+)
+#: increased on every write to discard the computed values evaluated meanwhile
+_write_version = 0
+_tracking_lock = Lock()
+_overlay_lock = Lock()
+_missing: Any = object()
+
 
 class SingletonMetaClass(type):
     def __init__(self, *args, **kwargs):
@@ -44,7 +83,7 @@ class SingletonMetaClass(type):
 class BaseConfig:
     """Initialize the :any:`BaseConfig` with the Priority::
 
-        configure from env > configure from local file > configure from function > default configuration
+        configure from env > configure from secrets directory > configure from local file > configure from function > default configuration
 
     Example of class-based configuration::
 
@@ -67,10 +106,24 @@ class BaseConfig:
     #: set to ``True`` if you want silent failure for missing files.
     CONFIGALCHEMY_LOAD_FILE_SILENT = False
 
+    #: The directory with one file per key, eg. the mounted Kubernetes secret volume,
+    #: the values are typecast into :any:`SecretStr`.
+    CONFIGALCHEMY_SECRETS_DIR = ""
+    CONFIGALCHEMY_SECRETS_VALUE_PRIORITY = 25
+
     #: set to ``True`` if you want to override config from function return value.
     CONFIGALCHEMY_ENABLE_FUNCTION = False
     CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY = 10
 
+    #: set to ``True`` if you want to read env, file and function in parallel,
+    #: the configuration_function can not access the values from env or file.
+    CONFIGALCHEMY_PARALLEL_LOAD = False
+
+    #: The filename of the bundle compiled by ``python -m configalchemy compile``,
+    #: relative to `CONFIGALCHEMY_ROOT_PATH`. The values are loaded from the bundle
+    #: instead of the sources if the fingerprints of the sources still match.
+    CONFIGALCHEMY_BUNDLE = ""
+
     CONFIGALCHEMY_DEFAULT_VALUE_PRIORITY = 0
 
     #: The priority of config['TEST'] = value,
@@ -78,50 +131,294 @@ class BaseConfig:
     #: config.update(TEST=value)
     CONFIGALCHEMY_SETITEM_PRIORITY = 99
 
+    #: record one of every N reads of keys in :meth:`stats`, 0 to disable.
+    CONFIGALCHEMY_STATS_READ_SAMPLE = 0
+
+    _frozen: Optional[FrozenConfig] = None
+    #: (nested config, its snapshot) in the cached snapshot
+    _frozen_nested: List[Tuple["BaseConfig", FrozenConfig]] = []
+    _sample_reads = False
+    _defer_load = False
+    _use_bundle = True
+    _has_overlay = False
+    #: the number of overlays being active in any context
+    _overlays = 0
+    #: the number of computed values being evaluated
+    _tracking = 0
+    #: the keys whose :any:`ConfigMeta` is shared with the config derived from
+    _shared_keys: Set[str] = frozenset()  # type: ignore
+    #: the keys whose :any:`ConfigMeta` is shared with the configs derived from this
+    _lent_keys: Set[str] = frozenset()  # type: ignore
+
+    #: the sources of the last load, see :meth:`sources`
+    config_sources: List[ConfigSource]
+    _refresh_stop: Optional["Event"]
+    _refresh_threads: List["Thread"]
+
     def __init__(self):
-        self.meta: Dict[str, ConfigMeta] = {}
+        self._prepare()
+
+        if self._load_bundle():
+            self._defer_load = False
+            return
 
         self._setup()
 
-        #: env
-        if self.CONFIGALCHEMY_ENV_PREFIX:
-            self._from_env()
-
-        #: config file
-        if self.CONFIGALCHEMY_CONFIG_FILE:
-            self._from_file()
-
-        #: function
-        if self.CONFIGALCHEMY_ENABLE_FUNCTION:
-            if inspect.iscoroutinefunction(self.configuration_function):
-                # use Thead to avoid initializing with running event loop.
-                class TempThread(Thread):
-                    def run(thread_self) -> None:
-                        loop = asyncio.new_event_loop()
-                        loop.run_until_complete(
-                            self.access_config_from_coroutine(
-                                priority=self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY
-                            )
-                        )
-                        loop.close()
-
-                temp_thread = TempThread()
-                temp_thread.start()
-                temp_thread.join()
+        if not self._defer_load:
+            self._load()
+
+    def sources(self) -> List[ConfigSource]:
+        """Return the sources in the order of loading, override to register more
+        sources with their own priorities::
+
+            def sources(self):
+                return super().sources() + [
+                    FunctionSource(self.load_feature_flags, priority=15, refresh_interval=30)
+                ]
+        """
+        return [EnvSource(), FileSource(), DirectorySource(), FunctionSource()]
+
+    def _enabled_sources(self) -> List[ConfigSource]:
+        return [source for source in self.config_sources if source.enabled(self)]
+
+    def _read_source(self, source: ConfigSource) -> Optional[Mapping[str, Any]]:
+        if source.is_async(self):
+            from concurrent.futures import ThreadPoolExecutor
+
+            # use thread to avoid initializing with running event loop.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(source.read, self).result()
+        return source.read(self)
+
+    def _load(self) -> None:
+        self.config_sources = self.sources()
+        if self.CONFIGALCHEMY_PARALLEL_LOAD:
+            self._parallel_load()
+        else:
+            for source in self._enabled_sources():
+                with self._record_source(source.name):
+                    source.apply(self, self._read_source(source))
+        self._enable_stats()
+
+    def _parallel_load(self) -> None:
+        """Read all sources in threads, then apply the staging mappings in one pass
+        in the same order as the sequential loading.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        sources = self._enabled_sources()
+        if not sources:
+            return
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = [
+                executor.submit(_timed, partial(source.read, self))
+                for source in sources
+            ]
+            staged = [future.result() for future in futures]
+        self._apply_staged(sources, staged)
+
+    def _apply_staged(
+        self,
+        sources: List[ConfigSource],
+        staged: List[Tuple[float, Optional[Mapping[str, Any]]]],
+    ) -> None:
+        for source, (duration, mapping) in zip(sources, staged):
+            self._stats.source(source.name).duration += duration
+            with self._record_source(source.name):
+                source.apply(self, mapping)
+
+    async def _async_parallel_load(self) -> None:
+        import asyncio
+
+        sources = self._enabled_sources()
+
+        async def read(source: ConfigSource) -> Tuple[float, Any]:
+            start = perf_counter()
+            mapping = await source.async_load(self)
+            return perf_counter() - start, mapping
+
+        staged = await asyncio.gather(*[read(source) for source in sources])
+        self._apply_staged(sources, staged)
+
+    async def _async_load(self) -> None:
+        self.config_sources = self.sources()
+        if self.CONFIGALCHEMY_PARALLEL_LOAD:
+            await self._async_parallel_load()
+        else:
+            for source in self._enabled_sources():
+                with self._record_source(source.name):
+                    source.apply(self, await source.async_load(self))
+        self._enable_stats()
+
+    def refresh_source(self, source: ConfigSource) -> bool:
+        """Load the source again and apply the changed keys."""
+        with self._record_source(source.name):
+            return source.apply(self, self._read_source(source))
+
+    def start_refresh(self) -> None:
+        """Start the daemon threads refreshing the sources with ``refresh_interval``
+        and following the changes of :any:`STREAMING` sources.
+        """
+        from threading import Event, Thread
+
+        self.stop_refresh()
+        stop = self._refresh_stop = Event()
+        for source in self._enabled_sources():
+            if source.mode == STREAMING:
+                target = self._follow_source
+            elif source.refresh_interval > 0:
+                target = self._poll_source
             else:
-                self.access_config_from_function(
-                    priority=self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY
-                )
+                continue
+            thread = Thread(target=target, args=(source, stop), daemon=True)
+            thread.start()
+            self._refresh_threads.append(thread)
+
+    def stop_refresh(self, timeout: Optional[float] = None) -> None:
+        if self._refresh_stop is not None:
+            self._refresh_stop.set()
+        for thread in self._refresh_threads:
+            thread.join(timeout)
+        self._refresh_threads = []
+
+    def _poll_source(self, source: ConfigSource, stop: "Event") -> None:
+        while not stop.wait(source.refresh_interval):
+            try:
+                self.refresh_source(source)
+            except Exception as e:
+                logger.exception(f"Failed to refresh {source!r}: {e}")
+
+    def _follow_source(self, source: ConfigSource, stop: "Event") -> None:
+        try:
+            for changes in source.stream(self):
+                if stop.is_set():
+                    break
+                if not changes:
+                    continue
+                with self._record_source(source.name):
+                    source.apply_changes(self, changes)
+        except Exception as e:
+            logger.exception(f"Failed to follow {source!r}: {e}")
+
+    @classmethod
+    async def create(cls: Type[_ConfigT]) -> _ConfigT:
+        """Initialize the config on the running event loop::
+
+            config = await DefaultConfig.create()
+
+        The coroutine configuration_function is awaited on the running event loop,
+        and reading the config file or calling the synchronous configuration_function
+        is offloaded to the default executor.
+        """
+        if isinstance(cls, SingletonMetaClass):
+            instance = getattr(cls, "_SingletonMetaClass__instance")
+            if instance is not None:
+                return instance
+        self = cls.__new__(cls)
+        self._defer_load = True
+        self.__init__()  # type: ignore
+        if self._defer_load:
+            await self._async_load()
+        self._defer_load = False
+        if isinstance(cls, SingletonMetaClass):
+            setattr(cls, "_SingletonMetaClass__instance", self)
+        return self
+
+    def _prepare(self) -> None:
+        self._init_storage()
+        self._stats = ConfigStats()
+        self._overlay: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+            f"configalchemy_overlay_{id(self)}", default=None
+        )
+        #: the stats of the source being loaded in the context
+        self._loading: ContextVar[Optional[SourceStats]] = ContextVar(
+            f"configalchemy_loading_{id(self)}", default=None
+        )
+        self.config_sources = []
+        self._computed: Dict[str, Any] = {}
+        #: key -> (config, name) of the computed values reading the key
+        self._dependents: Dict[str, Set[Tuple[weakref.ref, str]]] = {}
+        self._refresh_stop = None
+        self._refresh_threads = []
+
+    def _init_storage(self) -> None:
+        self.meta: Dict[str, ConfigMeta] = {}
+
+    def _restore_key(self, key: str, items: List[Tuple[int, Any, Any]]) -> None:
+        """Set up the key with the validated ``(priority, value, owner)`` items
+        without validating them again.
+        """
+        default_value = items[0][1]
+        config_meta = ConfigMeta.__new__(ConfigMeta)
+        config_meta.field = interned_field(
+            self.__class__,
+            key,
+            getattr(self, "__annotations__", {}).get(key),
+            default_value,
+        )
+        config_meta.items = [
+            ConfigMetaItem(priority, value, owner) for priority, value, owner in items
+        ]
+        self.meta[key] = config_meta
+        _set_attribute(self.__class__, key, default_value)
+        self._invalidate(key)
+
+    def _load_bundle(self) -> bool:
+        if not self.CONFIGALCHEMY_BUNDLE or not self._use_bundle:
+            return False
+        from configalchemy.bundle import load_bundle
+
+        return load_bundle(
+            self,
+            os.path.join(self.CONFIGALCHEMY_ROOT_PATH, self.CONFIGALCHEMY_BUNDLE),
+        )
+
+    def _enable_stats(self) -> None:
+        read_sample = self.CONFIGALCHEMY_STATS_READ_SAMPLE
+        self._stats.read_sample = read_sample
+        self._sample_reads = read_sample > 0
+
+    @contextmanager
+    def _record_source(self, name: str) -> Iterator[SourceStats]:
+        """Record the load duration, keys applied and validation of the source."""
+        source_stats = self._stats.source(name)
+        token = self._loading.set(source_stats)
+        start = perf_counter()
+        try:
+            yield source_stats
+        finally:
+            source_stats.duration += perf_counter() - start
+            source_stats.loads += 1
+            self._loading.reset(token)
+            emit("load", source_stats.to_dict())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the load timings per source and the sampled read counters per key::
+
+        {
+            "sources": {"env": {"name": "env", "loads": 1, "duration": 0.001, "keys": 1,
+                                "failures": 0, "validate_time": 0.0001}},
+            "reads": {"TEST": 100},
+            "hot_keys": [("TEST", 100)],
+        }
+        """
+        return self._stats.to_dict()
 
     def _setup(self):
         """Setup the default values and field of value from self."""
-        for key in dir(self):
-            if key.isupper() and not isinstance(getattr(self.__class__, key), property):
-                self._set_value(
-                    key,
-                    getattr(self, key),
-                    priority=self.CONFIGALCHEMY_DEFAULT_VALUE_PRIORITY,
-                )
+        name = self.__class__.__qualname__
+        with config_source("default", name), self._record_source("default"):
+            for key in dir(self):
+                if key.isupper() and not isinstance(
+                    getattr(self.__class__, key), (property, computed)
+                ):
+                    # the keys set at runtime on other instances have no default
+                    value = getattr(self, key, _missing)
+                    if value is _missing:
+                        continue
+                    self._set_value(
+                        key, value, priority=self.CONFIGALCHEMY_DEFAULT_VALUE_PRIORITY
+                    )
         return True
 
     def _from_file(self) -> bool:
@@ -129,9 +426,14 @@ class BaseConfig:
         behaves as if the JSON object was a dictionary and passed to the
         :meth:`from_mapping` function.
         """
-        filename = os.path.join(
+        return self.refresh_source(FileSource())
+
+    def _config_filename(self) -> str:
+        return os.path.join(
             self.CONFIGALCHEMY_ROOT_PATH, self.CONFIGALCHEMY_CONFIG_FILE
         )
+
+    def _read_file(self, filename: str) -> Optional[ConfigType]:
         try:
             with open(filename) as f:
                 obj = self.load_file(f)
@@ -140,16 +442,16 @@ class BaseConfig:
                 errno.ENOENT,
                 errno.EISDIR,
             ):
-                return False
+                return None
             e.strerror = f"Unable to load configuration file {e.strerror}"
             raise
         else:
             logger.info(f"Loaded configuration file: {filename}")
-            return self.from_mapping(
-                obj, priority=self.CONFIGALCHEMY_CONFIG_FILE_VALUE_PRIORITY
-            )
+            return obj
 
     def load_file(self, file: TextIO) -> ConfigType:
+        import json
+
         return json.load(file)
 
     def from_mapping(self, *mappings: Mapping[str, Any], priority: int) -> bool:
@@ -164,30 +466,57 @@ class BaseConfig:
 
     def _from_env(self) -> bool:
         """Updates the values in the config from the environment variable."""
-        for key, value in os.environ.items():
-            if key.startswith(self.CONFIGALCHEMY_ENV_PREFIX):
-                self._set_value(
-                    key[len(self.CONFIGALCHEMY_ENV_PREFIX) :],
-                    value,
-                    priority=self.CONFIGALCHEMY_ENVIRONMENT_VALUE_PRIORITY,
-                )
-        return True
+        return self.refresh_source(EnvSource())
+
+    def _read_env(self) -> Dict[str, str]:
+        prefix = self.CONFIGALCHEMY_ENV_PREFIX
+        return {
+            key[len(prefix) :]: value
+            for key, value in os.environ.items()
+            if key.startswith(prefix)
+        }
 
     def configuration_function(self) -> Mapping[str, Any]:
         return {}
 
     def access_config_from_function(self, priority: int) -> bool:
         """Updates the values in the config from the configuration_function."""
-        self.from_mapping(self.configuration_function(), priority=priority)
+        with config_source(
+            "function", self.configuration_function.__qualname__
+        ), self._record_source("function"):
+            self.from_mapping(self.configuration_function(), priority=priority)
         return True
 
     async def access_config_from_coroutine(self, priority: int) -> bool:
         """Async updates the values in the config from the configuration_function."""
-        data = await self.configuration_function()  # type: ignore
-        self.from_mapping(data, priority=priority)
+        with config_source(
+            "function", self.configuration_function.__qualname__
+        ), self._record_source("function"):
+            data = await self.configuration_function()  # type: ignore
+            self.from_mapping(data, priority=priority)
         return True
 
     def _set_value(self, key: str, value: Any, priority: int):
+        loading = self._loading.get()
+        if loading is None:
+            self._apply_value(key, value, priority)
+            return
+        start = perf_counter()
+        try:
+            self._apply_value(key, value, priority)
+        except ValidateException as e:
+            loading.failures += 1
+            emit(
+                "validation_failure",
+                {"source": loading.name, "key": e.name, "value": e.value},
+            )
+            raise
+        finally:
+            loading.validate_time += perf_counter() - start
+        loading.keys += 1
+
+    def _apply_value(self, key: str, value: Any, priority: int):
+        self._frozen = None
         split_key = key.split(".", 1)
         if len(split_key) == 2:
             key, nested_key = split_key
@@ -195,25 +524,218 @@ class BaseConfig:
 
         if key not in self.meta:
             """Setup"""
+            if isinstance(getattr(self.__class__, key, None), computed):
+                raise AttributeError(f"{key} is computed and can not be set")
             self.meta[key] = ConfigMeta(
                 default_value=value,
-                field=Field(
-                    name=key,
-                    default_value=value,
-                    annotation=getattr(self, "__annotations__", {}).get(key),
+                field=interned_field(
+                    self.__class__,
+                    key,
+                    getattr(self, "__annotations__", {}).get(key),
+                    value,
                 ),
                 priority=priority,
             )
-            setattr(self.__class__, key, _ConfigAttribute(key, value))
+            _set_attribute(self.__class__, key, value)
         else:
+            if key in self._shared_keys:
+                self._unshare(key)
             self.meta[key].set(priority=priority, value=value)
+        # after writing, so that the computed value read in the meantime is not cached
+        self._invalidate(key)
+
+    def _unshare(self, key: str) -> None:
+        """Copy the :any:`ConfigMeta` shared with the base config before writing."""
+        self._shared_keys.discard(key)
+        config_meta = self.meta[key] = self.meta[key].copy()
+        nested = config_meta.value
+        if isinstance(nested, BaseConfig):
+            derived = nested.derive()
+            config_meta.field = Field(
+                name=key, annotation=config_meta.field.annotation, default_value=derived
+            )
+            config_meta.items = [
+                ConfigMetaItem(item.priority, derived, item.owner)
+                if item.value is nested
+                else item
+                for item in config_meta.items
+            ]
+
+    def derive(
+        self: _ConfigT,
+        mapping: Optional[Mapping[str, Any]] = None,
+        priority: Optional[int] = None,
+    ) -> _ConfigT:
+        """Return the config sharing the loaded values with this config without loading
+        from the sources again, and the values of ``mapping`` are set with ``priority``
+        (``CONFIGALCHEMY_SETITEM_PRIORITY`` by default)::
+
+            tenant = config.derive({"TEST": "tenant"}, priority=40)
+
+        The values are copied on write, and the changes of keys not written in the
+        derived config are visible in the derived config. The keys removed from this
+        config keep their last values in the derived config.
+        """
+        derived = self.__class__.__new__(self.__class__)
+        derived._prepare()
+        derived.meta.update(self.meta)
+        derived._shared_keys = set(self.meta)
+        self._lent_keys = {*self._lent_keys, *self.meta}
+        if mapping:
+            if priority is None:
+                priority = self.CONFIGALCHEMY_SETITEM_PRIORITY
+            with derived._record_source("derive"):
+                derived.from_mapping(mapping, priority=priority)
+        derived._enable_stats()
+        return derived
+
+    def _remove_value(self, key: str, priority: int, owner: Any = None) -> None:
+        """Remove the values of key with the priority, only the values set by ``owner``
+        if it is given. The key is deleted if there is no value left.
+        """
+        key, _, nested_key = key.partition(".")
+        config_meta = self.meta.get(key)
+        if config_meta is None:
+            return
+        if key in self._shared_keys:
+            self._unshare(key)
+            config_meta = self.meta[key]
+        self._frozen = None
+        value = config_meta.value
+        if isinstance(value, BaseConfig):
+            for nested in [nested_key] if nested_key else list(value.meta):
+                value._remove_value(nested, priority, owner)
+        self._remove_from_meta(key, lambda meta: meta.remove(priority, owner))
+        self._invalidate(key)
+
+    def _remove_from_meta(self, key: str, remove: Callable[[ConfigMeta], Any]) -> None:
+        """Remove the value from the :any:`ConfigMeta` of key, and delete the key if
+        there is no value left. The meta shared with the derived configs is not emptied,
+        they keep the last values instead.
+        """
+        config_meta = self.meta[key]
+        if key in self._lent_keys:
+            remaining = config_meta.copy()
+            remove(remaining)
+            if not remaining.priorities:
+                self._lent_keys.discard(key)
+                del self.meta[key]
+                return
+        remove(config_meta)
+        if not config_meta.priorities:
+            del self.meta[key]
 
     def __getitem__(self, key: str) -> Any:
         """x.__getitem__(y) <==> x[y]"""
+        if self._sample_reads:
+            self._stats.record_read(key)
+        if self._tracking:
+            self._record_read(key)
+        if self._has_overlay:
+            overlay = self._overlay.get()
+            if overlay is not None and key in overlay:
+                return overlay[key]
         return self.meta[key].value
 
+    def _record_read(self, key: str) -> None:
+        reads = _computed_reads.get()
+        if reads is not None:
+            reads.add((self, key))
+
+    def _invalidate(self, key: str) -> None:
+        """Drop the computed values reading the key."""
+        global _write_version
+        _write_version += 1
+        if not self._dependents:
+            return
+        for ref, name in self._dependents.pop(key, ()):
+            owner = ref()
+            if owner is not None:
+                owner._computed.pop(name, None)
+                owner._invalidate(name)
+
+    def _compute(self, attribute: "computed") -> Any:
+        name = attribute.name
+        if self._tracking:
+            # the computed value reading the other one depends on it
+            self._record_read(name)
+        if self._shared_keys or (self._has_overlay and self._overlay.get() is not None):
+            # the changes of base config or overlay can not invalidate the cache
+            return attribute.function(self)
+        value = self._computed.get(name, _missing)
+        if value is not _missing:
+            return value
+
+        version = _write_version
+        reads: Set[Tuple[BaseConfig, str]] = set()
+        token = _computed_reads.set(reads)
+        with _tracking_lock:
+            BaseConfig._tracking += 1
+        try:
+            value = attribute.function(self)
+        finally:
+            with _tracking_lock:
+                BaseConfig._tracking -= 1
+            _computed_reads.reset(token)
+        if version == _write_version:
+            ref = weakref.ref(self)
+            for config, key in reads:
+                config._dependents.setdefault(key, set()).add((ref, name))
+            self._computed[name] = value
+        return value
+
     def items(self) -> List[Tuple[str, Any]]:  # type: ignore
-        return [(key, config_meta.value) for key, config_meta in self.meta.items()]
+        items = [(key, config_meta.value) for key, config_meta in self.meta.items()]
+        return self._apply_overlay(items)
+
+    def _apply_overlay(self, items: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+        overlay = self._overlay.get() if self._has_overlay else None
+        if not overlay:
+            return items
+        return [(key, overlay.get(key, value)) for key, value in items]
+
+    @contextmanager
+    def overlay(self, mapping: Mapping[str, Any]) -> Iterator["BaseConfig"]:
+        """Override the values in the current context (thread or task) only,
+        the other contexts and the values of every priority are not affected::
+
+            with config.overlay({"TEST": "tenant"}):
+                config.TEST  # "tenant"
+            config.TEST  # "test"
+        """
+        layer = dict(self._overlay.get() or {})
+        with ExitStack() as stack:
+            for key, value in mapping.items():
+                key, _, nested_key = key.partition(".")
+                if nested_key:
+                    value = {nested_key: value}
+                current = self.meta[key].value
+                if isinstance(current, BaseConfig) and isinstance(value, Mapping):
+                    stack.enter_context(current.overlay(value))
+                    continue
+                layer[key] = self.meta[key].field.validate(
+                    value, self.CONFIGALCHEMY_SETITEM_PRIORITY
+                )
+            with _overlay_lock:
+                self._overlays += 1
+                self._has_overlay = True
+            token = self._overlay.set(layer)
+            try:
+                yield self
+            finally:
+                self._overlay.reset(token)
+                with _overlay_lock:
+                    self._overlays -= 1
+                    # back to the fast path once the last overlay is left
+                    self._has_overlay = self._overlays > 0
+
+    def override(self, **kwargs: Any) -> ContextManager["BaseConfig"]:
+        """Keyword version of :meth:`overlay`::
+
+        with config.override(TEST="tenant"):
+            ...
+        """
+        return self.overlay(kwargs)
 
     def keys(self) -> KeysView[str]:
         return self.meta.keys()
@@ -231,7 +753,22 @@ class BaseConfig:
         self._set_value(k, v, priority=self.CONFIGALCHEMY_SETITEM_PRIORITY)
 
     def __delitem__(self, key) -> None:
-        del self.meta[key].items[-1]
+        self.delete(key)
+
+    def delete(self, key: str, priority: Optional[int] = None) -> None:
+        """Delete the last value of key set with the priority, the value of the highest
+        priority by default like ``del config[key]``. The key is deleted if there is
+        no value left::
+
+            config.delete("TEST", priority=config.CONFIGALCHEMY_SETITEM_PRIORITY)
+        """
+        if key not in self.meta:
+            raise KeyError(key)
+        if key in self._shared_keys:
+            self._unshare(key)
+        self._frozen = None
+        self._remove_from_meta(key, lambda meta: meta.pop(priority))
+        self._invalidate(key)
 
     def update(self, __m=None, **kwargs):
         if __m is None:
@@ -240,7 +777,7 @@ class BaseConfig:
 
     def get(self, key: str, default=None):
         if key in self.meta:
-            return self.meta[key].value
+            return self[key]
         else:
             return default
 
@@ -253,6 +790,36 @@ class BaseConfig:
     def __str__(self) -> str:
         return repr(self)
 
+    def to_dict(
+        self, mask_secrets: bool = False, history: bool = False
+    ) -> Dict[str, Any]:
+        """Return the values of config as plain dict in one pass.
+
+        :param mask_secrets: replace the value of :any:`SecretStr` with ``"**********"``.
+        :param history: dump the values of every priority as
+            ``{"value": value, "history": [{"priority": priority, "value": value,
+            "provenance": provenance}]}``, the provenance is only tracked with
+            ``CONFIG_ALCHEMY_VERBOSITY`` environment variable.
+        """
+        data: Dict[str, Any] = {}
+        for key, value in self.items():
+            value = _plain(value, mask_secrets, history)
+            if history:
+                config_meta = self.meta[key]
+                value = {
+                    "value": value,
+                    "history": [
+                        {
+                            "priority": item.priority,
+                            "value": _plain(item.value, mask_secrets, history),
+                            "provenance": item.setter and item.setter.to_dict(),
+                        }
+                        for item in config_meta.items
+                    ],
+                }
+            data[key] = value
+        return data
+
     def json(
         self,
         skipkeys: bool = False,
@@ -262,11 +829,33 @@ class BaseConfig:
         sort_keys: bool = False,
         indent: Optional[int] = None,
         separators: Optional[Tuple[str, str]] = None,
-        cls: Type[ConfigMetaJSONEncoder] = ConfigMetaJSONEncoder,
+        cls: Optional[Type["ConfigMetaJSONEncoder"]] = None,
+        mask_secrets: bool = False,
+        history: bool = False,
+        backend: str = "json",
     ) -> str:
+        """Serialize the config to JSON string, see :meth:`to_dict`.
+
+        Set ``backend="orjson"`` to serialize by `orjson` (ignoring the options of
+        :func:`json.dumps` except ``sort_keys``, ``indent`` is always 2 if given).
+        """
+        data = self.to_dict(mask_secrets=mask_secrets, history=history)
+        if backend == "orjson":
+            import orjson
+
+            option = 0
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(data, option=option).decode()
+        import json
+
+        from configalchemy.encoder import ConfigMetaJSONEncoder
+
         return json.dumps(
-            self.meta,
-            cls=cls,
+            data,
+            cls=cls or ConfigMetaJSONEncoder,
             skipkeys=skipkeys,
             ensure_ascii=ensure_ascii,
             check_circular=check_circular,
@@ -276,6 +865,70 @@ class BaseConfig:
             sort_keys=sort_keys,
         )
 
+    def dump(
+        self,
+        fp: TextIO,
+        chunk_size: int = 1 << 16,
+        mask_secrets: bool = False,
+        history: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Serialize the config to JSON and write to a file-like object in chunks of
+        about ``chunk_size`` characters, ``kwargs`` is the same as :meth:`json`.
+        """
+        from configalchemy.encoder import ConfigMetaJSONEncoder
+
+        encoder = kwargs.pop("cls", ConfigMetaJSONEncoder)(**kwargs)
+        buffer: List[str] = []
+        size = 0
+        for chunk in encoder.iterencode(
+            self.to_dict(mask_secrets=mask_secrets, history=history)
+        ):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                fp.write("".join(buffer))
+                buffer.clear()
+                size = 0
+        if buffer:
+            fp.write("".join(buffer))
+
+    def freeze(self) -> FrozenConfig:
+        """Return an immutable snapshot of the config with one slot per key.
+        The snapshot is cached and regenerated after the config changes,
+        except the snapshot with :meth:`overlay` or of derived config::
+
+            frozen = config.freeze()
+            frozen.TEST
+        """
+        if self._shared_keys or (self._has_overlay and self._overlay.get() is not None):
+            # the shared values may be changed by the base config
+            return self._freeze()
+        frozen = self._frozen
+        if frozen is None or any(
+            # the nested config is written directly
+            nested.freeze() is not nested_frozen
+            for nested, nested_frozen in self._frozen_nested
+        ):
+            self._frozen_nested = []
+            frozen = self._frozen = self._freeze(self._frozen_nested)
+        return frozen
+
+    def _freeze(
+        self, nested: Optional[List[Tuple["BaseConfig", FrozenConfig]]] = None
+    ) -> FrozenConfig:
+        items = [(key, value) for key, value in self.items() if key.isidentifier()]
+        keys = tuple(key for key, _ in items)
+        values = []
+        for _, value in items:
+            if isinstance(value, BaseConfig):
+                nested_frozen = value.freeze()
+                if nested is not None:
+                    nested.append((value, nested_frozen))
+                value = nested_frozen
+            values.append(freeze_json(value))
+        return frozen_class(keys)(tuple(values))
+
     @classmethod
     def __type_check__(cls, instance: Any) -> bool:
         return isinstance(instance, cls)
@@ -295,18 +948,93 @@ class BaseConfig:
         return instance
 
 
+def _timed(func: Callable[[], Any]) -> Tuple[float, Any]:
+    start = perf_counter()
+    result = func()
+    return perf_counter() - start, result
+
+
+def _plain(value: Any, mask_secrets: bool, history: bool) -> Any:
+    if isinstance(value, BaseConfig):
+        return value.to_dict(mask_secrets=mask_secrets, history=history)
+    if mask_secrets and isinstance(value, SecretStr):
+        return SECRET_MASK
+    return value
+
+
+class computed:
+    """The value derived from other keys, cached until one of the keys read by
+    the function changes::
+
+        class DefaultConfig(BaseConfig):
+            DB_HOST = "localhost"
+            DB_PORT = 5432
+
+            @computed
+            def DATABASE_URL(self) -> str:
+                return f"postgres://{self.DB_HOST}:{self.DB_PORT}"
+
+    The computed value is not a key of config, and it is evaluated on every access
+    in :meth:`BaseConfig.overlay` and of the derived config.
+    """
+
+    def __init__(self, function: Callable[[Any], Any]):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Optional[BaseConfig], type=None) -> Any:
+        if obj is None:
+            return self
+        if not obj._has_overlay and not obj._tracking:
+            value = obj._computed.get(self.name, _missing)
+            if value is not _missing:
+                return value
+        return obj._compute(self)
+
+    def __set__(self, obj: BaseConfig, value: Any) -> None:
+        raise AttributeError(f"{self.name} is computed and can not be set")
+
+
 class _ConfigAttribute:
-    def __init__(self, name: str, default_value: Any):
+    def __init__(self, name: str, default_value: Any, declared: bool = True):
         self._name = name
         self._default_value = default_value
+        self._declared = declared
 
     def __get__(self, obj: BaseConfig, type=None) -> Any:
         if obj is None:
             return self._default_value
         if self._name not in obj:
+            if not self._declared:
+                raise AttributeError(
+                    f"'{obj.__class__.__name__}' object has no attribute '{self._name}'"
+                )
             return self._default_value
         else:
             return obj[self._name]
 
     def __set__(self, instance: BaseConfig, value: Any) -> None:
         instance[self._name] = value
+
+
+def _set_attribute(cls: type, key: str, default_value: Any) -> None:
+    """Set the descriptor of key on the class unless it has one already, so that
+    the default of the declared key is kept and the key set at runtime is missing
+    once its values are removed.
+    """
+    if isinstance(cls.__dict__.get(key), _ConfigAttribute):
+        return
+    current = _missing
+    for base in cls.__mro__:
+        current = base.__dict__.get(key, _missing)
+        if current is not _missing:
+            break
+    if isinstance(current, _ConfigAttribute):
+        declared = current._declared
+    else:
+        declared = current is not _missing
+    setattr(cls, key, _ConfigAttribute(key, default_value, declared))
@@ -0,0 +1,404 @@
+"""The node-local agent owning the config and serving it to the processes on the node::
+
+    python -m configalchemy agent myapp.config.DefaultConfig -s /run/myapp/config.sock
+
+The agent loads the config from the sources (eg. Apollo) once per node, then serves
+the resolved values over the Unix domain socket. Every message is one line of JSON,
+the snapshot ``{"version": 1, "values": {"DB.HOST": "db"}}`` is sent on connect and
+followed by the diffs ``{"version": 2, "changes": {"DB.HOST": "new"}, "deleted": []}``.
+"""
+import errno
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type
+
+from configalchemy import BaseConfig
+from configalchemy.sources import DELETED, STREAMING, ConfigSource
+from configalchemy.stats import add_stats_hook, remove_stats_hook
+
+__all__ = ["ConfigAgent", "AgentSource", "AgentBaseConfig", "start_agent"]
+
+logger = logging.getLogger(__name__)
+
+
+def flatten(config: BaseConfig, prefix: str = "") -> Dict[str, Any]:
+    """Return the resolved values with the keys of nested config joined by ``.``."""
+    values: Dict[str, Any] = {}
+    for key, value in config.items():
+        if isinstance(value, BaseConfig):
+            values.update(flatten(value, f"{prefix}{key}."))
+        else:
+            values[f"{prefix}{key}"] = value
+    return values
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    # the values not supported by JSON are sent as str and typecast by the client
+    return json.dumps(message, default=str).encode() + b"\n"
+
+
+class ConfigAgent:
+    """Serve the snapshot and the changes of the loaded config over the Unix domain socket.
+
+    The changes are published after every source load of the process, and checked every
+    ``check_interval`` seconds for the values set directly.
+
+    :param config: the loaded config owned by the agent.
+    :param path: the path of Unix domain socket, only the owner of the agent can connect.
+    :param send_timeout: seconds to wait for a slow client before dropping it.
+    """
+
+    def __init__(
+        self,
+        config: BaseConfig,
+        path: str,
+        check_interval: float = 1.0,
+        send_timeout: float = 1.0,
+    ):
+        self.config = config
+        self.path = path
+        self.check_interval = check_interval
+        self.send_timeout = send_timeout
+        #: the version of the last published values
+        self.version = 0
+        self._values: Dict[str, Any] = {}
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        #: the (device, inode) of the socket created by this agent
+        self._socket_id: Optional[Tuple[int, int]] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Listen on the socket and start the daemon threads accepting the clients
+        and publishing the changes.
+        """
+        self._remove_stale_socket()
+        listener = self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        os.chmod(self.path, 0o600)
+        path_stat = os.stat(self.path)
+        self._socket_id = (path_stat.st_dev, path_stat.st_ino)
+        listener.listen()
+        listener.settimeout(self.check_interval)
+        self._values = flatten(self.config)
+        self.version = 1
+        self._stop.clear()
+        add_stats_hook(self._on_stats)
+        for target in (self._accept, self._watch):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Serving {self.config.__class__.__qualname__} on {self.path}")
+
+    def _remove_stale_socket(self) -> None:
+        """Remove the socket left by the last agent, refuse to start if the path is not
+        a socket or another agent is still serving on it.
+        """
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(errno.EEXIST, "Not a socket", self.path)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        probe.settimeout(self.send_timeout)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            # nobody is listening on the socket left by the last agent
+            os.unlink(self.path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, "Another agent is serving", self.path)
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            self.wait()
+        finally:
+            self.close()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the agent is closed, return ``False`` on timeout."""
+        return self._stop.wait(timeout)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._changed.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        if self._listener is not None:
+            remove_stats_hook(self._on_stats)
+            self._listener.close()
+            self._listener = None
+            self._unlink_socket()
+
+    def _unlink_socket(self) -> None:
+        """Remove the socket created by this agent unless it is replaced meanwhile."""
+        socket_id, self._socket_id = self._socket_id, None
+        try:
+            path_stat = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+        if (path_stat.st_dev, path_stat.st_ino) == socket_id:
+            os.unlink(self.path)
+
+    def _on_stats(self, event: str, data: Dict[str, Any]) -> None:
+        if event == "load":
+            self._changed.set()
+
+    def _accept(self) -> None:
+        assert self._listener is not None
+        while not self._stop.is_set():
+            try:
+                client, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self._stop.is_set():
+                    logger.exception(f"Failed to accept on {self.path}: {e}")
+                return
+            client.settimeout(self.send_timeout)
+            with self._lock:
+                message = {"version": self.version, "values": self._values}
+                if self._send(client, _encode(message)):
+                    self._clients.append(client)
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            self._changed.wait(self.check_interval)
+            self._changed.clear()
+            if not self._stop.is_set():
+                try:
+                    self.publish()
+                except Exception as e:
+                    logger.exception(f"Failed to publish on {self.path}: {e}")
+
+    def _send(self, client: socket.socket, data: bytes) -> bool:
+        try:
+            client.sendall(data)
+            return True
+        except OSError as e:
+            logger.warning(f"Drop the client of {self.path}: {e}")
+            client.close()
+            return False
+
+    def publish(self) -> bool:
+        """Send the changed values to the clients, return ``False`` if nothing changed."""
+        values = flatten(self.config)
+        with self._lock:
+            previous = self._values
+            changes = {
+                key: value
+                for key, value in values.items()
+                if key not in previous or previous[key] != value
+            }
+            deleted = [key for key in previous if key not in values]
+            if not changes and not deleted:
+                return False
+            self._values = values
+            self.version += 1
+            data = _encode(
+                {"version": self.version, "changes": changes, "deleted": deleted}
+            )
+            self._clients = [
+                client for client in self._clients if self._send(client, data)
+            ]
+        return True
+
+
+class AgentConnection:
+    """The connection to the agent reading one message per line."""
+
+    def __init__(self, path: str, timeout: float):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self._buffer = bytearray()
+
+    def receive(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the next message, ``None`` if there is no message in ``timeout`` seconds.
+
+        :raise ConnectionError: the agent is closed.
+        """
+        if timeout is not None:
+            self.sock.settimeout(timeout)
+        while True:
+            index = self._buffer.find(b"\n")
+            if index >= 0:
+                line = bytes(self._buffer[:index])
+                del self._buffer[: index + 1]
+                return json.loads(line)
+            try:
+                chunk = self.sock.recv(1 << 16)
+            except socket.timeout:
+                return None
+            if not chunk:
+                raise ConnectionError("the agent is closed")
+            self._buffer += chunk
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class AgentSource(ConfigSource):
+    """Load the snapshot from the agent by one read on connect, then apply the diffs
+    pushed by the agent after :meth:`BaseConfig.start_refresh`.
+
+    The snapshot is read again and compared with the cache after reconnecting.
+    """
+
+    name = "agent"
+    mode = STREAMING
+
+    def __init__(
+        self,
+        path: str,
+        priority: Optional[int] = None,
+        timeout: float = 5,
+        heartbeat: float = 1,
+        reconnect_delay: float = 1,
+        name: Optional[str] = None,
+    ):
+        super().__init__(priority=priority, name=name)
+        self.path = path
+        self.timeout = timeout
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        #: the last version applied
+        self.version = 0
+        self._connection: Optional[AgentConnection] = None
+
+    def describe(self, config: BaseConfig) -> str:
+        return self.path
+
+    def _connect(self) -> Dict[str, Any]:
+        self.close()
+        connection = AgentConnection(self.path, self.timeout)
+        try:
+            message = connection.receive()
+            if message is None:
+                raise ConnectionError(f"no snapshot in {self.timeout} seconds")
+        except Exception:
+            connection.close()
+            raise
+        self._connection = connection
+        self.version = message["version"]
+        return message["values"]
+
+    def load(self, config: BaseConfig) -> Optional[Dict[str, Any]]:
+        try:
+            return self._connect()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load from agent {self.path}: {e}")
+            return None
+
+    def stream(self, config: BaseConfig) -> Iterator[Mapping[str, Any]]:
+        while True:
+            try:
+                if self._connection is None:
+                    yield self._resync(self._connect())
+                    continue
+                message = self._connection.receive(self.heartbeat)
+                if message is None:
+                    yield {}
+                    continue
+                self.version = message["version"]
+                changes: Dict[str, Any] = dict(message["changes"])
+                changes.update({key: DELETED for key in message["deleted"]})
+                yield changes
+            except Exception as e:
+                logger.warning(f"Reconnect to agent {self.path}: {e}")
+                self.close()
+                yield {}
+                time.sleep(self.reconnect_delay)
+
+    def _resync(self, mapping: Dict[str, Any]) -> Dict[str, Any]:
+        previous = self._cache or {}
+        changes: Dict[str, Any] = {
+            key: value
+            for key, value in mapping.items()
+            if previous.get(key, DELETED) != value
+        }
+        changes.update({key: DELETED for key in previous if key not in mapping})
+        return changes
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class AgentBaseConfig(BaseConfig):
+    """Load the config from the agent listening on ``AGENT_SOCKET``, and apply the
+    changes pushed by the agent after :meth:`start_refresh`::
+
+        class DefaultConfig(AgentBaseConfig):
+            AGENT_SOCKET = "/run/myapp/config.sock"
+
+        config = DefaultConfig()
+        config.start_refresh()
+
+    The config is loaded from :meth:`BaseConfig.sources` as usual if the socket does
+    not exist, eg. in the agent itself or without the agent in development.
+    """
+
+    AGENT_SOCKET = ""
+    AGENT_VALUE_PRIORITY = 50
+    AGENT_TIMEOUT = 5.0
+    AGENT_HEARTBEAT = 1.0
+    AGENT_RECONNECT_DELAY = 1.0
+
+    _use_agent = True
+
+    def sources(self) -> List[ConfigSource]:
+        if self._use_agent and self.AGENT_SOCKET and os.path.exists(self.AGENT_SOCKET):
+            return [
+                AgentSource(
+                    self.AGENT_SOCKET,
+                    priority=self.AGENT_VALUE_PRIORITY,
+                    timeout=self.AGENT_TIMEOUT,
+                    heartbeat=self.AGENT_HEARTBEAT,
+                    reconnect_delay=self.AGENT_RECONNECT_DELAY,
+                )
+            ]
+        return super().sources()
+
+
+def start_agent(
+    cls: Type[BaseConfig], path: str, check_interval: float = 1.0
+) -> ConfigAgent:
+    """Load the config from the sources, start refreshing it and the long poll of
+    :any:`ApolloBaseConfig`, then start the agent serving it on ``path``.
+    """
+    from configalchemy.contrib.apollo import ApolloBaseConfig
+
+    config = cls.__new__(cls)
+    if isinstance(config, AgentBaseConfig):
+        # the agent loads from the sources instead of the socket it serves on
+        config._use_agent = False
+    config.__init__()  # type: ignore
+    config.start_refresh()
+    if isinstance(config, ApolloBaseConfig):
+        config.start_long_poll()
+    agent = ConfigAgent(config, path, check_interval=check_interval)
+    agent.start()
+    return agent
@@ -1,13 +1,18 @@
 import json
 import logging
+import os
 import threading
 import time
+import weakref
 from http import HTTPStatus
-from typing import Dict
-
-import requests
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from configalchemy import BaseConfig, ConfigType
+from configalchemy.meta import config_source
+from configalchemy.utils import register_after_fork
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
 
 time_counter = time.time
 
@@ -32,19 +37,40 @@ class ApolloBaseConfig(BaseConfig):
     APOLLO_EXTRA_NAMESPACE_PRIORITY = 9
 
     APOLLO_LONG_POLL_TIMEOUT = 80
+    #: seconds to wait for the configurations of namespace
+    APOLLO_ACCESS_TIMEOUT = 10
+    #: set to ``False`` if only the parent process should keep polling after fork,
+    #: eg. the workers access config from shared memory.
+    APOLLO_LONG_POLL_AFTER_FORK = True
+    #: poll by the process-wide :class:`ApolloPoller` shared with the other configs
+    APOLLO_SHARED_POLLER = False
 
     def __init__(self):
         self.apollo_notification_map: Dict[str, ConfigType] = {}
+        self.apollo_long_poll_thread: Optional[threading.Thread] = None
         super().__init__()
 
     def start_long_poll(self):
         logger.info("start long poll")
-        thread = threading.Thread(target=self.long_poll)
-        thread.daemon = True
-        thread.start()
+        if self.APOLLO_SHARED_POLLER:
+            thread = shared_poller().register(self)
+        else:
+            thread = threading.Thread(target=self.long_poll)
+            thread.daemon = True
+            thread.start()
+        self.apollo_long_poll_thread = thread
+        register_after_fork(self)
         return thread
 
+    def __after_fork__(self):
+        # threads do not survive fork
+        self.apollo_long_poll_thread = None
+        if self.APOLLO_LONG_POLL_AFTER_FORK:
+            self.start_long_poll()
+
     def _access_config_by_namespace(self, namespace: str) -> ConfigType:
+        import requests
+
         route = "configs"
         if self.APOLLO_USING_CACHE:
             route = "configfiles"
@@ -53,7 +79,7 @@ class ApolloBaseConfig(BaseConfig):
             f"{self.APOLLO_CLUSTER}/{namespace}"
         )
         logger.info(f"Access apollo server url: {url}")
-        response = requests.get(url)
+        response = requests.get(url, timeout=self.APOLLO_ACCESS_TIMEOUT)
         if response.ok:
             data = response.json()
             self.apollo_notification_map.setdefault(data["namespaceName"], {"id": -1})
@@ -65,24 +91,73 @@ class ApolloBaseConfig(BaseConfig):
         else:
             raise ConfigException(f"loading config failed: {url}")
 
+    def _update_from_namespace(
+        self,
+        namespace: str,
+        priority: int,
+        configurations: Optional[ConfigType] = None,
+    ) -> bool:
+        with config_source("apollo", namespace), self._record_source("apollo"):
+            if configurations is None:
+                configurations = self._access_config_by_namespace(namespace)
+            else:
+                self.apollo_notification_map.setdefault(namespace, {"id": -1})
+                self.apollo_notification_map[namespace]["data"] = configurations
+            return self.from_mapping(configurations, priority=priority)
+
     def configuration_function(self) -> ConfigType:
-        self.from_mapping(
-            self._access_config_by_namespace(self.APOLLO_NAMESPACE),
-            priority=self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY,
+        self._update_from_namespace(
+            self.APOLLO_NAMESPACE, priority=self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY
         )
         for namespace in self.APOLLO_EXTRA_NAMESPACE.split(","):
             if namespace:
-                self.from_mapping(
-                    self._access_config_by_namespace(namespace),
-                    priority=self.APOLLO_EXTRA_NAMESPACE_PRIORITY,
+                self._update_from_namespace(
+                    namespace, priority=self.APOLLO_EXTRA_NAMESPACE_PRIORITY
                 )
         return {}
 
+    def _namespace_priority(self, namespace: str) -> int:
+        if namespace == self.APOLLO_NAMESPACE:
+            return self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY
+        return self.APOLLO_EXTRA_NAMESPACE_PRIORITY
+
+    def apollo_notifications(self) -> List[Dict[str, Any]]:
+        """Return the notifications of the namespaces watched by the config."""
+        # the namespaces are not accessed yet if the config is loaded from bundle
+        for namespace in [self.APOLLO_NAMESPACE] + self.APOLLO_EXTRA_NAMESPACE.split(
+            ","
+        ):
+            if namespace:
+                self.apollo_notification_map.setdefault(namespace, {"id": -1})
+        return [
+            {"namespaceName": key, "notificationId": value["id"]}
+            for key, value in list(self.apollo_notification_map.items())
+        ]
+
+    def apply_notification(
+        self, entry: Dict[str, Any], configurations: Optional[ConfigType] = None
+    ) -> ConfigType:
+        """Reload the namespace changed in the notification, or apply the
+        ``configurations`` of namespace already accessed by another config.
+        Return the configurations of namespace.
+        """
+        logger.info(
+            "%s has changes: notificationId=%d"
+            % (entry["namespaceName"], entry["notificationId"])
+        )
+        namespace = entry["namespaceName"]
+        self._update_from_namespace(
+            namespace, self._namespace_priority(namespace), configurations
+        )
+        notification = self.apollo_notification_map[namespace]
+        notification["id"] = entry["notificationId"]
+        return notification.get("data", {})
+
     def long_poll_from_apollo(self):
+        import requests
+
         url = f"{self.APOLLO_SERVER_URL}/notifications/v2/"
-        notifications = []
-        for key, value in self.apollo_notification_map.items():
-            notifications.append({"namespaceName": key, "notificationId": value["id"]})
+        notifications = self.apollo_notifications()
 
         r = requests.get(
             url=url,
@@ -97,26 +172,8 @@ class ApolloBaseConfig(BaseConfig):
         if r.status_code == HTTPStatus.NOT_MODIFIED:
             logger.info("Apollo No change, loop...")
         elif r.status_code == HTTPStatus.OK:
-            data = r.json()
-            for entry in data:
-                logger.info(
-                    "%s has changes: notificationId=%d"
-                    % (entry["namespaceName"], entry["notificationId"])
-                )
-                namespace = entry["namespaceName"]
-                if namespace == self.APOLLO_NAMESPACE:
-                    self.from_mapping(
-                        self._access_config_by_namespace(namespace),
-                        priority=self.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY,
-                    )
-                else:
-                    self.from_mapping(
-                        self._access_config_by_namespace(namespace),
-                        priority=self.APOLLO_EXTRA_NAMESPACE_PRIORITY,
-                    )
-                self.apollo_notification_map[entry["namespaceName"]]["id"] = entry[
-                    "notificationId"
-                ]
+            for entry in r.json():
+                self.apply_notification(entry)
         else:  # pragma: no cover
             raise ConfigException(f"{url} : unexpected status {r.status_code}")
 
@@ -127,3 +184,245 @@ class ApolloBaseConfig(BaseConfig):
                 self.long_poll_from_apollo()
             except ConfigException:
                 time.sleep(5)
+
+
+#: (server url, app id, cluster)
+PollKey = Tuple[str, str, str]
+
+
+def _http_get(
+    loop: "asyncio.AbstractEventLoop",
+    url: str,
+    params: Dict[str, str],
+    timeout: float,
+) -> "asyncio.Future[Any]":
+    """Send the GET request by ``requests`` on a daemon thread like
+    :meth:`ApolloBaseConfig.long_poll`, return the future of response on ``loop``.
+    The request left by cancellation neither occupies the executor nor blocks the exit.
+    """
+    import requests
+
+    future = loop.create_future()
+
+    def resolve(response: Any, error: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def run() -> None:
+        response, error = None, None
+        try:
+            response = requests.get(url, params=params, timeout=timeout)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(resolve, response, error)
+        except RuntimeError:
+            # the poller is closed
+            pass
+
+    threading.Thread(target=run, name="configalchemy-apollo-poll", daemon=True).start()
+    return future
+
+
+class ApolloPoller:
+    """Long poll the notifications of the registered configs from one thread running
+    an event loop, the requests are sent by ``requests``. The namespaces of the configs with the same (server, app, cluster)
+    are merged into one request, and every change is applied to the configs watching
+    the namespace::
+
+        class DefaultConfig(ApolloBaseConfig):
+            APOLLO_SHARED_POLLER = True
+
+        config.start_long_poll()
+
+    The configs are referenced weakly, and the thread is restarted on the next
+    registration after fork.
+    """
+
+    def __init__(self, retry_delay: float = 5):
+        self.retry_delay = retry_delay
+        self._groups: Dict[PollKey, "weakref.WeakSet[ApolloBaseConfig]"] = {}
+        self._tasks: Dict[PollKey, "asyncio.Task"] = {}
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def __after_fork__(self) -> None:
+        # the thread does not survive fork, and the lock may be held by it at fork time
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._tasks = {}
+        self._loop = self._thread = None
+
+    @staticmethod
+    def key(config: ApolloBaseConfig) -> PollKey:
+        return (config.APOLLO_SERVER_URL, config.APOLLO_APP_ID, config.APOLLO_CLUSTER)
+
+    def register(self, config: ApolloBaseConfig) -> threading.Thread:
+        """Poll the namespaces of config, return the thread of poller."""
+        key = self.key(config)
+        with self._lock:
+            self._groups.setdefault(key, weakref.WeakSet()).add(config)
+            if self._thread is None:
+                self._start()
+            assert self._loop is not None and self._thread is not None
+            # restart the request of group to include the new namespaces
+            self._loop.call_soon_threadsafe(self._restart, key)
+            return self._thread
+
+    def unregister(self, config: ApolloBaseConfig) -> None:
+        key = self.key(config)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                return
+            group.discard(config)
+            if not group:
+                del self._groups[key]
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._restart, key)
+
+    def _start(self) -> None:
+        import asyncio
+
+        loop = self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=loop.run_forever, name="configalchemy-apollo", daemon=True
+        )
+        self._thread.start()
+
+    def _restart(self, key: PollKey) -> None:
+        assert self._loop is not None
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+        if key in self._groups:
+            self._tasks[key] = self._loop.create_task(self._poll_group(key))
+
+    def notifications(self, key: PollKey) -> Dict[str, int]:
+        """Return the merged notification ids of the group, the lowest id of the
+        namespace is polled so that every config watching it is notified.
+        """
+        with self._lock:
+            configs = list(self._groups.get(key, ()))
+        merged: Dict[str, int] = {}
+        for config in configs:
+            for notification in config.apollo_notifications():
+                namespace = notification["namespaceName"]
+                merged[namespace] = min(
+                    merged.get(namespace, notification["notificationId"]),
+                    notification["notificationId"],
+                )
+        return merged
+
+    def dispatch(self, key: PollKey, entries: List[Dict[str, Any]]) -> None:
+        """Apply the changed namespaces to the configs of group watching them,
+        every namespace is accessed once for the group.
+        """
+        with self._lock:
+            configs = list(self._groups.get(key, ()))
+        for entry in entries:
+            configurations: Optional[ConfigType] = None
+            for config in configs:
+                current = config.apollo_notification_map.get(entry["namespaceName"])
+                if current is None or current["id"] == entry["notificationId"]:
+                    continue
+                try:
+                    configurations = config.apply_notification(entry, configurations)
+                except Exception as e:
+                    logger.exception(f"Failed to apply {entry} to {config!r}: {e}")
+
+    async def _poll_group(self, key: PollKey) -> None:
+        import asyncio
+
+        import requests
+
+        loop = asyncio.get_event_loop()
+        server_url, app_id, cluster = key
+        url = f"{server_url}/notifications/v2/"
+        while True:
+            with self._lock:
+                configs = list(self._groups.get(key, ()))
+            if not configs:
+                return
+            timeout = max(config.APOLLO_LONG_POLL_TIMEOUT for config in configs)
+            notifications = [
+                {"namespaceName": namespace, "notificationId": notification_id}
+                for namespace, notification_id in self.notifications(key).items()
+            ]
+            del configs
+            params = {
+                "appId": app_id,
+                "cluster": cluster,
+                "notifications": json.dumps(notifications, ensure_ascii=False),
+            }
+            try:
+                response = await _http_get(loop, url, params, timeout)
+                status = response.status_code
+                if status == HTTPStatus.OK:
+                    # accessing the namespaces blocks, keep the loop polling
+                    await loop.run_in_executor(
+                        None, self.dispatch, key, response.json()
+                    )
+                elif status != HTTPStatus.NOT_MODIFIED:
+                    raise ConfigException(f"{url} : unexpected status {status}")
+            except asyncio.CancelledError:
+                raise
+            except requests.Timeout:
+                logger.debug(f"Apollo long poll of {key} timed out")
+            except Exception as e:
+                logger.warning(f"Failed to poll {key}: {e!r}")
+                await asyncio.sleep(self.retry_delay)
+
+    def close(self) -> None:
+        """Stop polling and the thread."""
+        import asyncio
+
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._groups = {}
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def cancel() -> None:
+            tasks = list(self._tasks.values())
+            self._tasks = {}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_shared_poller: Optional[ApolloPoller] = None
+_shared_poller_lock = threading.Lock()
+
+
+def shared_poller() -> ApolloPoller:
+    """Return the process-wide poller of the configs with ``APOLLO_SHARED_POLLER``."""
+    global _shared_poller
+    poller = _shared_poller
+    if poller is not None:
+        return poller
+    with _shared_poller_lock:
+        if _shared_poller is None:
+            _shared_poller = ApolloPoller()
+        return _shared_poller
+
+
+def _reset_shared_poller_lock() -> None:
+    global _shared_poller_lock
+    _shared_poller_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_poller_lock)
@@ -0,0 +1,240 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from configalchemy import BaseConfig
+from configalchemy.sources import DELETED, STREAMING, ConfigSource
+
+logger = logging.getLogger(__name__)
+
+PUT = "PUT"
+DELETE = "DELETE"
+
+
+class KVEvent(NamedTuple):
+    type: str
+    key: str
+    value: Optional[str]
+    revision: int
+
+
+class KVConnectionError(Exception):
+    ...
+
+
+class RevisionCompacted(Exception):
+    def __init__(self, compact_revision: int):
+        self.compact_revision = compact_revision
+        super().__init__(f"revision is compacted: {compact_revision}")
+
+
+class KVStore:
+    """The interface of etcd/Consul-style key-value store with revisions.
+
+    Adapt the client of your store by implementing :meth:`range` and :meth:`watch`.
+    """
+
+    def range(self, prefix: str) -> Tuple[int, Dict[str, str]]:
+        """Return the current revision and the values of keys with the prefix."""
+        raise NotImplementedError
+
+    def watch(
+        self, prefix: str, start_revision: int, timeout: Optional[float] = None
+    ) -> Iterator[List[KVEvent]]:
+        """Yield the events of keys with the prefix since the start revision,
+        an empty list if there is no event in ``timeout`` seconds.
+
+        :raise RevisionCompacted: the start revision is compacted.
+        :raise KVConnectionError: the connection is lost.
+        """
+        raise NotImplementedError
+
+
+class MemoryKVStore(KVStore):
+    """The in-process key-value store for tests and local development."""
+
+    def __init__(self):
+        self.revision = 0
+        self.compact_revision = 0
+        self._data: Dict[str, str] = {}
+        self._events: List[KVEvent] = []
+        self._revisions: List[int] = []
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def put(self, key: str, value: str) -> int:
+        return self.commit({key: value})
+
+    def delete(self, key: str) -> int:
+        return self.commit({key: None})
+
+    def commit(self, changes: Mapping[str, Optional[str]]) -> int:
+        """Put or delete (with ``None`` value) the keys in one revision."""
+        with self._condition:
+            self.revision += 1
+            for key, value in changes.items():
+                if value is None:
+                    if self._data.pop(key, None) is None:
+                        continue
+                    event = KVEvent(DELETE, key, None, self.revision)
+                else:
+                    self._data[key] = value
+                    event = KVEvent(PUT, key, value, self.revision)
+                self._events.append(event)
+                self._revisions.append(self.revision)
+            self._condition.notify_all()
+            return self.revision
+
+    def compact(self, revision: int) -> None:
+        with self._condition:
+            index = bisect.bisect_right(self._revisions, revision)
+            del self._events[:index]
+            del self._revisions[:index]
+            self.compact_revision = revision
+
+    def disconnect(self) -> None:
+        """Break the active watches to simulate the lost connection."""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def range(self, prefix: str) -> Tuple[int, Dict[str, str]]:
+        with self._condition:
+            return (
+                self.revision,
+                {
+                    key: value
+                    for key, value in self._data.items()
+                    if key.startswith(prefix)
+                },
+            )
+
+    def watch(
+        self, prefix: str, start_revision: int, timeout: Optional[float] = None
+    ) -> Iterator[List[KVEvent]]:
+        generation = self._generation
+        while True:
+            with self._condition:
+                if start_revision <= self.compact_revision:
+                    raise RevisionCompacted(self.compact_revision)
+                if start_revision > self.revision:
+                    self._condition.wait(timeout)
+                if generation != self._generation:
+                    raise KVConnectionError("watch is disconnected")
+                index = bisect.bisect_left(self._revisions, start_revision)
+                events = [
+                    event
+                    for event in self._events[index:]
+                    if event.key.startswith(prefix)
+                ]
+                start_revision = max(start_revision, self.revision + 1)
+            yield events
+
+
+class KVSource(ConfigSource):
+    """Load the keys with the prefix by one range read, then watch from the last
+    revision and apply only the changed keys. The key ``prefix/db/host`` is applied
+    as ``DB.HOST``.
+
+    The watch resumes from the last revision after reconnecting, and the keys are
+    read again and compared with the cache if the revision is compacted.
+    """
+
+    name = "kv"
+    mode = STREAMING
+
+    def __init__(
+        self,
+        store: KVStore,
+        prefix: str = "",
+        priority: Optional[int] = None,
+        watch_timeout: float = 1,
+        reconnect_delay: float = 1,
+        name: Optional[str] = None,
+    ):
+        super().__init__(priority=priority, name=name)
+        self.store = store
+        self.prefix = prefix
+        self.watch_timeout = watch_timeout
+        self.reconnect_delay = reconnect_delay
+        #: the last revision applied
+        self.revision = 0
+
+    def describe(self, config: BaseConfig) -> str:
+        return self.prefix
+
+    def config_key(self, key: str) -> str:
+        return key[len(self.prefix) :].strip("/").replace("/", ".").upper()
+
+    def load(self, config: BaseConfig) -> Dict[str, str]:
+        self.revision, data = self.store.range(self.prefix)
+        return {self.config_key(key): value for key, value in data.items()}
+
+    def stream(self, config: BaseConfig) -> Iterator[Mapping[str, object]]:
+        while True:
+            try:
+                for events in self.store.watch(
+                    self.prefix, self.revision + 1, timeout=self.watch_timeout
+                ):
+                    changes: Dict[str, object] = {}
+                    for event in events:
+                        key = self.config_key(event.key)
+                        changes[key] = DELETED if event.type == DELETE else event.value
+                        self.revision = max(self.revision, event.revision)
+                    yield changes
+            except RevisionCompacted as e:
+                logger.warning(f"Resync {self.prefix!r} from {self.store}: {e}")
+                yield self._resync(config)
+            except Exception as e:
+                logger.warning(
+                    f"Reconnect to {self.store} from revision {self.revision + 1}: {e}"
+                )
+                yield {}
+                time.sleep(self.reconnect_delay)
+
+    def _resync(self, config: BaseConfig) -> Dict[str, object]:
+        mapping = self.load(config)
+        previous = self._cache or {}
+        changes: Dict[str, object] = {
+            key: value
+            for key, value in mapping.items()
+            if previous.get(key, DELETED) != value
+        }
+        changes.update({key: DELETED for key in previous if key not in mapping})
+        return changes
+
+
+class KVBaseConfig(BaseConfig):
+    """Load the keys with ``KV_PREFIX`` from the store returned by :meth:`kv_store`,
+    and apply the changes after :meth:`start_refresh`::
+
+        class DefaultConfig(KVBaseConfig):
+            KV_PREFIX = "/my_app/"
+
+            def kv_store(self):
+                return EtcdStore(...)
+
+        config = DefaultConfig()
+        config.start_refresh()
+    """
+
+    KV_PREFIX = ""
+    KV_VALUE_PRIORITY = 22
+    KV_WATCH_TIMEOUT = 1.0
+    KV_RECONNECT_DELAY = 1.0
+
+    def kv_store(self) -> KVStore:
+        raise NotImplementedError
+
+    def sources(self) -> List[ConfigSource]:
+        return super().sources() + [
+            KVSource(
+                self.kv_store(),
+                prefix=self.KV_PREFIX,
+                priority=self.KV_VALUE_PRIORITY,
+                watch_timeout=self.KV_WATCH_TIMEOUT,
+                reconnect_delay=self.KV_RECONNECT_DELAY,
+            )
+        ]
@@ -0,0 +1,250 @@
+import logging
+import pickle
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Optional, Set, Tuple
+
+from configalchemy import BaseConfig
+from configalchemy.utils import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+#: version (unsigned long long) + payload size (unsigned long long)
+HEADER = struct.Struct("QQ")
+
+#: the segments created by this process or its parent
+_created: Set[str] = set()
+
+
+class SharedMemoryException(Exception):
+    ...
+
+
+class SharedConfigSegment:
+    """A shared memory segment holding the pickled resolved values with a version counter.
+
+    The version is odd while the leader is writing, readers retry until they read
+    the same even version before and after unpickling the payload (seqlock).
+    The payload is unpickled straight from the segment without an intermediate copy,
+    but every reader still holds its own unpickled values.
+    """
+
+    def __init__(self, name: str, size: int = 0, create: bool = False):
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=size + HEADER.size if create else 0
+        )
+        if create:
+            _created.add(self.shm.name)
+        elif self.shm.name not in _created:
+            # only the creator owns the segment, avoid unlinking it on worker exit.
+            resource_tracker.unregister(self.shm._name, "shared_memory")  # type: ignore
+
+    @property
+    def buf(self) -> memoryview:
+        buf = self.shm.buf
+        if buf is None:
+            raise SharedMemoryException(f"shared memory {self.shm.name} is closed")
+        return buf
+
+    @property
+    def version(self) -> int:
+        return HEADER.unpack_from(self.buf, 0)[0]
+
+    def publish(self, values: Dict[str, Any]) -> int:
+        payload = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) + HEADER.size > self.shm.size:
+            raise SharedMemoryException(
+                f"{len(payload)} bytes can not fit in shared memory {self.shm.name}"
+            )
+        buf = self.buf
+        version = self.version
+        HEADER.pack_into(buf, 0, version + 1, 0)
+        buf[HEADER.size : HEADER.size + len(payload)] = payload
+        HEADER.pack_into(buf, 0, version + 2, len(payload))
+        return version + 2
+
+    def read(self, timeout: float = 1.0) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return the version and the values, retry with backoff while the leader
+        is writing.
+
+        :raise SharedMemoryException: no consistent payload in ``timeout`` seconds,
+            eg. the leader died while writing.
+        """
+        buf = self.buf
+        deadline = time.monotonic() + timeout
+        delay = 0.0
+        while True:
+            version, size = HEADER.unpack_from(buf, 0)
+            if version == 0:
+                return version, None
+            if version % 2 == 0:
+                try:
+                    with buf[HEADER.size : HEADER.size + size] as payload:
+                        values = pickle.loads(payload)
+                except Exception:
+                    # the payload is overwritten while unpickling
+                    values = None
+                if self.version == version and values is not None:
+                    return version, values
+            if time.monotonic() > deadline:
+                raise SharedMemoryException(
+                    f"no consistent payload in shared memory {self.shm.name}"
+                )
+            time.sleep(delay)
+            delay = min(max(delay * 2, 0.0001), 0.01)
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+        _created.discard(self.shm.name)
+
+
+def resolve(config: BaseConfig) -> Dict[str, Any]:
+    return {
+        key: resolve(value) if isinstance(value, BaseConfig) else value
+        for key, value in config.items()
+    }
+
+
+class SharedMemoryBaseConfig(BaseConfig):
+    """The leader loads the config from all sources and publishes the resolved values
+    into the shared memory segment, and the workers load from the segment only::
+
+        class DefaultConfig(SharedMemoryBaseConfig):
+            SHARED_MEMORY_NAME = "my_app_config"
+
+        class LeaderConfig(DefaultConfig):
+            SHARED_MEMORY_LEADER = True
+
+        # in master process
+        leader = LeaderConfig()
+        # in worker processes
+        config = DefaultConfig()
+    """
+
+    SHARED_MEMORY_NAME = ""
+    SHARED_MEMORY_SIZE = 1 << 20
+    SHARED_MEMORY_LEADER = False
+    SHARED_MEMORY_VALUE_PRIORITY = 50
+    #: seconds to retry reading while the leader is writing
+    SHARED_MEMORY_READ_TIMEOUT = 1.0
+
+    def __init__(self):
+        self._prepare()
+        self.shared_memory_version = 0
+        #: the last values read from shared memory
+        self.shared_memory_values: Dict[str, Any] = {}
+        self._shared_memory_lock = threading.RLock()
+        self._shared_memory_refreshing = False
+        self.shared_memory_segment: Optional[SharedConfigSegment] = None
+        self.shared_memory_leader = self.SHARED_MEMORY_LEADER
+        if self.shared_memory_leader:
+            super().__init__()
+            self.shared_memory_segment = SharedConfigSegment(
+                self.SHARED_MEMORY_NAME, size=self.SHARED_MEMORY_SIZE, create=True
+            )
+            self.publish()
+            register_after_fork(self)
+        else:
+            self._setup()
+            self.shared_memory_segment = SharedConfigSegment(self.SHARED_MEMORY_NAME)
+            self.refresh_from_shared_memory()
+            self._enable_stats()
+
+    async def _async_load(self) -> None:
+        if self.shared_memory_leader:
+            await super()._async_load()
+            self.publish()
+
+    def __after_fork__(self):
+        # the leader inherited by the child process acts as a worker
+        self.shared_memory_leader = False
+        # the lock may be held by a thread not existing in the child process
+        self._shared_memory_lock = threading.RLock()
+        self._shared_memory_refreshing = False
+
+    def publish(self) -> int:
+        """Publish the resolved values into shared memory by the leader."""
+        assert self.shared_memory_segment is not None
+        self.shared_memory_version = self.shared_memory_segment.publish(resolve(self))
+        logger.info(f"Published config version: {self.shared_memory_version}")
+        return self.shared_memory_version
+
+    def refresh_from_shared_memory(self) -> bool:
+        """Updates the values in the config from shared memory if the version changed."""
+        segment = self.shared_memory_segment
+        if segment is None or segment.version == self.shared_memory_version:
+            return False
+        with self._shared_memory_lock:
+            # the readers of other threads wait for the refresh, and the reads
+            # while applying the values do not refresh again
+            if (
+                self._shared_memory_refreshing
+                or segment.version == self.shared_memory_version
+            ):
+                return False
+            self._shared_memory_refreshing = True
+            try:
+                return self._refresh_from_segment(segment)
+            finally:
+                self._shared_memory_refreshing = False
+
+    def _refresh_from_segment(self, segment: SharedConfigSegment) -> bool:
+        try:
+            version, values = segment.read(
+                super().__getitem__("SHARED_MEMORY_READ_TIMEOUT")
+            )
+        except SharedMemoryException as e:
+            logger.warning(f"Keep the config version {self.shared_memory_version}: {e}")
+            return False
+        if values is None:
+            return False
+        priority = super().__getitem__("SHARED_MEMORY_VALUE_PRIORITY")
+        previous = self.shared_memory_values
+        changed = {
+            key: value
+            for key, value in values.items()
+            if key not in previous or previous[key] != value
+        }
+        with self._record_source("shared_memory"):
+            # only the changed keys and the keys deleted by the leader are removed
+            for key in [key for key in previous if key not in values] + [
+                key for key in changed if key in previous
+            ]:
+                self._remove_value(key, priority)
+            self.from_mapping(changed, priority=priority)
+        self.shared_memory_values = values
+        self.shared_memory_version = version
+        return True
+
+    def from_mapping(self, *mappings, priority: int) -> bool:
+        super().from_mapping(*mappings, priority=priority)
+        if self.shared_memory_leader and self.shared_memory_segment is not None:
+            self.publish()
+        return True
+
+    def __setitem__(self, k, v) -> None:
+        super().__setitem__(k, v)
+        if self.shared_memory_leader and self.shared_memory_segment is not None:
+            self.publish()
+
+    def delete(self, key: str, priority: Optional[int] = None) -> None:
+        super().delete(key, priority)
+        if self.shared_memory_leader and self.shared_memory_segment is not None:
+            self.publish()
+
+    def __getitem__(self, key: str) -> Any:
+        if not self.shared_memory_leader:
+            self.refresh_from_shared_memory()
+        return super().__getitem__(key)
+
+    def close(self) -> None:
+        if self.shared_memory_segment is not None:
+            self.shared_memory_segment.close()
+            if self.shared_memory_leader:
+                self.shared_memory_segment.unlink()
+            self.shared_memory_segment = None
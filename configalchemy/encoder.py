@@ -0,0 +1,11 @@
+from json import JSONEncoder
+from typing import Any
+
+from configalchemy.meta import ConfigMeta
+
+
+class ConfigMetaJSONEncoder(JSONEncoder):
+    def default(self, o) -> Any:
+        if isinstance(o, ConfigMeta):
+            return o.value
+        return super().default(o)
@@ -1,6 +1,7 @@
-from typing import Any, Union, Callable
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from weakref import WeakKeyDictionary
 
-from configalchemy.types import DEFAULT_TYPE_CAST
+from configalchemy.types import DEFAULT_TYPE_CAST, Deferred
 
 
 class ValidateException(Exception):
@@ -24,6 +25,7 @@ class Field:
         "name",
         "annotation",
         "value_type",
+        "cast_type",
         "default_value",
         "type_check",
         "typecast",
@@ -33,9 +35,13 @@ class Field:
         self.name = name
         self.annotation = annotation
         self.default_value = default_value
-        self.value_type = type(default_value)
-        self.type_check: Callable[[Any], bool] = self._type_check
-        self.typecast: Callable[[Any, int], Any] = self._typecast
+        self.value_type: Any = type(default_value)
+        #: the type to typecast by default
+        self.cast_type: Any = self.value_type
+        #: ``None`` to check by ``isinstance(value, value_type)``
+        self.type_check: Optional[Callable[[Any], bool]] = None
+        #: ``None`` to typecast by ``cast_type(value)``
+        self.typecast: Optional[Callable[[Any, int], Any]] = None
 
         self.prepare()
 
@@ -60,20 +66,72 @@ class Field:
             return
         if origin is Union:
             self.value_type = self.annotation.__args__
-            self.typecast = lambda x, p: self.value_type[0](x)
+            self.cast_type = self.value_type[0]
             return
 
-    def validate(self, value: Any, priority: int = 0) -> Any:
-        if self.type_check(value):
+    def validate(self, value: Any, priority: int = 0, defer: bool = False) -> Any:
+        """Return the value typecast if necessary. The :any:`Deferred` value returned
+        by ``__typecast__`` is only kept if ``defer`` is true, otherwise it is resolved.
+        """
+        type_check = self.type_check
+        if (
+            isinstance(value, self.value_type)
+            if type_check is None
+            else type_check(value)
+        ):
             return value
         else:
+            typecast = self.typecast
             try:
-                return self.typecast(value, priority)
+                if typecast is None:
+                    return self.cast_type(value)
+                result = typecast(value, priority)
+                if not defer and type(result) is Deferred:
+                    return result.resolve()
+                return result
             except Exception as e:
                 raise ValidateException(self.name, value) from e
 
-    def _type_check(self, value: Any) -> bool:
-        return isinstance(value, self.value_type)
-
-    def _typecast(self, value: Any, priority: int) -> Any:
-        return self.value_type(value)
+    def resolve(self, deferred: Deferred) -> Any:
+        try:
+            return deferred.resolve()
+        except Exception as e:
+            raise ValidateException(self.name, deferred.raw) from e
+
+
+#: the fields shared by instances and subclasses of config class
+_interned_fields: "WeakKeyDictionary[type, Dict[Tuple[str, Any, type], Field]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _declaring_class(cls: type, name: str) -> type:
+    for klass in cls.__mro__:
+        if name in vars(klass) or name in vars(klass).get("__annotations__", {}):
+            return klass
+    return cls
+
+
+def interned_field(cls: type, name: str, annotation: Any, default_value: Any) -> Field:
+    """Return the field shared by the instances of ``cls`` and its subclasses,
+    cached by ``(name, annotation, type(default_value))`` in the class declaring
+    the key. The field of default value with its own ``__type_check__`` or
+    ``__typecast__`` (eg. nested config) is never shared.
+    """
+    if getattr(default_value, "__type_check__", None) or getattr(
+        default_value, "__typecast__", None
+    ):
+        return Field(name=name, annotation=annotation, default_value=default_value)
+    key = (name, annotation, type(default_value))
+    try:
+        for klass in cls.__mro__:
+            fields = _interned_fields.get(klass)
+            if fields is not None and key in fields:
+                return fields[key]
+    except TypeError:  # unhashable annotation
+        return Field(name=name, annotation=annotation, default_value=default_value)
+    owner = _declaring_class(cls, name)
+    fields = _interned_fields.setdefault(owner, {})
+    return fields.setdefault(
+        key, Field(name=name, annotation=annotation, default_value=default_value)
+    )
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Iterator, List, Tuple, Type
+
+__all__ = ["FrozenConfig", "frozen_class"]
+
+_frozen_classes: Dict[Tuple[str, ...], Type["FrozenConfig"]] = {}
+
+
+def frozen_class(keys: Tuple[str, ...]) -> Type["FrozenConfig"]:
+    """Return the slots-backed class with one attribute per key, cached by keys."""
+    cls = _frozen_classes.get(keys)
+    if cls is None:
+        cls = _frozen_classes.setdefault(
+            keys, type("FrozenConfig", (FrozenConfig,), {"__slots__": keys})
+        )
+    return cls
+
+
+def _rebuild(keys: Tuple[str, ...], values: Tuple[Any, ...]) -> "FrozenConfig":
+    return frozen_class(keys)(values)
+
+
+class FrozenConfig:
+    """Immutable, hashable and picklable snapshot of config."""
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __init__(self, values: Tuple[Any, ...]):
+        for key, value in zip(self.__slots__, values):
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, key: str) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenConfig):
+            return NotImplemented
+        return self.__slots__ == other.__slots__ and self.values() == other.values()
+
+    def __hash__(self) -> int:
+        return hash((self.__slots__, self.values()))
+
+    def __reduce__(self):
+        return _rebuild, (self.__slots__, self.values())
+
+    def __repr__(self) -> str:
+        return f"FrozenConfig({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+    __str__ = __repr__
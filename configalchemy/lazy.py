@@ -1,25 +1,83 @@
 import copy
-from collections import deque
+import logging
+import threading
+import weakref
+from collections import OrderedDict, deque
 from contextvars import ContextVar
-from threading import Lock
-from typing import TypeVar, Callable, Generic, Deque
-
-__all__ = ["local", "lazy", "proxy", "reset_lazy", "Pool"]
+from threading import Lock, RLock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Generic,
+    Optional,
+    TypeVar,
+)
+
+from configalchemy.utils import register_after_fork
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+__all__ = [
+    "local",
+    "scoped",
+    "SCOPE_THREAD",
+    "SCOPE_TASK",
+    "SCOPE_LOOP",
+    "SCOPE_CONTEXT",
+    "lazy",
+    "alazy",
+    "proxy",
+    "reset_lazy",
+    "Pool",
+    "set_fork_policy",
+    "set_cache_exception",
+    "FORK_KEEP",
+    "FORK_RESET",
+    "FORK_REBUILD",
+]
 
 LazyLoadType = TypeVar("LazyLoadType")
 
+logger = logging.getLogger(__name__)
+
 _sentry = object()
 
+#: one object per thread, closed when the thread ends
+SCOPE_THREAD = "thread"
+#: one object per asyncio task, closed when the task is done
+SCOPE_TASK = "task"
+#: one object per event loop, closed when the async generators of loop are shut down,
+#: eg. at the end of :func:`asyncio.run`
+SCOPE_LOOP = "loop"
+#: one object per context, shared by the copies of context, eg. the tasks created in it
+SCOPE_CONTEXT = "context"
+
+#: keep the object created in the parent process after fork
+FORK_KEEP = "keep"
+#: evaluate again on next access in the child process after fork
+FORK_RESET = "reset"
+#: evaluate again immediately in the child process after fork
+FORK_REBUILD = "rebuild"
+
 
 class BaseProxy:
     def __init__(self, obj: Callable[..., LazyLoadType], args, kwargs):
         object.__setattr__(self, "__obj__", obj)
         object.__setattr__(self, "__args__", args)
         object.__setattr__(self, "__kwargs__", kwargs)
+        object.__setattr__(self, "__fork_policy__", FORK_RESET)
 
     def __get_current_object__(self):
         raise NotImplemented
 
+    def __after_fork__(self):
+        pass
+
     def __getattr__(self, item):
         return getattr(self.__get_current_object__(), item)
 
@@ -116,6 +174,13 @@ class LocalLazyObject(BaseProxy):
     def __init__(self, obj: Callable[..., LazyLoadType], args, kwargs):
         super().__init__(obj, args, kwargs)
         object.__setattr__(self, "__context_var__", ContextVar("LocalLazyObject"))
+        register_after_fork(self)
+
+    def __after_fork__(self):
+        if self.__fork_policy__ != FORK_KEEP:
+            object.__setattr__(self, "__context_var__", ContextVar("LocalLazyObject"))
+        if self.__fork_policy__ == FORK_REBUILD:
+            self.__get_current_object__()
 
     def __get_current_object__(self):
         # evaluated once on thread access
@@ -127,11 +192,176 @@ class LocalLazyObject(BaseProxy):
         return o
 
 
+class _ScopeToken:
+    """The identity of thread or context, alive as long as the thread or context."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _ScopeEntry:
+    __slots__ = ("token", "value", "watcher", "__weakref__")
+
+    def __init__(self, token: Any, value: Any):
+        self.token = weakref.ref(token)
+        self.value = value
+        #: the async generator closed with the event loop
+        self.watcher: Optional[AsyncIterator[None]] = None
+
+
+async def _watch_loop(callback: Callable[[], None]) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        callback()
+
+
+def _on_loop_close(callback: Callable[[], None]) -> AsyncIterator[None]:
+    """Return the async generator calling ``callback`` when the running event loop
+    shuts down its async generators, keep a reference until then.
+    """
+    watcher = _watch_loop(callback)
+    try:
+        # start the generator synchronously, it is tracked by the running loop
+        watcher.asend(None).send(None)  # type: ignore
+    except StopIteration:
+        pass
+    return watcher
+
+
+class ScopedLazyObject(BaseProxy):
+    def __init__(
+        self,
+        obj: Callable[..., LazyLoadType],
+        args,
+        kwargs,
+        scope: str,
+        max_size: Optional[int],
+        close: Optional[Callable[[LazyLoadType], Any]],
+    ):
+        super().__init__(obj, args, kwargs)
+        object.__setattr__(self, "__scope__", scope)
+        object.__setattr__(self, "__max_size__", max_size)
+        object.__setattr__(self, "__close__", close)
+        self.__init_scopes__()
+        register_after_fork(self)
+
+    def __init_scopes__(self):
+        #: id of scope token -> entry, in the order of last use if max_size is set
+        object.__setattr__(self, "__entries__", OrderedDict())
+        # reentrant for the scope ended while the same thread holds it during gc
+        object.__setattr__(self, "__lock__", RLock())
+        object.__setattr__(self, "__thread_local__", threading.local())
+        object.__setattr__(self, "__context_var__", ContextVar("ScopedLazyObject"))
+
+    def __after_fork__(self):
+        # the objects belong to the parent process, drop them without closing
+        if self.__fork_policy__ != FORK_KEEP:
+            self.__init_scopes__()
+        else:
+            object.__setattr__(self, "__lock__", RLock())
+        if self.__fork_policy__ == FORK_REBUILD:
+            self.__get_current_object__()
+
+    def __scope_token__(self) -> Any:
+        scope = self.__scope__
+        if scope == SCOPE_CONTEXT:
+            context_var = self.__context_var__
+            token = context_var.get(None)
+            if token is None:
+                token = _ScopeToken()
+                context_var.set(token)
+            return token
+        if scope != SCOPE_THREAD:
+            import asyncio
+
+            loop = asyncio._get_running_loop()
+            if loop is not None:
+                if scope == SCOPE_LOOP:
+                    return loop
+                task = asyncio.current_task(loop)
+                if task is not None:
+                    return task
+        # the current thread without running task or loop
+        thread_local = self.__thread_local__
+        token = getattr(thread_local, "token", None)
+        if token is None:
+            token = thread_local.token = _ScopeToken()
+        return token
+
+    def __get_current_object__(self):
+        token = self.__scope_token__()
+        key = id(token)
+        entries = self.__entries__
+        entry = entries.get(key)
+        if entry is not None and entry.token() is token:
+            if self.__max_size__ is not None:
+                with self.__lock__:
+                    if entries.get(key) is entry:
+                        entries.move_to_end(key)
+            return entry.value
+        return self.__create__(token, key)
+
+    def __create__(self, token: Any, key: int):
+        import asyncio
+
+        entry = _ScopeEntry(token, self.__obj__(*self.__args__, **self.__kwargs__))
+        entry_ref = weakref.ref(entry)
+
+        def scope_ended(*_):
+            self.__scope_ended__(key, entry_ref)
+
+        if isinstance(token, asyncio.Future):
+            token.add_done_callback(scope_ended)
+        elif isinstance(token, asyncio.AbstractEventLoop):
+            entry.watcher = _on_loop_close(scope_ended)
+        else:
+            weakref.finalize(token, scope_ended)
+        evicted = []
+        with self.__lock__:
+            entries = self.__entries__
+            previous = entries.pop(key, None)
+            if previous is not None:
+                evicted.append(previous)
+            entries[key] = entry
+            if self.__max_size__ is not None:
+                while len(entries) > self.__max_size__:
+                    evicted.append(entries.popitem(last=False)[1])
+        for stale in evicted:
+            self.__close_entry__(stale)
+        return entry.value
+
+    def __scope_ended__(self, key: int, entry_ref: "weakref.ref[_ScopeEntry]"):
+        entry = entry_ref()
+        with self.__lock__:
+            if entry is None or self.__entries__.get(key) is not entry:
+                return
+            del self.__entries__[key]
+        self.__close_entry__(entry)
+
+    def __close_entry__(self, entry: _ScopeEntry):
+        close = self.__close__
+        if close is None:
+            return
+        try:
+            close(entry.value)
+        except Exception as e:
+            logger.exception(f"Failed to close {entry.value!r}: {e}")
+
+
 class LazyObject(BaseProxy):
     def __init__(self, obj: Callable[..., LazyLoadType], args, kwargs):
         super().__init__(obj, args, kwargs)
         object.__setattr__(self, "__attr__", _sentry)
         object.__setattr__(self, "__lock__", Lock())
+        register_after_fork(self)
+
+    def __after_fork__(self):
+        # the lock may be held by another thread of parent process while forking
+        object.__setattr__(self, "__lock__", Lock())
+        if self.__fork_policy__ != FORK_KEEP:
+            object.__setattr__(self, "__attr__", _sentry)
+        if self.__fork_policy__ == FORK_REBUILD:
+            self.__get_current_object__()
 
     def __get_current_object__(self):
         # evaluated once on first access
@@ -148,6 +378,50 @@ class LazyObject(BaseProxy):
         return self.__attr__
 
 
+class AsyncLazyObject(BaseProxy):
+    def __init__(self, obj: Callable[..., Awaitable[LazyLoadType]], args, kwargs):
+        super().__init__(obj, args, kwargs)
+        object.__setattr__(self, "__attr__", _sentry)
+        object.__setattr__(self, "__cache_exception__", False)
+        register_after_fork(self)
+
+    def __after_fork__(self):
+        # the task is bound to the event loop of parent process,
+        # so it can only be evaluated again on next await.
+        if self.__fork_policy__ != FORK_KEEP:
+            object.__setattr__(self, "__attr__", _sentry)
+
+    def __await__(self):
+        return self.__async_get_current_object__().__await__()
+
+    async def __async_get_current_object__(self):
+        # evaluated once on first await, concurrent awaiters share the same task
+        import asyncio
+
+        task = self.__attr__
+        if task is _sentry:
+            task = asyncio.ensure_future(
+                self.__obj__(*self.__args__, **self.__kwargs__)
+            )
+            task.add_done_callback(self.__evaluated__)
+            object.__setattr__(self, "__attr__", task)
+        # shield the evaluation from the cancellation of a single awaiter
+        return await asyncio.shield(task)
+
+    def __evaluated__(self, task: "asyncio.Future[LazyLoadType]") -> None:
+        if self.__attr__ is not task or self.__cache_exception__:
+            return
+        if task.cancelled() or task.exception() is not None:
+            # evaluate again on next await
+            object.__setattr__(self, "__attr__", _sentry)
+
+    def __get_current_object__(self):
+        task = self.__attr__
+        if task is _sentry or not task.done():
+            raise RuntimeError("alazy object must be awaited before accessing")
+        return task.result()
+
+
 class ProxyObject(BaseProxy):
     def __get_current_object__(self):
         # evaluated on every access
@@ -174,6 +448,12 @@ class Pool(Generic[LazyLoadType]):
         self._kwargs = kwargs
         self._pool: Deque[LazyLoadType] = deque()
         self._current_active: ContextVar[LazyLoadType] = ContextVar("PoolCurrentActive")
+        self.__fork_policy__ = FORK_RESET
+        register_after_fork(self)
+
+    def __after_fork__(self):
+        if self.__fork_policy__ != FORK_KEEP:
+            self._pool.clear()
 
     def _new(self) -> LazyLoadType:
         return PoolObject(self._obj, self._args, self._kwargs)  # type: ignore
@@ -194,14 +474,66 @@ def lazy(obj: Callable[..., LazyLoadType], *args, **kwargs) -> LazyLoadType:
     return LazyObject(obj, args, kwargs)  # type: ignore
 
 
+def alazy(
+    obj: Callable[..., Awaitable[LazyLoadType]], *args, **kwargs
+) -> Awaitable[LazyLoadType]:
+    return AsyncLazyObject(obj, args, kwargs)  # type: ignore
+
+
 def proxy(obj: Callable[..., LazyLoadType], *args, **kwargs) -> LazyLoadType:
     return ProxyObject(obj, args, kwargs)  # type: ignore
 
 
 def local(obj: Callable[..., LazyLoadType], *args, **kwargs) -> LazyLoadType:
+    """Evaluate the callable once per context, see :func:`scoped` for other scopes."""
     return LocalLazyObject(obj, args, kwargs)  # type: ignore
 
 
+def scoped(
+    scope: str,
+    max_size: Optional[int] = None,
+    close: Optional[Callable[[Any], Any]] = None,
+) -> Callable[..., Any]:
+    """Return the :func:`local` evaluating the callable once per scope:
+    :any:`SCOPE_THREAD`, :any:`SCOPE_TASK`, :any:`SCOPE_LOOP` or :any:`SCOPE_CONTEXT`.
+    The task and loop scopes fall back to the thread scope without running task or loop.
+    The arguments of the returned function are passed to the callable as they are::
+
+        client = scoped(SCOPE_LOOP, close=lambda client: client.close())(connect)
+
+    :param max_size: the max number of live objects, the least recently used object
+        is closed and evaluated again on next access in its scope.
+    :param close: called with the object when its scope ends or it is evicted.
+    """
+    if scope not in (SCOPE_THREAD, SCOPE_TASK, SCOPE_LOOP, SCOPE_CONTEXT):
+        raise ValueError(f"invalid scope: {scope}")
+    if scope == SCOPE_CONTEXT and max_size is None and close is None:
+        return local
+
+    def scoped_local(obj: Callable[..., LazyLoadType], *args, **kwargs) -> LazyLoadType:
+        return ScopedLazyObject(obj, args, kwargs, scope, max_size, close)  # type: ignore
+
+    return scoped_local
+
+
+def set_fork_policy(obj, policy: str):
+    """Set the policy of lazy object or pool in the child process after fork:
+    :any:`FORK_KEEP`, :any:`FORK_RESET` (default) or :any:`FORK_REBUILD`.
+    """
+    if policy not in (FORK_KEEP, FORK_RESET, FORK_REBUILD):
+        raise ValueError(f"invalid fork policy: {policy}")
+    object.__setattr__(obj, "__fork_policy__", policy)
+    return obj
+
+
+def set_cache_exception(obj, cache_exception: bool = True):
+    """Set whether the exception raised by the :func:`alazy` object is memoized
+    instead of evaluating again on next await.
+    """
+    object.__setattr__(obj, "__cache_exception__", cache_exception)
+    return obj
+
+
 def reset_lazy(obj):
     object.__setattr__(obj, "__attr__", _sentry)
     return obj
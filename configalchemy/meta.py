@@ -1,34 +1,67 @@
 import os
-from json import JSONEncoder
-from typing import Any, List, MutableMapping
-
+from bisect import bisect_left, insort
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+from configalchemy import utils
 from configalchemy.field import Field
-from configalchemy.utils import find_caller
+from configalchemy.types import Deferred
+from configalchemy.utils import capture_provenance, current_owner, Provenance
+
+if TYPE_CHECKING:  # pragma: no cover
+    from configalchemy.encoder import ConfigMetaJSONEncoder  # noqa: F401
 
 ConfigType = MutableMapping[str, Any]
 
 CONFIG_ALCHEMY_VERBOSITY = os.getenv("CONFIG_ALCHEMY_VERBOSITY", "")
 
+if CONFIG_ALCHEMY_VERBOSITY:
+    config_source = utils.config_source
+else:
+
+    class _NullSource:
+        def __enter__(self) -> None:
+            pass
+
+        def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+            pass
+
+    _null_source = _NullSource()
+
+    def config_source(source: str, name: str = "") -> Any:  # type: ignore
+        return _null_source
+
 
 class ConfigMetaItem:
-    __slots__ = ("priority", "value", "setter")
+    __slots__ = ("priority", "value", "setter", "owner")
+
+    setter: Optional[Provenance]
 
     if CONFIG_ALCHEMY_VERBOSITY:
 
-        def __init__(self, priority: int, value: Any):
+        def __init__(self, priority: int, value: Any, owner: Any = None):
             self.priority = priority
             self.value = value
-            try:
-                self.setter = find_caller()
-            except ValueError:
-                self.setter = None
+            self.setter = capture_provenance()
+            #: the source set the value, see :func:`configalchemy.utils.config_owner`
+            self.owner = owner
 
     else:
 
-        def __init__(self, priority: int, value: Any):
+        def __init__(self, priority: int, value: Any, owner: Any = None):
             self.priority = priority
             self.value = value
             self.setter = None
+            #: the source set the value, see :func:`configalchemy.utils.config_owner`
+            self.owner = owner
 
     def __repr__(self) -> str:
         return f"ConfigMetaItem(priority={self.priority}, value={self.value})"
@@ -36,27 +69,140 @@ class ConfigMetaItem:
     __str__ = __repr__
 
 
+_item_value = ConfigMetaItem.value  # type: ignore
+_unresolved: Any = object()
+
+
+class DeferredConfigMetaItem(ConfigMetaItem):
+    """The item resolving the :any:`Deferred` value on first read."""
+
+    __slots__ = ("deferred", "field")
+
+    def __init__(self, priority: int, value: Deferred, field: Field, owner: Any = None):
+        super().__init__(priority, _unresolved, owner)
+        self.deferred: Optional[Deferred] = value
+        self.field = field
+
+    @property  # type: ignore
+    def value(self) -> Any:  # type: ignore
+        value = _item_value.__get__(self)
+        if value is _unresolved:
+            deferred = self.deferred
+            if deferred is None:
+                # resolved by another thread in the meantime
+                return _item_value.__get__(self)
+            value = self.field.resolve(deferred)
+            _item_value.__set__(self, value)
+            self.deferred = None
+        return value
+
+    @value.setter
+    def value(self, value: Any) -> None:
+        _item_value.__set__(self, value)
+
+
 class ConfigMeta:
-    __slots__ = ("field", "items")
+    """The values of key layered by priority. The values of the same priority are kept
+    in one slot in the order of setting, and the sorted priorities are searched by
+    bisect, so setting, removing and resolving the value do not depend on the length
+    of history.
+    """
+
+    __slots__ = ("field", "_priorities", "_slots", "_top")
 
     def __init__(self, default_value: Any, field: Field, priority: int = 0):
         self.field = field
-        self.items: List[ConfigMetaItem] = [ConfigMetaItem(priority, default_value)]
+        #: the sorted priorities with values
+        self._priorities: List[int] = [priority]
+        #: priority -> the values of the priority in the order of setting
+        self._slots: Dict[int, List[ConfigMetaItem]] = {
+            priority: [ConfigMetaItem(priority, default_value, current_owner.get())]
+        }
+        #: the slot of the highest priority
+        self._top = self._slots[priority]
 
     @property
     def value(self) -> Any:
-        return self.items[-1].value
+        return self._top[-1].value
+
+    @property
+    def items(self) -> Tuple[ConfigMetaItem, ...]:
+        """The values from the lowest priority, assign to replace all the values."""
+        slots = self._slots
+        return tuple(item for priority in self._priorities for item in slots[priority])
+
+    @items.setter
+    def items(self, items: Iterable[ConfigMetaItem]) -> None:
+        self._priorities = []
+        self._slots = {}
+        for item in items:
+            self._insert(item)
+        self._update_top()
+
+    @property
+    def priorities(self) -> Tuple[int, ...]:
+        return tuple(self._priorities)
+
+    def _insert(self, item: ConfigMetaItem) -> None:
+        slot = self._slots.get(item.priority)
+        if slot is None:
+            insort(self._priorities, item.priority)
+            slot = self._slots[item.priority] = []
+        slot.append(item)
+
+    def _update_top(self) -> None:
+        self._top = self._slots[self._priorities[-1]] if self._priorities else []
 
     def set(self, priority: int, value: Any) -> None:
-        value = self.field.validate(value, priority)
-        length = len(self.items)
-        item = ConfigMetaItem(priority, value)
-        for index in range(length, 0, -1):
-            if self.items[index - 1].priority <= priority:
-                self.items.insert(index, item)
-                break
+        value = self.field.validate(value, priority, True)
+        owner = current_owner.get()
+        if type(value) is Deferred:
+            self._insert(DeferredConfigMetaItem(priority, value, self.field, owner))
         else:
-            self.items.insert(0, ConfigMetaItem(priority, value))
+            self._insert(ConfigMetaItem(priority, value, owner))
+        if priority >= self._priorities[-1]:
+            self._top = self._slots[priority]
+
+    def copy(self) -> "ConfigMeta":
+        config_meta = ConfigMeta.__new__(ConfigMeta)
+        config_meta.field = self.field
+        config_meta._priorities = list(self._priorities)
+        config_meta._slots = {
+            priority: list(slot) for priority, slot in self._slots.items()
+        }
+        config_meta._update_top()
+        return config_meta
+
+    def remove(self, priority: int, owner: Any = None) -> None:
+        """Remove the values with the priority, only the values set by ``owner``
+        if it is given.
+        """
+        if owner is not None:
+            slot = self._slots.get(priority)
+            if slot is None:
+                return
+            slot[:] = [item for item in slot if item.owner is not owner]
+            if slot:
+                return
+        if self._slots.pop(priority, None) is not None:
+            del self._priorities[bisect_left(self._priorities, priority)]
+            self._update_top()
+
+    def pop(self, priority: Optional[int] = None) -> ConfigMetaItem:
+        """Remove and return the last value set with the priority,
+        the highest priority by default.
+        """
+        if priority is None:
+            if not self._priorities:
+                raise KeyError("no value")
+            priority = self._priorities[-1]
+        slot = self._slots.get(priority)
+        if slot is None:
+            raise KeyError(priority)
+        item = slot.pop()
+        if not slot:
+            self.remove(priority)
+        return item
 
     def __repr__(self) -> str:
         return repr(self.value)
@@ -71,8 +217,10 @@ class ConfigMeta:
         pass
 
 
-class ConfigMetaJSONEncoder(JSONEncoder):
-    def default(self, o) -> Any:
-        if isinstance(o, ConfigMeta):
-            return o.value
-        return super().default(o)
+def __getattr__(name: str) -> Any:
+    # defer importing json until the encoder is used
+    if name == "ConfigMetaJSONEncoder":
+        from configalchemy.encoder import ConfigMetaJSONEncoder
+
+        return ConfigMetaJSONEncoder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from configalchemy.configalchemy import BaseConfig
+
+__all__ = ["TenantRegistry"]
+
+_ConfigT = TypeVar("_ConfigT", bound=BaseConfig)
+
+TenantLoader = Callable[
+    [str], Union[Optional[Mapping[str, Any]], Awaitable[Optional[Mapping[str, Any]]]]
+]
+
+
+class TenantRegistry(Generic[_ConfigT]):
+    """The configs of tenants derived from the shared base config loaded once,
+    only the overrides returned by ``loader`` are stored per tenant::
+
+        async def load_tenant(tenant: str) -> dict:
+            return await db.fetch_overrides(tenant)
+
+        registry = TenantRegistry(DefaultConfig(), load_tenant, max_size=1000, ttl=300)
+        config = await registry.aget("tenant_a")
+
+    :param base: the loaded base config.
+    :param loader: the function or coroutine function returning the overrides of tenant.
+    :param priority: the priority of overrides.
+    :param max_size: the max number of live tenant configs, the least recently used
+        config is evicted.
+    :param ttl: seconds to live of tenant config, ``None`` to live until evicted.
+    :param max_workers: the max number of threads loading cold tenants in :meth:`get_many`.
+    """
+
+    def __init__(
+        self,
+        base: _ConfigT,
+        loader: TenantLoader,
+        priority: int = 40,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        max_workers: int = 8,
+    ):
+        self.base = base
+        self.loader = loader
+        self.priority = priority
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_workers = max_workers
+        #: tenant -> (expire time, config)
+        self._configs: "OrderedDict[str, Tuple[float, _ConfigT]]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._async_loading: Dict[str, "asyncio.Future[_ConfigT]"] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _lookup(self, tenant: str) -> Optional[_ConfigT]:
+        item = self._configs.get(tenant)
+        if item is None:
+            return None
+        expire, config = item
+        if expire < time.monotonic():
+            del self._configs[tenant]
+            return None
+        self._configs.move_to_end(tenant)
+        return config
+
+    def _store(self, tenant: str, overrides: Optional[Mapping[str, Any]]) -> _ConfigT:
+        config = self.base.derive(overrides, priority=self.priority)
+        expire = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._configs[tenant] = (expire, config)
+            self._configs.move_to_end(tenant)
+            while len(self._configs) > self.max_size:
+                self._configs.popitem(last=False)
+        return config
+
+    def _load(self, tenant: str) -> Optional[Mapping[str, Any]]:
+        if inspect.iscoroutinefunction(self.loader):
+            loop = asyncio.new_event_loop()
+            try:
+                return loop.run_until_complete(self.loader(tenant))  # type: ignore
+            finally:
+                loop.close()
+        return self.loader(tenant)  # type: ignore
+
+    def get(self, tenant: str) -> _ConfigT:
+        """Return the config of tenant, loading it if it is cold. The concurrent calls
+        for the same cold tenant wait for one load.
+        """
+        with self._lock:
+            config = self._lookup(tenant)
+            if config is not None:
+                return config
+            future = self._loading.get(tenant)
+            owner = future is None
+            if owner:
+                future = self._loading[tenant] = Future()
+        assert future is not None
+        if not owner:
+            return future.result()
+        try:
+            config = self._store(tenant, self._load(tenant))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(config)
+            return config
+        finally:
+            with self._lock:
+                del self._loading[tenant]
+
+    def get_many(self, tenants: Iterable[str]) -> Dict[str, _ConfigT]:
+        """Return the configs of tenants, the cold tenants are loaded concurrently."""
+        tenants = list(tenants)
+        with self._lock:
+            cold = [tenant for tenant in tenants if self._lookup(tenant) is None]
+            if cold and self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="configalchemy"
+                )
+        if cold:
+            assert self._executor is not None
+            for future in [self._executor.submit(self.get, tenant) for tenant in cold]:
+                future.result()
+        return {tenant: self.get(tenant) for tenant in tenants}
+
+    async def aget(self, tenant: str) -> _ConfigT:
+        """Return the config of tenant on the running event loop, the coroutine loader
+        is awaited and the function loader is offloaded to the default executor.
+        """
+        with self._lock:
+            config = self._lookup(tenant)
+        if config is not None:
+            return config
+        future = self._async_loading.get(tenant)
+        if future is not None:
+            return await asyncio.shield(future)
+        loop = asyncio.get_event_loop()
+        future = self._async_loading[tenant] = loop.create_future()
+        try:
+            if inspect.iscoroutinefunction(self.loader):
+                overrides = await self.loader(tenant)  # type: ignore
+            else:
+                overrides = await loop.run_in_executor(None, self.loader, tenant)
+            config = self._store(tenant, overrides)
+        except BaseException as e:
+            future.set_exception(e)
+            # retrieve the exception to avoid warning if no one else is waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(config)
+            return config
+        finally:
+            del self._async_loading[tenant]
+
+    async def aget_many(self, tenants: Iterable[str]) -> Dict[str, _ConfigT]:
+        """Return the configs of tenants, the cold tenants are loaded concurrently."""
+        tenants = list(dict.fromkeys(tenants))
+        configs = await asyncio.gather(*[self.aget(tenant) for tenant in tenants])
+        return dict(zip(tenants, configs))
+
+    def invalidate(self, tenant: Optional[str] = None) -> None:
+        """Drop the config of tenant, or all tenants if ``tenant`` is ``None``."""
+        with self._lock:
+            if tenant is None:
+                self._configs.clear()
+            else:
+                self._configs.pop(tenant, None)
+
+    def __contains__(self, tenant: object) -> bool:
+        with self._lock:
+            return tenant in self._configs
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
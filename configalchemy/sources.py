@@ -0,0 +1,424 @@
+import os
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from configalchemy.meta import config_source
+from configalchemy.types import SecretStr
+from configalchemy.utils import config_owner
+
+if TYPE_CHECKING:  # pragma: no cover
+    from configalchemy.configalchemy import BaseConfig
+
+__all__ = [
+    "ConfigSource",
+    "EnvSource",
+    "FileSource",
+    "FunctionSource",
+    "DirectorySource",
+    "DELETED",
+    "SYNC",
+    "ASYNC",
+    "STREAMING",
+]
+
+#: load by :meth:`ConfigSource.load`
+SYNC = "sync"
+#: load by :meth:`ConfigSource.async_load`
+ASYNC = "async"
+#: load by :meth:`ConfigSource.load` and refresh by :meth:`ConfigSource.stream`
+STREAMING = "streaming"
+
+
+class _Deleted:
+    def __repr__(self) -> str:
+        return "DELETED"
+
+
+#: the value of key deleted in the changes of :meth:`ConfigSource.stream`
+DELETED: Any = _Deleted()
+
+
+class ConfigSource:
+    """The source of config values, register by overriding :meth:`BaseConfig.sources`::
+
+        class VaultSource(ConfigSource):
+            name = "vault"
+
+            def load(self, config):
+                return vault.read(config.VAULT_PATH)
+
+        class DefaultConfig(BaseConfig):
+            def sources(self):
+                return super().sources() + [VaultSource(priority=15, refresh_interval=60)]
+
+    :param priority: the priority of values from the source.
+    :param refresh_interval: seconds between refreshes by :meth:`BaseConfig.start_refresh`,
+        0 to disable.
+    :param cache: keep the last loaded mapping to apply only the changed keys on refresh,
+        otherwise every key is removed and applied again.
+    """
+
+    #: the kind of source in statistics and provenance
+    name = "source"
+    #: :any:`SYNC`, :any:`ASYNC` or :any:`STREAMING`
+    mode = SYNC
+
+    def __init__(
+        self,
+        priority: Optional[int] = None,
+        refresh_interval: float = 0,
+        cache: bool = True,
+        name: Optional[str] = None,
+    ):
+        self.priority = priority
+        self.refresh_interval = refresh_interval
+        self.cache = cache
+        if name is not None:
+            self.name = name
+        self._cache: Optional[Dict[str, Any]] = None
+        #: the keys applied by the source, removed before applying again
+        self._keys: Set[str] = set()
+
+    def enabled(self, config: "BaseConfig") -> bool:
+        return True
+
+    def is_async(self, config: "BaseConfig") -> bool:
+        return self.mode == ASYNC
+
+    def get_priority(self, config: "BaseConfig") -> int:
+        if self.priority is None:
+            raise ValueError(f"priority of {self!r} is required")
+        return self.priority
+
+    def describe(self, config: "BaseConfig") -> str:
+        """The name of source in provenance, eg. the file name or URL."""
+        return ""
+
+    def load(self, config: "BaseConfig") -> Optional[Mapping[str, Any]]:
+        """Return the mapping of values without touching the config,
+        ``None`` if there is nothing to apply.
+        """
+        raise NotImplementedError
+
+    def fingerprint(self, config: "BaseConfig") -> Optional[str]:
+        """Return the digest of the current content without applying it. A compiled
+        bundle is only used if the fingerprints still match. ``None`` means the values
+        compiled into the bundle are used as they are, eg. the snapshot of remote config.
+        """
+        return None
+
+    async def async_load(self, config: "BaseConfig") -> Optional[Mapping[str, Any]]:
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.load, config)
+
+    def read(self, config: "BaseConfig") -> Optional[Mapping[str, Any]]:
+        """Load in the current thread with a new event loop for :any:`ASYNC` mode."""
+        if self.is_async(config):
+            import asyncio
+
+            loop = asyncio.new_event_loop()
+            try:
+                return loop.run_until_complete(self.async_load(config))
+            finally:
+                loop.close()
+        return self.load(config)
+
+    def stream(self, config: "BaseConfig") -> Iterator[Mapping[str, Any]]:
+        """Yield the changes after the initial load for :any:`STREAMING` mode,
+        the value of deleted key is :any:`DELETED`. Yield an empty mapping as heartbeat
+        to check whether the refresh is stopped.
+        """
+        raise NotImplementedError
+
+    def apply(self, config: "BaseConfig", mapping: Optional[Mapping[str, Any]]) -> bool:
+        """Update the config from the loaded mapping, only the changed keys are applied
+        if the last mapping is cached. Return ``False`` if nothing changed.
+        """
+        if mapping is None:
+            return False
+        priority = self.get_priority(config)
+        previous = self._cache
+        if previous is None:
+            changed: Mapping[str, Any] = mapping
+            stale: Iterable[str] = self._keys
+        else:
+            changed = {
+                key: value
+                for key, value in mapping.items()
+                if key not in previous or previous[key] != value
+            }
+            removed = [key for key in previous if key not in mapping]
+            if not changed and not removed:
+                return False
+            stale = removed + [key for key in changed if key in previous]
+        for key in stale:
+            config._remove_value(key, priority, self)
+        self._keys = set(mapping)
+        if self.cache:
+            self._cache = dict(mapping)
+        with config_owner(self):
+            return self.update(config, changed, priority)
+
+    def apply_changes(self, config: "BaseConfig", changes: Mapping[str, Any]) -> bool:
+        """Update the config from the changes yielded by :meth:`stream`."""
+        priority = self.get_priority(config)
+        cache = self._cache if self._cache is not None else {}
+        updated = {}
+        for key, value in changes.items():
+            config._remove_value(key, priority, self)
+            if value is DELETED:
+                cache.pop(key, None)
+                self._keys.discard(key)
+            else:
+                cache[key] = updated[key] = value
+                self._keys.add(key)
+        if self.cache:
+            self._cache = cache
+        with config_owner(self):
+            return self.update(config, updated, priority)
+
+    def update(
+        self, config: "BaseConfig", mapping: Mapping[str, Any], priority: int
+    ) -> bool:
+        with config_source(self.name, self.describe(config)):
+            return config.from_mapping(mapping, priority=priority)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r}, priority={self.priority})"
+        )
+
+
+class EnvSource(ConfigSource):
+    """Environment variables with ``CONFIGALCHEMY_ENV_PREFIX``."""
+
+    name = "env"
+
+    def enabled(self, config: "BaseConfig") -> bool:
+        return bool(config.CONFIGALCHEMY_ENV_PREFIX)
+
+    def get_priority(self, config: "BaseConfig") -> int:
+        if self.priority is None:
+            return config.CONFIGALCHEMY_ENVIRONMENT_VALUE_PRIORITY
+        return self.priority
+
+    def load(self, config: "BaseConfig") -> Mapping[str, Any]:
+        return config._read_env()
+
+    def fingerprint(self, config: "BaseConfig") -> str:
+        return _digest(self.load(config))
+
+    async def async_load(self, config: "BaseConfig") -> Mapping[str, Any]:
+        return self.load(config)
+
+    def update(
+        self, config: "BaseConfig", mapping: Mapping[str, Any], priority: int
+    ) -> bool:
+        prefix = config.CONFIGALCHEMY_ENV_PREFIX
+        for key, value in mapping.items():
+            with config_source(self.name, f"{prefix}{key}"):
+                config._set_value(key, value, priority=priority)
+        return True
+
+
+class FileSource(ConfigSource):
+    """The file of ``CONFIGALCHEMY_CONFIG_FILE`` loaded by :meth:`BaseConfig.load_file`."""
+
+    name = "file"
+
+    def enabled(self, config: "BaseConfig") -> bool:
+        return bool(config.CONFIGALCHEMY_CONFIG_FILE)
+
+    def get_priority(self, config: "BaseConfig") -> int:
+        if self.priority is None:
+            return config.CONFIGALCHEMY_CONFIG_FILE_VALUE_PRIORITY
+        return self.priority
+
+    def describe(self, config: "BaseConfig") -> str:
+        return config._config_filename()
+
+    def load(self, config: "BaseConfig") -> Optional[Mapping[str, Any]]:
+        return config._read_file(config._config_filename())
+
+    def fingerprint(self, config: "BaseConfig") -> str:
+        import hashlib
+
+        try:
+            with open(config._config_filename(), "rb") as f:
+                return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        except OSError:
+            # the missing file is checked when loading
+            return ""
+
+
+class FunctionSource(ConfigSource):
+    """The return value of function or coroutine function, which is
+    ``configuration_function`` enabled by ``CONFIGALCHEMY_ENABLE_FUNCTION`` by default.
+    """
+
+    name = "function"
+
+    def __init__(
+        self,
+        function: Optional[
+            Callable[[], Union[Mapping[str, Any], Awaitable[Mapping[str, Any]]]]
+        ] = None,
+        priority: Optional[int] = None,
+        refresh_interval: float = 0,
+        cache: bool = True,
+        name: Optional[str] = None,
+    ):
+        super().__init__(
+            priority=priority, refresh_interval=refresh_interval, cache=cache, name=name
+        )
+        self.function = function
+
+    def _function(self, config: "BaseConfig") -> Callable:
+        if self.function is None:
+            return config.configuration_function
+        return self.function
+
+    def is_async(self, config: "BaseConfig") -> bool:
+        import inspect
+
+        return inspect.iscoroutinefunction(self._function(config))
+
+    def enabled(self, config: "BaseConfig") -> bool:
+        if self.function is None:
+            return config.CONFIGALCHEMY_ENABLE_FUNCTION
+        return True
+
+    def get_priority(self, config: "BaseConfig") -> int:
+        if self.priority is None:
+            return config.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY
+        return self.priority
+
+    def describe(self, config: "BaseConfig") -> str:
+        return self._function(config).__qualname__
+
+    def load(self, config: "BaseConfig") -> Mapping[str, Any]:
+        return self._function(config)()
+
+    async def async_load(self, config: "BaseConfig") -> Optional[Mapping[str, Any]]:
+        function = self._function(config)
+        if self.is_async(config):
+            return await function()
+        return await super().async_load(config)
+
+
+class DirectorySource(ConfigSource):
+    """One file per key in the directory, eg. the Kubernetes secret volume.
+    The file ``db-password`` is applied as ``DB_PASSWORD`` and the values are
+    typecast into :any:`SecretStr` if ``secret`` is true.
+
+    The files are cached by inode and mtime, and the directory is only scanned again
+    after the ``..data`` symlink is swapped by Kubernetes (or any file changes
+    in a plain directory).
+    """
+
+    name = "directory"
+    #: the symlink swapped atomically by Kubernetes after updating the volume
+    DATA_LINK = "..data"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        priority: Optional[int] = None,
+        refresh_interval: float = 0,
+        secret: bool = True,
+        name: Optional[str] = None,
+    ):
+        super().__init__(
+            priority=priority, refresh_interval=refresh_interval, name=name
+        )
+        self.directory = directory
+        self.secret = secret
+        self._files: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._data_target: Optional[str] = None
+        self._mapping: Optional[Dict[str, Any]] = None
+
+    def _directory(self, config: "BaseConfig") -> str:
+        if self.directory is None:
+            return config.CONFIGALCHEMY_SECRETS_DIR
+        return self.directory
+
+    def enabled(self, config: "BaseConfig") -> bool:
+        return bool(self._directory(config))
+
+    def get_priority(self, config: "BaseConfig") -> int:
+        if self.priority is None:
+            return config.CONFIGALCHEMY_SECRETS_VALUE_PRIORITY
+        return self.priority
+
+    def describe(self, config: "BaseConfig") -> str:
+        return self._directory(config)
+
+    @staticmethod
+    def config_key(filename: str) -> str:
+        return re.sub(r"\W", "_", filename).upper()
+
+    def load(self, config: "BaseConfig") -> Optional[Dict[str, Any]]:
+        directory = self._directory(config)
+        try:
+            data_target: Optional[str] = os.readlink(
+                os.path.join(directory, self.DATA_LINK)
+            )
+        except OSError:
+            data_target = None
+        if (
+            data_target is not None
+            and data_target == self._data_target
+            and self._mapping is not None
+        ):
+            return self._mapping
+        self._data_target = data_target
+
+        files: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_ino, stat.st_mtime_ns)
+                cached = self._files.get(entry.name)
+                if cached is not None and cached[0] == signature:
+                    files[entry.name] = cached
+                    continue
+                with open(entry.path) as f:
+                    files[entry.name] = (signature, f.read().rstrip("\r\n"))
+        self._files = files
+        self._mapping = {
+            self.config_key(filename): SecretStr(value) if self.secret else value
+            for filename, (_, value) in files.items()
+        }
+        return self._mapping
+
+    def fingerprint(self, config: "BaseConfig") -> str:
+        return _digest(self.load(config) or {})
+
+
+def _digest(mapping: Mapping[str, Any]) -> str:
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for key, value in sorted(mapping.items()):
+        # encode the str directly, the str() of SecretStr is masked
+        if not isinstance(value, str):
+            value = repr(value)
+        digest.update(f"{key}\0".encode() + value.encode() + b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,76 @@
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+__all__ = ["ConfigStats", "SourceStats", "add_stats_hook", "remove_stats_hook"]
+
+StatsHook = Callable[[str, Dict[str, Any]], None]
+
+#: hooks called with ``(event, data)`` for exporters eg. Prometheus or StatsD
+_stats_hooks: List[StatsHook] = []
+
+
+def add_stats_hook(hook: StatsHook) -> StatsHook:
+    """Register the hook called after every source load with ``("load", data)``
+    and after every validation failure with ``("validation_failure", data)``.
+    """
+    _stats_hooks.append(hook)
+    return hook
+
+
+def remove_stats_hook(hook: StatsHook) -> None:
+    _stats_hooks.remove(hook)
+
+
+def emit(event: str, data: Dict[str, Any]) -> None:
+    for hook in _stats_hooks:
+        hook(event, data)
+
+
+class SourceStats:
+    __slots__ = ("name", "loads", "duration", "keys", "failures", "validate_time")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.loads = 0
+        #: seconds
+        self.duration = 0.0
+        self.keys = 0
+        self.failures = 0
+        #: seconds spent in type check and typecast
+        self.validate_time = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class ConfigStats:
+    """Load timings per source and sampled read counters per key."""
+
+    def __init__(self, read_sample: int = 0):
+        self.sources: Dict[str, SourceStats] = {}
+        self.reads: Counter = Counter()
+        #: record one of every ``read_sample`` reads, 0 to disable
+        self.read_sample = read_sample
+        self._countdown = read_sample
+
+    def source(self, name: str) -> SourceStats:
+        source_stats = self.sources.get(name)
+        if source_stats is None:
+            source_stats = self.sources[name] = SourceStats(name)
+        return source_stats
+
+    def record_read(self, key: str) -> None:
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.read_sample
+            self.reads[key] += self.read_sample
+
+    def to_dict(self, hot_keys: int = 10) -> Dict[str, Any]:
+        return {
+            "sources": {
+                name: source_stats.to_dict()
+                for name, source_stats in self.sources.items()
+            },
+            "reads": dict(self.reads),
+            "hot_keys": self.reads.most_common(hot_keys),
+        }
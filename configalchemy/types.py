@@ -1,5 +1,16 @@
-import json
-from typing import Union, Type, cast, Any, TypeVar, Generic, TYPE_CHECKING, Tuple, Dict
+from functools import lru_cache
+from typing import (
+    Union,
+    Type,
+    cast,
+    Any,
+    Callable,
+    TypeVar,
+    Generic,
+    TYPE_CHECKING,
+    Tuple,
+    Dict,
+)
 from weakref import WeakValueDictionary
 
 
@@ -8,41 +19,134 @@ class OriginCached(type):
         self.__instance_map = WeakValueDictionary()
         super().__init__(*args, **kwargs)
 
-    def __call__(self, origin):
-        if origin in self.__instance_map:
-            return self.__instance_map[origin]
+    def __call__(self, origin, frozen: bool = False):
+        key = (origin, frozen)
+        if key in self.__instance_map:
+            return self.__instance_map[key]
         else:
-            obj = super().__call__(origin)
-            self.__instance_map[origin] = obj
+            obj = super().__call__(origin, frozen)
+            self.__instance_map[key] = obj
             return obj
 
 
+class Deferred:
+    """The raw value typecast on first read. Return it from ``__typecast__`` to skip
+    the expensive typecast of values never read, eg. the values of lower priorities.
+    """
+
+    __slots__ = ("raw", "typecast")
+
+    def __init__(self, raw: Any, typecast: Callable[[Any], Any]):
+        self.raw = raw
+        self.typecast = typecast
+
+    def resolve(self) -> Any:
+        return self.typecast(self.raw)
+
+    def __repr__(self) -> str:
+        return f"Deferred({self.raw!r})"
+
+
+class FrozenDict(dict):
+    """The read-only dict parsed by :any:`FrozenJson`."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable  # type: ignore
+    clear = pop = popitem = setdefault = update = _immutable  # type: ignore
+
+    def __hash__(self) -> int:  # type: ignore
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+class FrozenList(list):
+    """The read-only list parsed by :any:`FrozenJson`."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # type: ignore
+    append = extend = insert = remove = pop = clear = _immutable  # type: ignore
+    sort = reverse = _immutable  # type: ignore
+
+    def __hash__(self) -> int:  # type: ignore
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+
+def freeze_json(obj: Any) -> Any:
+    if isinstance(obj, (FrozenDict, FrozenList)):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze_json(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze_json(value) for value in obj)
+    return obj
+
+
+@lru_cache(maxsize=128)
+def _parse_frozen(raw: Union[str, bytes]) -> Any:
+    import json
+
+    return freeze_json(json.loads(raw))
+
+
 JsonSerializable = Union[int, float, bool, list, dict, str]
 ItemType = TypeVar("ItemType", bound=JsonSerializable)
 
+#: the first character of JSON string of the origin type
+_JSON_START: Dict[Any, str] = {dict: "{", list: "["}
+
 
 class JsonMeta(metaclass=OriginCached):
-    __slots__ = ("__origin__", "__weakref__")
+    """The JSON string typecast by :func:`json.loads` on first read.
+    The results of :any:`FrozenJson` are read-only and shared by the same strings.
+    """
 
-    def __init__(self, origin: Type[ItemType]):
+    __slots__ = ("__origin__", "frozen", "__weakref__")
+
+    def __init__(self, origin: Type[ItemType], frozen: bool = False):
         self.__origin__ = getattr(origin, "__origin__", origin)
+        self.frozen = frozen
 
     def __getitem__(self, t: Type[ItemType]) -> Type[ItemType]:
-        return cast(Type[ItemType], JsonMeta(origin=t))
+        return cast(Type[ItemType], JsonMeta(t, self.frozen))
 
     def __type_check__(self, instance: Any) -> bool:
         return isinstance(instance, self.__origin__)
 
     def __typecast__(self, value: Any, priority: int) -> Any:
-        return json.loads(value)
+        if not isinstance(value, str):
+            return self.parse(value)
+        start = _JSON_START.get(self.__origin__)
+        if start is not None and value.lstrip()[:1] != start:
+            raise TypeError(f"{value[:20]!r} is not JSON of {self.__origin__}")
+        return Deferred(value, self.parse)
+
+    def parse(self, raw: Union[str, bytes]) -> Any:
+        if self.frozen:
+            return _parse_frozen(raw)
+        import json
+
+        return json.loads(raw)
 
 
 Json = JsonMeta(origin=dict)
+FrozenJson = JsonMeta(origin=dict, frozen=True)
+
+
+SECRET_MASK = "**********"
 
 
 class SecretStr(str):
     def __repr__(self) -> str:
-        return "SecretStr('**********')"
+        return f"SecretStr('{SECRET_MASK}')"
 
     def __str__(self) -> str:
         return repr(self)
@@ -1,13 +1,28 @@
-import io
+import logging
 import os.path
 import sys
-import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from importlib import import_module
-from typing import Any, Optional
+from types import CodeType
+from typing import Any, Optional, Tuple, Dict, Iterator
+from weakref import WeakValueDictionary
 
 currentframe = lambda: sys._getframe(2)
 
+logger = logging.getLogger(__name__)
+
 _srcfile = os.path.normcase(__file__)
+_srcdir = os.path.dirname(_srcfile) + os.sep
+
+_current_source: ContextVar[Tuple[str, str]] = ContextVar(
+    "ConfigSource", default=("code", "")
+)
+#: the source owning the values set in the context, see :func:`config_owner`
+current_owner: ContextVar[Any] = ContextVar("ConfigOwner", default=None)
+
+_after_fork_registry: "WeakValueDictionary[int, Any]" = WeakValueDictionary()
 
 
 def import_reference(reference: str) -> Any:
@@ -26,6 +41,9 @@ def find_caller() -> Optional[str]:
             if f.f_back:
                 f = f.f_back
                 continue
+        import io
+        import traceback
+
         sio = io.StringIO()
         sio.write("Stack (most recent call last):\n")
         traceback.print_stack(f, file=sio)
@@ -35,3 +53,110 @@ def find_caller() -> Optional[str]:
         sio.close()
         break
     return stack_info
+
+
+class Provenance:
+    """Where the value comes from: the kind and name of source eg. ``("env", "TEST_NAME")``
+    and the code object and line number of the first caller outside configalchemy.
+    The stack text is only formatted on access.
+    """
+
+    __slots__ = ("source", "name", "code", "lineno")
+
+    def __init__(
+        self, source: str, name: str, code: Optional[CodeType], lineno: int
+    ) -> None:
+        self.source = source
+        self.name = name
+        self.code = code
+        self.lineno = lineno
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self.code.co_filename if self.code is not None else None
+
+    @property
+    def stack_info(self) -> Optional[str]:
+        if self.code is None:
+            return None
+        import linecache
+
+        filename = self.code.co_filename
+        line = linecache.getline(filename, self.lineno).strip()
+        return (
+            "Stack (most recent call last):\n"
+            f'  File "{filename}", line {self.lineno}, in {self.code.co_name}\n'
+            f"    {line}"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "name": self.name,
+            "filename": self.filename,
+            "lineno": self.lineno,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"Provenance(source={self.source!r}, name={self.name!r}, "
+            f"filename={self.filename!r}, lineno={self.lineno})"
+        )
+
+    __str__ = __repr__
+
+
+@contextmanager
+def config_source(source: str, name: str = "") -> Iterator[None]:
+    """Mark the values set within the context as from the source."""
+    token = _current_source.set((source, name))
+    try:
+        yield
+    finally:
+        _current_source.reset(token)
+
+
+@contextmanager
+def config_owner(owner: Any) -> Iterator[None]:
+    """Mark the values set within the context as owned by ``owner``, so that only
+    they are removed when the owner removes its values of the same priority.
+    """
+    token = current_owner.set(owner)
+    try:
+        yield
+    finally:
+        current_owner.reset(token)
+
+
+@lru_cache(maxsize=256)
+def _is_internal(filename: str) -> bool:
+    return os.path.normcase(filename).startswith(_srcdir)
+
+
+def capture_provenance() -> Provenance:
+    f: Any = currentframe()
+    while f is not None:
+        co = f.f_code
+        if not _is_internal(co.co_filename):
+            return Provenance(*_current_source.get(), co, f.f_lineno)
+        f = f.f_back
+    return Provenance(*_current_source.get(), None, 0)
+
+
+def register_after_fork(obj: Any) -> None:
+    """Call ``obj.__after_fork__()`` in the child process after ``os.fork``."""
+    # keyed by id to avoid hashing proxy objects
+    _after_fork_registry[id(obj)] = obj
+
+
+def _after_fork_in_child() -> None:
+    for obj in list(_after_fork_registry.values()):
+        # the failure of one hook does not leave the others with the parent's state
+        try:
+            obj.__after_fork__()
+        except Exception as e:
+            logger.exception(f"Failed to reset {type(obj).__name__} after fork: {e}")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
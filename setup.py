@@ -8,7 +8,7 @@ with open("README.rst", encoding="utf-8") as readme_file:
 with open("HISTORY.rst", encoding="utf-8") as history_file:
     history = history_file.read()
 
-requirements = ['contextvars;python_version<"3.7"']
+requirements = []
 
 setup_requirements = []
 
@@ -23,7 +23,6 @@ setup(
         "Intended Audience :: Developers",
         "Natural Language :: English",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -39,7 +38,7 @@ setup(
     test_suite="tests",
     tests_require=test_requirements,
     url="https://github.com/GuangTianLi/configalchemy",
-    python_requires=">=3.6.0",
+    python_requires=">=3.7.0",
     version="0.5.5",
     zip_safe=False,
     extras_require={"apollo": ["requests"], "tests": test_requirements},
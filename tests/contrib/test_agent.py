@@ -0,0 +1,140 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from configalchemy import BaseConfig
+from configalchemy.__main__ import main
+from configalchemy.contrib.agent import AgentBaseConfig, ConfigAgent
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class OwnerConfig(BaseConfig):
+    TEST = "owner"
+
+
+@unittest.skipIf(not hasattr(socket, "AF_UNIX"), "agent requires Unix domain socket")
+class AgentTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        path = self.path = os.path.join(self.directory.name, "config.sock")
+
+        class DBConfig(BaseConfig):
+            HOST = "localhost"
+
+        class DefaultConfig(AgentBaseConfig):
+            AGENT_SOCKET = path
+            AGENT_HEARTBEAT = 0.01
+            AGENT_RECONNECT_DELAY = 0.01
+            TEST = "default"
+            NUMBER = 0
+            DB = DBConfig()
+
+        self.config_class = DefaultConfig
+        self.owner = self.make_owner()
+        self.agent = ConfigAgent(self.owner, path, check_interval=0.01)
+
+    def tearDown(self) -> None:
+        self.agent.close()
+        self.directory.cleanup()
+
+    def make_owner(self):
+        class DBConfig(BaseConfig):
+            HOST = "db"
+
+        class DefaultConfig(BaseConfig):
+            TEST = "agent"
+            NUMBER = "1"
+            DB = DBConfig()
+
+        return DefaultConfig()
+
+    def test_agent(self):
+        self.agent.start()
+        config = self.config_class()
+        self.assertEqual("agent", config.TEST)
+        self.assertEqual(1, config.NUMBER)
+        self.assertEqual("db", config.DB.HOST)
+        self.assertEqual(1, config.stats()["sources"]["agent"]["loads"])
+
+        config.start_refresh()
+        self.owner.from_mapping({"TEST": "changed", "EXTRA": "extra"}, priority=30)
+        self.assertTrue(wait_until(lambda: config.get("EXTRA") == "extra"))
+        self.assertEqual("changed", config.TEST)
+        # the values set directly are checked every check_interval
+        self.owner["DB.HOST"] = "new"
+        self.assertTrue(wait_until(lambda: config.DB.HOST == "new"))
+        del self.owner["EXTRA"]
+        self.assertTrue(wait_until(lambda: "EXTRA" not in config))
+        self.assertGreaterEqual(self.agent.version, 4)
+
+        # resync after the agent is restarted
+        self.agent.close()
+        self.assertFalse(os.path.exists(self.path))
+        owner = self.make_owner()
+        self.agent = ConfigAgent(owner, self.path, check_interval=0.01)
+        self.agent.start()
+        self.assertTrue(wait_until(lambda: config.TEST == "agent"))
+        self.assertEqual("db", config.DB.HOST)
+        config.stop_refresh()
+        config.config_sources[0].close()
+
+    def test_socket_path(self):
+        # a regular file is never removed
+        with open(self.path, "w") as f:
+            f.write("data")
+        with self.assertRaises(FileExistsError):
+            self.agent.start()
+        self.assertTrue(os.path.isfile(self.path))
+        os.unlink(self.path)
+
+        # the socket left by the last agent is replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        self.agent.start()
+
+        # the socket of the running agent is kept
+        other = ConfigAgent(self.make_owner(), self.path)
+        with self.assertRaises(OSError):
+            other.start()
+        other.close()
+        self.assertTrue(os.path.exists(self.path))
+        config = self.config_class()
+        self.assertEqual("agent", config.TEST)
+        config.config_sources[0].close()
+
+    def test_fallback(self):
+        config = self.config_class()
+        self.assertEqual("default", config.TEST)
+        self.assertNotIn("agent", config.stats()["sources"])
+
+    def test_cli(self):
+        started = threading.Event()
+
+        def wait(agent, timeout=None):
+            started.set()
+            return True
+
+        with patch.object(ConfigAgent, "wait", wait):
+            self.assertEqual(
+                0,
+                main(["agent", f"{__name__}:OwnerConfig", "-s", self.path]),
+            )
+        self.assertTrue(started.is_set())
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
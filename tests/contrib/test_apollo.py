@@ -1,11 +1,103 @@
+import json
+import os
 import threading
 import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, urlsplit
 
 import requests
 
-from configalchemy.contrib.apollo import ApolloBaseConfig, ConfigException, logger
+from configalchemy.contrib import apollo
+from configalchemy.contrib.apollo import (
+    ApolloBaseConfig,
+    ApolloPoller,
+    ConfigException,
+    logger,
+)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class ApolloServer:
+    """The Apollo server holding the notification for ``hold`` seconds."""
+
+    def __init__(self, hold: float = 0.05):
+        #: (app, namespace) -> (notification id, configurations)
+        self.namespaces = {}
+        #: (app, cluster, namespaces) of notification requests
+        self.polls = []
+        self.fetches = []
+        self.condition = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path.startswith("/notifications/v2"):
+                    query = parse_qs(parts.query)
+                    status, data = server.poll(
+                        query["appId"][0],
+                        query["cluster"][0],
+                        json.loads(query["notifications"][0]),
+                    )
+                else:
+                    _, _, app, cluster, namespace = parts.path.split("/")
+                    server.fetches.append((app, namespace))
+                    _, configurations = server.namespaces[(app, namespace)]
+                    status = 200
+                    data = {
+                        "namespaceName": namespace,
+                        "configurations": configurations,
+                    }
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.end_headers()
+                if status == 200:
+                    self.wfile.write(body)
+
+        self.hold = hold
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, app, namespace, configurations):
+        with self.condition:
+            notification_id = self.namespaces.get((app, namespace), (0, {}))[0] + 1
+            self.namespaces[(app, namespace)] = (notification_id, configurations)
+            self.condition.notify_all()
+
+    def poll(self, app, cluster, notifications):
+        self.polls.append(
+            (app, cluster, sorted(item["namespaceName"] for item in notifications))
+        )
+        with self.condition:
+            for _ in range(2):
+                changed = [
+                    {"namespaceName": item["namespaceName"], "notificationId": current}
+                    for item in notifications
+                    for current in [self.namespaces[(app, item["namespaceName"])][0]]
+                    if current != item["notificationId"]
+                ]
+                if changed:
+                    return 200, changed
+                self.condition.wait(self.hold)
+        return 304, None
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
 
 
 class ApolloConfigTestCase(unittest.TestCase):
@@ -118,6 +210,174 @@ class ApolloConfigTestCase(unittest.TestCase):
         config = DefaultConfig()
         config.start_long_poll()
         thread_mock.assert_called_with(target=config.long_poll)
+        self.assertIs(thread_mock.return_value, config.apollo_long_poll_thread)
+
+        thread_mock.reset_mock()
+        config.__after_fork__()
+        thread_mock.assert_called_with(target=config.long_poll)
+
+        thread_mock.reset_mock()
+        config.APOLLO_LONG_POLL_AFTER_FORK = False
+        config.__after_fork__()
+        thread_mock.assert_not_called()
+        self.assertIsNone(config.apollo_long_poll_thread)
+
+
+class ApolloPollerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        server = self.server = ApolloServer()
+        server.publish("app", "application", {"TEST": "application"})
+        server.publish("app", "extra", {"EXTRA": "extra"})
+        server.publish("other", "application", {"TEST": "other"})
+
+        def make_config_class(app, extra=""):
+            class DefaultConfig(ApolloBaseConfig):
+                APOLLO_SERVER_URL = server.url
+                APOLLO_APP_ID = app
+                APOLLO_EXTRA_NAMESPACE = extra
+                APOLLO_SHARED_POLLER = True
+                TEST = "default"
+                EXTRA = ""
+
+            return DefaultConfig
+
+        self.application = make_config_class("app")()
+        self.extra = make_config_class("app", "extra")()
+        self.other = make_config_class("other")()
+        self.poller = ApolloPoller(retry_delay=0.01)
+
+    def tearDown(self) -> None:
+        self.poller.close()
+        self.server.close()
+
+    def test_poller(self):
+        threads = {
+            self.poller.register(config)
+            for config in (self.application, self.extra, self.other)
+        }
+        self.assertEqual(1, len(threads))
+        self.assertEqual("extra", self.extra.EXTRA)
+        # the notification ids are -1 after loading
+        self.assertTrue(
+            wait_until(
+                lambda: all(
+                    item["notificationId"] > 0
+                    for config in (self.application, self.extra, self.other)
+                    for item in config.apollo_notifications()
+                )
+            )
+        )
+        del self.server.fetches[:]
+
+        self.server.publish("app", "extra", {"EXTRA": "changed"})
+        self.assertTrue(wait_until(lambda: self.extra.EXTRA == "changed"))
+        self.assertEqual([("app", "extra")], self.server.fetches)
+        self.server.publish("app", "application", {"TEST": "changed"})
+        self.assertTrue(wait_until(lambda: self.application.TEST == "changed"))
+        self.assertTrue(wait_until(lambda: self.extra.TEST == "changed"))
+        self.assertEqual("other", self.other.TEST)
+        # the namespace is accessed once for the configs of group
+        self.assertEqual(
+            [("app", "extra"), ("app", "application")], self.server.fetches
+        )
+
+        # one request per (server, app, cluster) with the merged namespaces
+        self.assertIn(("app", "default", ["application", "extra"]), self.server.polls)
+        self.assertIn(("other", "default", ["application"]), self.server.polls)
+
+        self.poller.unregister(self.extra)
+        self.server.publish("app", "extra", {"EXTRA": "ignored"})
+        self.server.publish("app", "application", {"TEST": "again"})
+        self.assertTrue(wait_until(lambda: self.application.TEST == "again"))
+        self.assertEqual("changed", self.extra.EXTRA)
+
+    def test_dispatch_off_loop(self):
+        threads = []
+        access = ApolloBaseConfig._access_config_by_namespace
+
+        def record(config, namespace):
+            threads.append(threading.current_thread())
+            return access(config, namespace)
+
+        thread = self.poller.register(self.application)
+        self.assertTrue(
+            wait_until(
+                lambda: self.application.apollo_notifications()[0]["notificationId"] > 0
+            )
+        )
+        with patch.object(
+            ApolloBaseConfig, "_access_config_by_namespace", autospec=True
+        ) as access_mock:
+            access_mock.side_effect = record
+            self.server.publish("app", "application", {"TEST": "changed"})
+            self.assertTrue(wait_until(lambda: self.application.TEST == "changed"))
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(thread, threads[0])
+
+    def test_poll_by_requests(self):
+        get = requests.get
+        polls = []
+
+        def timeout_once(url, **kwargs):
+            if url.endswith("/notifications/v2/"):
+                polls.append(kwargs)
+                if len(polls) == 1:
+                    raise requests.Timeout("timed out")
+            return get(url, **kwargs)
+
+        with patch("requests.get", side_effect=timeout_once), patch.object(
+            logger, "debug"
+        ) as debug:
+            self.poller.register(self.application)
+            self.assertTrue(
+                wait_until(
+                    lambda: self.application.apollo_notifications()[0]["notificationId"]
+                    > 0
+                )
+            )
+        debug.assert_any_call(
+            f"Apollo long poll of {ApolloPoller.key(self.application)} timed out"
+        )
+        self.assertEqual(self.application.APOLLO_LONG_POLL_TIMEOUT, polls[0]["timeout"])
+
+    @unittest.skipIf(not hasattr(os, "register_at_fork"), "fork is not supported")
+    def test_register_after_fork(self):
+        self.poller.register(self.application)
+        self.assertTrue(
+            wait_until(
+                lambda: self.application.apollo_notifications()[0]["notificationId"] > 0
+            )
+        )
+        held, release = threading.Event(), threading.Event()
+
+        def hold():
+            with self.poller._lock, apollo._shared_poller_lock:
+                held.set()
+                release.wait(1)
+
+        # the locks held by other threads at fork time are not held in the child
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait(1)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            os.close(read_fd)
+            try:
+                thread = self.poller.register(self.other)
+                apollo.shared_poller()
+                result = thread.is_alive() and list(self.poller._groups) == [
+                    ApolloPoller.key(self.other)
+                ]
+                os.write(write_fd, str(result).encode())
+            finally:
+                os._exit(0)
+        release.set()
+        holder.join()
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as f:
+            self.assertEqual("True", f.read())
 
 
 if __name__ == "__main__":
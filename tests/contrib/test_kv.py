@@ -0,0 +1,105 @@
+import time
+import unittest
+
+from configalchemy import BaseConfig
+from configalchemy.contrib.kv import (
+    DELETE,
+    KVBaseConfig,
+    MemoryKVStore,
+    RevisionCompacted,
+)
+from configalchemy.sources import DELETED
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class MemoryKVStoreTestCase(unittest.TestCase):
+    def test_watch(self):
+        store = MemoryKVStore()
+        store.put("/app/test", "1")
+        store.put("/other/test", "1")
+        revision = store.delete("/app/test")
+        watch = store.watch("/app/", 1, timeout=0)
+        self.assertEqual(
+            [("/app/test", 1), ("/app/test", revision)],
+            [(event.key, event.revision) for event in next(watch)],
+        )
+        self.assertEqual([], next(watch))
+        self.assertEqual(DELETE, store._events[-1].type)
+
+        store.compact(revision)
+        with self.assertRaises(RevisionCompacted):
+            next(store.watch("/app/", revision, timeout=0))
+
+
+class KVConfigTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        store = self.store = MemoryKVStore()
+        store.commit({"/app/test": "kv", "/app/number": "1", "/app/db/host": "db"})
+
+        class DBConfig(BaseConfig):
+            HOST = "localhost"
+
+        class DefaultConfig(KVBaseConfig):
+            KV_PREFIX = "/app/"
+            KV_WATCH_TIMEOUT = 0.01
+            KV_RECONNECT_DELAY = 0.01
+            TEST = "default"
+            NUMBER = 0
+            DB = DBConfig()
+
+            def kv_store(self):
+                return store
+
+        self.DefaultConfig = DefaultConfig
+
+    def test_initial_range(self):
+        config = self.DefaultConfig()
+        self.assertEqual("kv", config.TEST)
+        self.assertEqual(1, config.NUMBER)
+        self.assertEqual("db", config.DB.HOST)
+        self.assertEqual(self.store.revision, config.config_sources[-1].revision)
+
+    def test_watch_changes(self):
+        config = self.DefaultConfig()
+        source = config.config_sources[-1]
+        config.start_refresh()
+        try:
+            self.store.commit({"/app/number": "2", "/app/test": None})
+            self.assertTrue(wait_until(lambda: config.NUMBER == 2))
+            self.assertEqual("default", config.TEST)
+            self.assertEqual(1, len(config.meta["TEST"].items))
+
+            # resume from the last revision after reconnecting
+            self.store.disconnect()
+            self.store.put("/app/test", "reconnected")
+            self.assertTrue(wait_until(lambda: config.TEST == "reconnected"))
+            self.assertEqual(self.store.revision, source.revision)
+
+            # read again after the revision is compacted
+            config.stop_refresh()
+            self.store.commit({"/app/number": "3", "/app/test": None})
+            self.store.compact(self.store.revision)
+            config.start_refresh()
+            self.assertTrue(wait_until(lambda: config.NUMBER == 3))
+            self.assertTrue(wait_until(lambda: config.TEST == "default"))
+            self.assertEqual({"NUMBER": "3", "DB.HOST": "db"}, source._cache)
+        finally:
+            config.stop_refresh()
+
+    def test_resync_changes(self):
+        config = self.DefaultConfig()
+        source = config.config_sources[-1]
+        self.store.commit({"/app/number": "3", "/app/test": None})
+        self.assertEqual({"NUMBER": "3", "TEST": DELETED}, source._resync(config))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from configalchemy import BaseConfig
+
+
+@unittest.skipIf(sys.version_info < (3, 8), "shared_memory requires python3.8+")
+class SharedMemoryConfigTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        from configalchemy.contrib.shared_memory import SharedMemoryBaseConfig
+
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(SharedMemoryBaseConfig):
+            SHARED_MEMORY_NAME = f"configalchemy_test_{os.getpid()}"
+            SHARED_MEMORY_SIZE = 4096
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            TEST = "default"
+            NUMBER = 0
+            NESTED_CONFIG = NestedConfig()
+
+            def configuration_function(self):
+                if self.SHARED_MEMORY_LEADER:
+                    return {"TEST": "leader", "NESTED_CONFIG": {"NAME": "leader"}}
+                raise AssertionError("worker can not access the sources")
+
+        class LeaderConfig(DefaultConfig):
+            SHARED_MEMORY_LEADER = True
+
+        self.leader = LeaderConfig()
+        self.DefaultConfig = DefaultConfig
+
+    def tearDown(self) -> None:
+        self.leader.close()
+
+    def test_worker_read_from_leader(self):
+        config = self.DefaultConfig()
+        self.assertEqual("leader", config.TEST)
+        self.assertEqual("leader", config.NESTED_CONFIG.NAME)
+        self.assertEqual(
+            self.leader.shared_memory_version, config.shared_memory_version
+        )
+
+        self.leader.update(NUMBER="1")
+        self.leader.TEST = "updated"
+        self.assertEqual(1, config.NUMBER)
+        self.assertEqual("updated", config.TEST)
+        self.assertEqual(
+            self.leader.shared_memory_version, config.shared_memory_version
+        )
+        self.assertEqual(
+            [0, config.SHARED_MEMORY_VALUE_PRIORITY],
+            [item.priority for item in config.meta["TEST"].items],
+        )
+        config.close()
+
+    @unittest.skipIf(not hasattr(os, "fork"), "fork is not supported")
+    def test_worker_process(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            os.close(read_fd)
+            config = self.DefaultConfig()
+            leader = self.leader.shared_memory_leader
+            os.write(write_fd, f"{config.TEST}-{leader}".encode())
+            os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as f:
+            self.assertEqual("leader-False", f.read())
+
+    def test_delete(self):
+        config = self.DefaultConfig()
+        self.leader.update(EXTRA="extra", NUMBER="1")
+        self.assertEqual("extra", config["EXTRA"])
+        self.assertEqual(1, config.NUMBER)
+        del self.leader["EXTRA"]
+        self.leader.delete("NUMBER")
+        self.assertEqual(0, config["NUMBER"])
+        self.assertNotIn("EXTRA", config)
+        config.close()
+
+    def test_concurrent_refresh(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        config = self.DefaultConfig()
+        self.leader.update(NUMBER="1")
+        with patch.object(
+            config, "from_mapping", wraps=config.from_mapping
+        ) as from_mapping:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                numbers = list(executor.map(lambda _: config.NUMBER, range(8)))
+        self.assertEqual([1] * 8, numbers)
+        # only the changed key is applied once
+        self.assertEqual(1, from_mapping.call_count)
+        self.assertEqual({"NUMBER": 1}, from_mapping.call_args[0][0])
+        self.assertEqual(2, len(config.meta["TEST"].items))
+        config.close()
+
+    def test_read_while_writing(self):
+        from configalchemy.contrib.shared_memory import (
+            HEADER,
+            SharedMemoryException,
+        )
+
+        config = self.DefaultConfig()
+        config.SHARED_MEMORY_READ_TIMEOUT = 0.01
+        segment = self.leader.shared_memory_segment
+        version, size = HEADER.unpack_from(segment.buf, 0)
+        # the leader died while writing
+        HEADER.pack_into(segment.buf, 0, version + 1, size)
+        with self.assertRaises(SharedMemoryException):
+            config.shared_memory_segment.read(timeout=0.01)
+        with self.assertLogs("configalchemy.contrib.shared_memory", "WARNING"):
+            self.assertEqual("leader", config.TEST)
+        config.close()
+
+    def test_publish_exceed_size(self):
+        from configalchemy.contrib.shared_memory import SharedMemoryException
+
+        with self.assertRaises(SharedMemoryException):
+            self.leader.TEST = "0" * 4096
+
+
+if __name__ == "__main__":
+    unittest.main()
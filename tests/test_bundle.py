@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from configalchemy import BaseConfig, CompactBaseConfig
+from configalchemy.__main__ import main
+from configalchemy.bundle import compile_bundle
+
+
+class CliConfig(BaseConfig):
+    CONFIGALCHEMY_BUNDLE = ""
+    TEST = "default"
+
+
+class BundleTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.write_file({"TEST": "file", "NESTED.NAME": "file"})
+        self.calls = 0
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write_file(self, data):
+        with open(os.path.join(self.root, "config.json"), "w") as f:
+            json.dump(data, f)
+
+    def make_config_class(self, base=BaseConfig):
+        test_case = self
+
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(base):
+            CONFIGALCHEMY_ROOT_PATH = self.root
+            CONFIGALCHEMY_CONFIG_FILE = "config.json"
+            CONFIGALCHEMY_BUNDLE = "config.bundle"
+            CONFIGALCHEMY_ENV_PREFIX = "BUNDLE_"
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            TEST = "default"
+            NUMBER = 0
+            NESTED = NestedConfig()
+
+            def configuration_function(self):
+                test_case.calls += 1
+                return {"NUMBER": 1, "FLAG": True}
+
+        return DefaultConfig
+
+    def test_load_bundle(self):
+        for base in (BaseConfig, CompactBaseConfig):
+            config_class = self.make_config_class(base)
+            self.calls = 0
+            with patch.dict(os.environ, {"BUNDLE_NUMBER": "2"}):
+                compiled = compile_bundle(
+                    config_class, os.path.join(self.root, "config.bundle")
+                )
+                config = config_class()
+            self.assertEqual(1, self.calls)
+            self.assertEqual(
+                compiled.to_dict(history=True), config.to_dict(history=True)
+            )
+            self.assertEqual(2, config.NUMBER)
+            self.assertEqual("file", config.NESTED.NAME)
+            self.assertTrue(config.FLAG)
+            self.assertIs(config.config_sources[-1], config.meta["FLAG"].items[0].owner)
+            self.assertEqual(1, config.stats()["sources"]["bundle"]["loads"])
+            # the values are still validated on write
+            config.NUMBER = "3"
+            self.assertEqual(3, config.NUMBER)
+            del config["NUMBER"]
+            self.assertEqual(2, config.NUMBER)
+
+    def test_fallback(self):
+        config_class = self.make_config_class()
+        compile_bundle(config_class, os.path.join(self.root, "config.bundle"))
+        self.assertEqual(1, self.calls)
+
+        with patch.dict(os.environ, {"BUNDLE_NUMBER": "2"}):
+            config = config_class()
+        self.assertEqual(2, self.calls)
+        self.assertEqual(2, config.NUMBER)
+
+        self.write_file({"TEST": "changed"})
+        config = config_class()
+        self.assertEqual(3, self.calls)
+        self.assertEqual("changed", config.TEST)
+        self.assertNotIn("bundle", config.stats()["sources"])
+
+        loop = asyncio.new_event_loop()
+        config = loop.run_until_complete(config_class.create())
+        loop.close()
+        self.assertEqual(4, self.calls)
+        self.assertEqual("changed", config.TEST)
+
+    def test_cli(self):
+        bundle = os.path.join(self.root, "cli.bundle")
+        with patch.object(CliConfig, "CONFIGALCHEMY_BUNDLE", bundle):
+            self.assertEqual(0, main(["compile", f"{__name__}:CliConfig"]))
+            self.assertTrue(os.path.exists(bundle))
+            with patch.object(CliConfig, "TEST", "changed"):
+                config = CliConfig()
+        self.assertEqual("default", config.TEST)
+        self.assertIn("bundle", config.stats()["sources"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+
+from configalchemy import BaseConfig, computed
+from configalchemy.compact import CompactBaseConfig, _field_table
+from configalchemy.field import ValidateException
+
+
+class CompactConfigTestCase(unittest.TestCase):
+    def make_config_classes(self):
+        def make(base):
+            class NestedConfig(BaseConfig):
+                NAME = "nested"
+
+            class DefaultConfig(base):
+                CONFIGALCHEMY_ENABLE_FUNCTION = True
+                TEST = "default"
+                NUMBER = 0
+                NESTED = NestedConfig()
+
+                @computed
+                def DOUBLE(self):
+                    return self.NUMBER * 2
+
+                def configuration_function(self):
+                    return {
+                        "NUMBER": "1",
+                        "FLAG_A": True,
+                        "FLAG_B": False,
+                        "NESTED.NAME": "function",
+                    }
+
+            return DefaultConfig
+
+        return make(BaseConfig), make(CompactBaseConfig)
+
+    def test_same_behavior(self):
+        base_class, compact_class = self.make_config_classes()
+        base, compact = base_class(), compact_class()
+        self.assertEqual(base.to_dict(history=True), compact.to_dict(history=True))
+        self.assertEqual(base.freeze(), compact.freeze())
+        self.assertEqual(1, compact.NUMBER)
+        self.assertEqual("function", compact.NESTED.NAME)
+        self.assertEqual(True, compact.FLAG_A)
+
+        for config in (base, compact):
+            config.update(TEST="updated", FLAG_A="false")
+            config.NUMBER = 2
+            del config["NUMBER"]
+            config.delete("TEST", priority=config.CONFIGALCHEMY_SETITEM_PRIORITY)
+            config._remove_value("FLAG_B", config.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY)
+        self.assertEqual(base.to_dict(history=True), compact.to_dict(history=True))
+        self.assertEqual(repr(base), repr(compact))
+        self.assertFalse(compact.FLAG_A)
+        self.assertNotIn("FLAG_B", compact)
+        self.assertEqual(
+            [0, 10], [item.priority for item in compact.meta["NUMBER"].items]
+        )
+
+    def test_compact_storage(self):
+        _, compact_class = self.make_config_classes()
+        config = compact_class()
+        # only the declared keys get descriptors
+        self.assertIn("TEST", vars(compact_class))
+        self.assertNotIn("FLAG_A", vars(compact_class))
+        # the fields are shared by type
+        self.assertIs(config.meta["FLAG_A"].field, config.meta["FLAG_B"].field)
+        self.assertIn(config.meta["FLAG_A"].field, _field_table)
+        self.assertNotIn(config._index["FLAG_B"], config._stacks)
+        self.assertIn(config._index["NUMBER"], config._stacks)
+
+        config.FLAG_B = "yes"
+        self.assertTrue(config["FLAG_B"])
+        with self.assertRaises(ValidateException) as cm:
+            config.NUMBER = "number"
+        self.assertEqual("NUMBER", cm.exception.name)
+        with self.assertRaises(AttributeError):
+            config.MISSING
+        self.assertEqual(2, config.DOUBLE)
+        config.NUMBER = 2
+        self.assertEqual(4, config.DOUBLE)
+        with config.override(FLAG_A="false"):
+            self.assertFalse(config.FLAG_A)
+            self.assertFalse(dict(config.items())["FLAG_A"])
+        self.assertTrue(config.FLAG_A)
+
+    def test_reuse_key_ids(self):
+        _, compact_class = self.make_config_classes()
+        config = compact_class()
+        size, own_fields = len(config._values), len(config._own_fields)
+        for index in range(100):
+            config[f"KEY_{index}"] = [index]
+            config.update(NUMBER=index)
+            del config[f"KEY_{index}"]
+            config.delete("NUMBER")
+        self.assertEqual(size + 1, len(config._values))
+        self.assertEqual(size + 1, len(config._priorities))
+        self.assertEqual(own_fields, len(config._own_fields))
+        self.assertEqual(1, len(config._free_ids))
+        self.assertEqual(1, config.NUMBER)
+        self.assertNotIn("KEY_0", config)
+
+        # the reused id is set up for the new key
+        config["NEW_KEY"] = "new"
+        config["NESTED.NAME"] = "changed"
+        self.assertEqual("new", config.NEW_KEY)
+        self.assertEqual("changed", config.NESTED.NAME)
+        self.assertEqual([], config._free_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
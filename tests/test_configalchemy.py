@@ -1,9 +1,19 @@
 """Tests for `configalchemy` package."""
+import io
 import json
 import os
+import pickle
 import unittest
 import asyncio
-from configalchemy import BaseConfig, ConfigType
+import threading
+import time
+from importlib.util import find_spec
+from unittest.mock import patch
+from configalchemy import BaseConfig, ConfigType, SingletonMetaClass, computed
+from configalchemy.field import ValidateException
+from configalchemy.meta import ConfigMeta
+from configalchemy.stats import add_stats_hook, remove_stats_hook
+from configalchemy.types import FrozenJson, Json, SecretStr
 
 
 class ConfigalchemyTestCase(unittest.TestCase):
@@ -55,6 +65,30 @@ class ConfigalchemyTestCase(unittest.TestCase):
         self.assertEqual("test", json.loads(config.json())["TEST"])
         self.assertEqual(str(config), str(json.loads(config.json())))
 
+    def test_delete(self):
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            TEST = "default"
+
+            def configuration_function(self) -> ConfigType:
+                return {"TEST": "function"}
+
+        config = DefaultConfig()
+        config.TEST = "first"
+        config.TEST = "second"
+        config.delete("TEST", priority=config.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY)
+        self.assertEqual("second", config.TEST)
+        self.assertEqual(
+            [0, 99, 99], [item.priority for item in config.meta["TEST"].items]
+        )
+        with self.assertRaises(KeyError):
+            config.delete("TEST", priority=config.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY)
+        del config["TEST"]
+        self.assertEqual("first", config.TEST)
+        config.delete("TEST", priority=config.CONFIGALCHEMY_SETITEM_PRIORITY)
+        config.delete("TEST")
+        self.assertNotIn("TEST", config)
+
     def test_default_config_update_from_json(self):
         class DefaultConfig(BaseConfig):
             CONFIGALCHEMY_CONFIG_FILE = self.json_file
@@ -175,6 +209,121 @@ class ConfigalchemyTestCase(unittest.TestCase):
         config.access_config_from_function(config.CONFIGALCHEMY_FUNCTION_VALUE_PRIORITY)
         self.assertEqual(4, config["FOURTH"])
 
+    def test_lazy_json(self):
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            ROUTES: FrozenJson[dict] = {}
+            HOSTS: Json[list] = []
+
+            def configuration_function(self) -> ConfigType:
+                return {"HOSTS": json.dumps(["function"])}
+
+        with patch.object(json, "loads", wraps=json.loads) as loads:
+            config = DefaultConfig()
+            config.HOSTS = json.dumps(["a", "b"])
+            config.ROUTES = json.dumps({"/": ["a"]})
+            self.assertEqual(0, loads.call_count)
+            self.assertEqual(["a", "b"], config.HOSTS)
+            self.assertEqual(["a", "b"], config.HOSTS)
+            self.assertEqual(1, loads.call_count)
+
+            other = DefaultConfig()
+            other.ROUTES = json.dumps({"/": ["a"]})
+            self.assertIs(config.ROUTES, other.ROUTES)
+            self.assertEqual(2, loads.call_count)
+
+        with self.assertRaises(TypeError):
+            config.ROUTES["/"].append("b")
+        self.assertEqual({"/": ["a"]}, json.loads(config.json())["ROUTES"])
+        self.assertEqual(config.ROUTES, pickle.loads(pickle.dumps(config.ROUTES)))
+
+        # the JSON of other type is invalid on write, the malformed JSON on read
+        with self.assertRaises(ValidateException):
+            config.HOSTS = json.dumps({"a": "b"})
+        config.HOSTS = "[malformed"
+        with self.assertRaises(ValidateException) as cm:
+            config.HOSTS
+        self.assertEqual("HOSTS", cm.exception.name)
+
+    def test_computed(self):
+        evaluated = []
+
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(BaseConfig):
+            DB_HOST = "localhost"
+            DB_PORT = 5432
+            OTHER = "other"
+            NESTED = NestedConfig()
+
+            @computed
+            def DATABASE_URL(self) -> str:
+                evaluated.append("DATABASE_URL")
+                return f"postgres://{self.DB_HOST}:{self.DB_PORT}/{self.NESTED.NAME}"
+
+            @computed
+            def ENGINE_URL(self) -> str:
+                evaluated.append("ENGINE_URL")
+                return f"{self.DATABASE_URL}?pool=1"
+
+        config = DefaultConfig()
+        self.assertNotIn("DATABASE_URL", config)
+        self.assertEqual("postgres://localhost:5432/nested?pool=1", config.ENGINE_URL)
+        self.assertEqual("postgres://localhost:5432/nested", config.DATABASE_URL)
+        self.assertEqual(["ENGINE_URL", "DATABASE_URL"], evaluated)
+
+        config.OTHER = "changed"
+        config.ENGINE_URL
+        self.assertEqual(2, len(evaluated))
+        config.update(DB_PORT="5433")
+        self.assertEqual("postgres://localhost:5433/nested?pool=1", config.ENGINE_URL)
+        self.assertEqual(4, len(evaluated))
+        config.NESTED.NAME = "db"
+        self.assertEqual("postgres://localhost:5433/db", config.DATABASE_URL)
+        del config["DB_PORT"]
+        self.assertEqual("postgres://localhost:5432/db", config.DATABASE_URL)
+
+        with config.override(DB_HOST="replica"):
+            self.assertEqual("postgres://replica:5432/db", config.DATABASE_URL)
+        self.assertEqual("postgres://localhost:5432/db", config.DATABASE_URL)
+
+        with self.assertRaises(AttributeError):
+            config.DATABASE_URL = "sqlite://"
+        with self.assertRaises(AttributeError):
+            config.update(DATABASE_URL="sqlite://")
+
+    def test_computed_read_while_writing(self):
+        class DefaultConfig(BaseConfig):
+            DB_PORT = 5432
+
+            @computed
+            def DATABASE_URL(self) -> str:
+                return f"postgres://localhost:{self.DB_PORT}"
+
+        config = DefaultConfig()
+
+        def read_while_writing(method):
+            def wrapper(*args, **kwargs):
+                # the computed value read before the write completes
+                config.DATABASE_URL
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        with patch.object(ConfigMeta, "set", read_while_writing(ConfigMeta.set)):
+            config.DB_PORT = 5433
+        self.assertEqual("postgres://localhost:5433", config.DATABASE_URL)
+        with patch.object(ConfigMeta, "pop", read_while_writing(ConfigMeta.pop)):
+            del config["DB_PORT"]
+        self.assertEqual("postgres://localhost:5432", config.DATABASE_URL)
+
+        config.from_mapping({"DB_PORT": 5434}, priority=10)
+        config.DATABASE_URL
+        with patch.object(ConfigMeta, "remove", read_while_writing(ConfigMeta.remove)):
+            config._remove_value("DB_PORT", 10)
+        self.assertEqual("postgres://localhost:5432", config.DATABASE_URL)
+
     def test_multiple_inheritance(self):
         class AConfig(BaseConfig):
             A_TEST = "TEST"
@@ -241,3 +390,352 @@ class ConfigalchemyTestCase(unittest.TestCase):
         os.environ["TEST_NESTED_CONFIG.NAME"] = "changed"
         config = DefaultConfig()
         self.assertEqual("changed", config.NESTED_CONFIG.NAME)
+
+    def test_freeze(self):
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(BaseConfig):
+            TEST = "test"
+            NUMBER = 1
+            NESTED_CONFIG = NestedConfig()
+            D = {"a": 1, "items": [1, 2]}
+
+        config = DefaultConfig()
+        frozen = config.freeze()
+        self.assertIs(frozen, config.freeze())
+        self.assertEqual("test", frozen.TEST)
+        self.assertEqual("test", frozen["TEST"])
+        self.assertEqual("nested", frozen.NESTED_CONFIG.NAME)
+        self.assertEqual(len(config), len(frozen))
+        self.assertFalse(hasattr(frozen, "__dict__"))
+        with self.assertRaises(AttributeError):
+            frozen.TEST = "changed"
+        with self.assertRaises(KeyError):
+            frozen["NOT_EXIST"]
+        with self.assertRaises(TypeError):
+            frozen.D["a"] = 2
+        with self.assertRaises(TypeError):
+            frozen.D["items"].append(3)
+        self.assertEqual({"a": 1, "items": [1, 2]}, config.D)
+        self.assertEqual(hash(frozen), hash(config.freeze()))
+
+        unpickled = pickle.loads(pickle.dumps(frozen))
+        self.assertEqual(frozen, unpickled)
+        self.assertEqual(hash(frozen), hash(unpickled))
+        self.assertIs(type(frozen), type(unpickled))
+
+        config.TEST = "changed"
+        self.assertEqual("test", frozen.TEST)
+        self.assertEqual("changed", config.freeze().TEST)
+        del config["TEST"]
+        self.assertEqual("test", config.freeze().TEST)
+        self.assertIs(type(frozen), type(config.freeze()))
+
+        # the nested config is written directly
+        config.NESTED_CONFIG["NAME"] = "changed"
+        self.assertEqual("changed", config.freeze().NESTED_CONFIG.NAME)
+        self.assertIs(config.freeze(), config.freeze())
+
+    def test_json(self):
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(BaseConfig):
+            TEST = "test"
+            PASSWORD = SecretStr("password")
+            NESTED_CONFIG = NestedConfig()
+
+        config = DefaultConfig()
+        config.TEST = "changed"
+        data = json.loads(config.json())
+        self.assertEqual("changed", data["TEST"])
+        self.assertEqual("password", data["PASSWORD"])
+        self.assertEqual("nested", data["NESTED_CONFIG"]["NAME"])
+        self.assertEqual(
+            "**********", json.loads(config.json(mask_secrets=True))["PASSWORD"]
+        )
+        history = json.loads(config.json(history=True))["TEST"]
+        self.assertEqual("changed", history["value"])
+        self.assertEqual(
+            [(0, "test"), (config.CONFIGALCHEMY_SETITEM_PRIORITY, "changed")],
+            [(item["priority"], item["value"]) for item in history["history"]],
+        )
+
+        fp = io.StringIO()
+        config.dump(fp, chunk_size=8, mask_secrets=True, indent=2)
+        self.assertEqual(config.json(mask_secrets=True, indent=2), fp.getvalue())
+
+    @unittest.skipIf(find_spec("orjson") is None, "orjson is not installed")
+    def test_json_orjson(self):
+        class DefaultConfig(BaseConfig):
+            TEST = "test"
+            PASSWORD = SecretStr("password")
+
+        config = DefaultConfig()
+        self.assertEqual(
+            json.loads(config.json(mask_secrets=True)),
+            json.loads(config.json(mask_secrets=True, backend="orjson")),
+        )
+
+    def test_stats(self):
+        events = []
+        hook = add_stats_hook(lambda event, data: events.append((event, data)))
+        self.addCleanup(remove_stats_hook, hook)
+
+        os.environ["TEST_STATS_NUMBER"] = "2"
+
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_ENV_PREFIX = "TEST_STATS_"
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            CONFIGALCHEMY_STATS_READ_SAMPLE = 2
+            NUMBER = 1
+            TEST = "test"
+
+            def configuration_function(self) -> ConfigType:
+                return {"NUMBER": "3", "TEST": "changed"}
+
+        config = DefaultConfig()
+        stats = config.stats()
+        self.assertEqual(["default", "env", "function"], list(stats["sources"].keys()))
+        self.assertEqual(1, stats["sources"]["env"]["keys"])
+        self.assertEqual(2, stats["sources"]["function"]["keys"])
+        self.assertEqual(1, stats["sources"]["function"]["loads"])
+        self.assertGreater(stats["sources"]["function"]["duration"], 0)
+        self.assertEqual(
+            ["default", "env", "function"],
+            [data["name"] for event, data in events if event == "load"],
+        )
+
+        for _ in range(10):
+            config.NUMBER
+        config.TEST
+        config.TEST
+        stats = config.stats()
+        self.assertEqual(10, stats["reads"]["NUMBER"])
+        self.assertEqual(("NUMBER", 10), stats["hot_keys"][0])
+
+        with self.assertRaises(ValidateException):
+            with config._record_source("test"):
+                config.NUMBER = "invalid"
+        self.assertEqual(1, config.stats()["sources"]["test"]["failures"])
+        self.assertEqual(
+            (
+                "validation_failure",
+                {"source": "test", "key": "NUMBER", "value": "invalid"},
+            ),
+            events[-2],
+        )
+
+    def test_stats_interleaved_sources(self):
+        class DefaultConfig(BaseConfig):
+            NUMBER = 1
+            TEST = "test"
+
+        config = DefaultConfig()
+        entered = threading.Event()
+        leave = threading.Event()
+
+        def load_in_thread():
+            with config._record_source("thread"):
+                entered.set()
+                leave.wait(1)
+
+        thread = threading.Thread(target=load_in_thread)
+        thread.start()
+        entered.wait(1)
+        with config._record_source("main"):
+            leave.set()
+            thread.join()
+            config.NUMBER = 2
+        config.TEST = "changed"
+        stats = config.stats()["sources"]
+        self.assertEqual(1, stats["main"]["keys"])
+        self.assertEqual(0, stats["thread"]["keys"])
+        self.assertIsNone(config._loading.get())
+
+    def test_stats_disabled(self):
+        class DefaultConfig(BaseConfig):
+            TEST = "test"
+
+        config = DefaultConfig()
+        config.TEST
+        self.assertEqual({}, config.stats()["reads"])
+
+    def test_async_create(self):
+        os.environ["TEST_ASYNC_ENV"] = "env"
+
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_ENV_PREFIX = "TEST_ASYNC_"
+            CONFIGALCHEMY_CONFIG_FILE = self.json_file
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            ENV = "default"
+            JSON_TEST = "default"
+            TEST = "default"
+
+            async def configuration_function(self) -> ConfigType:
+                self.loop = asyncio.get_event_loop()
+                return {"TEST": "changed"}
+
+        class SyncConfig(BaseConfig):
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            TEST = "default"
+
+            def configuration_function(self) -> ConfigType:
+                return {"TEST": "sync"}
+
+        class SingletonConfig(BaseConfig, metaclass=SingletonMetaClass):
+            TEST = "default"
+
+        async def test():
+            config = await DefaultConfig.create()
+            self.assertIs(asyncio.get_event_loop(), config.loop)
+            self.assertEqual("env", config.ENV)
+            self.assertEqual("JSON_TEST", config.JSON_TEST)
+            self.assertEqual("changed", config.TEST)
+            self.assertIn("file", config.stats()["sources"])
+
+            self.assertEqual("sync", (await SyncConfig.create()).TEST)
+
+            singleton = await SingletonConfig.create()
+            self.assertIs(singleton, SingletonConfig.instance())
+            self.assertIs(singleton, await SingletonConfig.create())
+            self.assertIs(singleton, SingletonConfig())
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(test())
+        loop.close()
+
+    def test_parallel_load(self):
+        os.environ["TEST_PARALLEL_FOURTH"] = "4"
+        os.environ["TEST_PARALLEL_ENV_ONLY"] = "env"
+
+        json_file = self.json_file
+        #: ("start" | "end", source) in the order of loading
+        events = []
+
+        def make_config_class(parallel: bool, coroutine: bool = False):
+            # config class records the keys as class attributes after initialization
+            class DefaultConfig(BaseConfig):
+                CONFIGALCHEMY_ENV_PREFIX = "TEST_PARALLEL_"
+                CONFIGALCHEMY_CONFIG_FILE = json_file
+                CONFIGALCHEMY_ENABLE_FUNCTION = True
+                CONFIGALCHEMY_PARALLEL_LOAD = parallel
+
+                FIRST = 1
+                SECOND = "1"
+                FOURTH = 1
+
+                def load_file(self, file):
+                    events.append(("start", "file"))
+                    time.sleep(0.1)
+                    data = json.load(file)
+                    data.update({"SECOND": "3", "FOURTH": "3"})
+                    events.append(("end", "file"))
+                    return data
+
+                def configuration_function(self) -> ConfigType:
+                    events.append(("start", "function"))
+                    time.sleep(0.1)
+                    events.append(("end", "function"))
+                    return {"SECOND": "2", "JSON_TEST": "function", "FOURTH": "2"}
+
+            class AsyncConfig(DefaultConfig):
+                async def configuration_function(self) -> ConfigType:
+                    events.append(("start", "function"))
+                    await asyncio.sleep(0.1)
+                    events.append(("end", "function"))
+                    return {"SECOND": "2", "JSON_TEST": "function", "FOURTH": "2"}
+
+            return AsyncConfig if coroutine else DefaultConfig
+
+        def dump(config: BaseConfig):
+            return {
+                key: [(item.priority, item.value) for item in meta.items]
+                for key, meta in config.meta.items()
+                if not key.startswith("CONFIGALCHEMY_")
+            }
+
+        def assert_overlapped():
+            # both sources started loading before either finished
+            self.assertEqual(["start", "start"], [event for event, _ in events[:2]])
+            del events[:]
+
+        sequential = make_config_class(parallel=False)()
+        self.assertEqual(["start", "end"], [event for event, _ in events[:2]])
+        del events[:]
+        parallel = make_config_class(parallel=True)()
+        assert_overlapped()
+        self.assertEqual(dump(sequential), dump(parallel))
+        self.assertEqual(4, parallel.FOURTH)
+        self.assertEqual("env", parallel.ENV_ONLY)
+        self.assertGreater(parallel.stats()["sources"]["function"]["duration"], 0.1)
+
+        self.assertEqual(
+            dump(sequential), dump(make_config_class(parallel=True, coroutine=True)())
+        )
+        del events[:]
+
+        async def test():
+            config = await make_config_class(parallel=True, coroutine=True).create()
+            assert_overlapped()
+            self.assertEqual(dump(sequential), dump(config))
+            config = await make_config_class(parallel=True).create()
+            self.assertEqual(dump(sequential), dump(config))
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(test())
+        loop.close()
+
+    def test_override(self):
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+            NUMBER = 0
+            NESTED = NestedConfig()
+
+        config = DefaultConfig()
+        frozen = config.freeze()
+        with config.override(NUMBER="1", TEST="override"):
+            self.assertEqual(1, config.NUMBER)
+            self.assertEqual("override", config["TEST"])
+            with config.overlay({"TEST": "inner", "NESTED.NAME": "overlay"}):
+                self.assertEqual("inner", config.TEST)
+                self.assertEqual(1, config.get("NUMBER"))
+                self.assertEqual("overlay", config.NESTED.NAME)
+                self.assertEqual("overlay", config.freeze().NESTED.NAME)
+                self.assertEqual("inner", config.to_dict()["TEST"])
+            self.assertEqual("override", config.TEST)
+            self.assertEqual("nested", config.NESTED.NAME)
+
+            thread_values = []
+            thread = threading.Thread(target=lambda: thread_values.append(config.TEST))
+            thread.start()
+            thread.join()
+            self.assertEqual(["default"], thread_values)
+        self.assertEqual("default", config.TEST)
+        self.assertIs(frozen, config.freeze())
+        self.assertEqual(1, len(config.meta["TEST"].items))
+
+        with self.assertRaises(ValidateException):
+            with config.override(NUMBER="number"):
+                ...
+        with self.assertRaises(KeyError):
+            with config.override(MISSING=1):
+                ...
+
+        async def tenant(name: str):
+            with config.override(TEST=name):
+                await asyncio.sleep(0)
+                return config.TEST
+
+        async def tenants():
+            return await asyncio.gather(tenant("a"), tenant("b"))
+
+        self.assertEqual(["a", "b"], asyncio.run(tenants()))
+        self.assertEqual("default", config.TEST)
+        # the fast path is taken again after the overlays are left
+        self.assertFalse(config._has_overlay)
+        self.assertFalse(config.NESTED._has_overlay)
@@ -4,7 +4,7 @@ from typing import Optional, List, Any
 from unittest.mock import Mock
 
 from configalchemy.field import Field, ValidateException
-from configalchemy.types import Json
+from configalchemy.types import Deferred, Json
 
 
 class FieldTestCase(unittest.TestCase):
@@ -44,6 +44,9 @@ class FieldTestCase(unittest.TestCase):
         )
         self.assertEqual([1], json_field.validate([1]))
         self.assertEqual([1], json_field.validate(json.dumps([1])))
+        deferred = json_field.validate(json.dumps([1]), defer=True)
+        self.assertIsInstance(deferred, Deferred)
+        self.assertEqual([1], json_field.resolve(deferred))
 
         default_value: Json[List[int]] = [1, 2]
         json_field = Field(
@@ -82,6 +85,28 @@ class FieldTestCase(unittest.TestCase):
         unittest_self.assertEqual(value, generic_field.validate("typecast"))
         typecast.assert_called_with("typecast")
 
+    def test_interned_field(self):
+        from configalchemy import BaseConfig
+
+        class NestedConfig(BaseConfig):
+            NAME = ""
+
+        class DefaultConfig(BaseConfig):
+            TEST: Optional[int] = None
+            NESTED = NestedConfig()
+
+        class SubConfig(DefaultConfig):
+            ...
+
+        sub_config = SubConfig()
+        config = DefaultConfig()
+        self.assertIs(config.meta["TEST"].field, sub_config.meta["TEST"].field)
+        self.assertIs(config.meta["TEST"].field, DefaultConfig().meta["TEST"].field)
+        self.assertIsNot(config.meta["NESTED"].field, sub_config.meta["NESTED"].field)
+        # validators are not closures bound to the field
+        self.assertIsNone(config.meta["TEST"].field.typecast)
+        self.assertEqual(1, config.meta["TEST"].field.validate("1"))
+
 
 if __name__ == "__main__":
     unittest.main()
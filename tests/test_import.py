@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+#: the cumulative microseconds ``from configalchemy import BaseConfig`` may take, override by env
+IMPORT_TIME_BUDGET = int(os.environ.get("CONFIGALCHEMY_IMPORT_TIME_BUDGET", 60000))
+
+HEAVY_MODULES = ["asyncio", "concurrent.futures", "inspect", "json", "requests"]
+
+SCRIPT = """
+import sys
+
+{imports}
+
+class DefaultConfig(BaseConfig):
+    TEST = "default"
+
+DefaultConfig()
+loaded = [name for name in {modules!r} if name in sys.modules]
+
+import json
+
+print(json.dumps(loaded))
+"""
+
+IMPORTS = [
+    "import configalchemy\nfrom configalchemy import BaseConfig",
+    "from configalchemy import BaseConfig\nfrom configalchemy.lazy import lazy, local",
+]
+
+
+class ImportTestCase(unittest.TestCase):
+    def test_lazy_attributes(self):
+        import configalchemy
+        from configalchemy.configalchemy import BaseConfig
+        from configalchemy.sources import EnvSource
+
+        self.assertIs(BaseConfig, configalchemy.BaseConfig)
+        self.assertIs(EnvSource, configalchemy.EnvSource)
+        self.assertIn("FrozenConfig", dir(configalchemy))
+        with self.assertRaises(AttributeError):
+            configalchemy.Missing
+
+    def test_heavy_modules_deferred(self):
+        for imports in IMPORTS:
+            with self.subTest(imports=imports):
+                output = subprocess.check_output(
+                    [
+                        sys.executable,
+                        "-c",
+                        SCRIPT.format(imports=imports, modules=HEAVY_MODULES),
+                    ]
+                )
+                self.assertEqual([], json.loads(output))
+
+    def test_import_time_budget(self):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                "from configalchemy import BaseConfig",
+            ],
+            stderr=subprocess.PIPE,
+            check=True,
+        ).stderr.decode()
+        # the top level modules imported after site are imported by configalchemy
+        lines = output.splitlines()
+        site = max(i for i, line in enumerate(lines) if line.endswith("| site"))
+        cumulative = sum(
+            int(line.split("|")[1])
+            for line in lines[site + 1 :]
+            if line.startswith("import time:") and line.split("|")[2][1] != " "
+        )
+        self.assertLess(cumulative, IMPORT_TIME_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
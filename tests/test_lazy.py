@@ -1,13 +1,33 @@
 import asyncio
+import contextvars
 import copy
+import os
+import threading
 import time
 import unittest
 from concurrent.futures.thread import ThreadPoolExecutor
 from functools import wraps
 from typing import Optional
-from unittest.mock import MagicMock
-
-from configalchemy.lazy import lazy, proxy, reset_lazy, local, Pool
+from unittest.mock import MagicMock, patch
+
+from configalchemy import utils
+from configalchemy.lazy import (
+    lazy,
+    alazy,
+    proxy,
+    reset_lazy,
+    local,
+    scoped,
+    Pool,
+    set_fork_policy,
+    set_cache_exception,
+    FORK_KEEP,
+    FORK_REBUILD,
+    SCOPE_CONTEXT,
+    SCOPE_LOOP,
+    SCOPE_TASK,
+    SCOPE_THREAD,
+)
 
 
 def async_test(func):
@@ -25,6 +45,21 @@ def async_test(func):
     return wrapped
 
 
+def run_in_child(func) -> str:
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.close(read_fd)
+        try:
+            os.write(write_fd, str(func()).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as f:
+        return f.read()
+
+
 class LazyTestCase(unittest.TestCase):
     def test_lazy_load(self):
         data = {}
@@ -77,6 +112,82 @@ class LazyTestCase(unittest.TestCase):
 
         self.assertEqual(4, call_mock.call_count)
 
+    def test_local_scope(self):
+        created = []
+        closed = []
+
+        def get() -> int:
+            created.append(len(created))
+            return created[-1]
+
+        def close(number: int) -> None:
+            closed.append(number)
+
+        # one object per thread, closed when the thread ends
+        number = scoped(SCOPE_THREAD, close=close)(get)
+        barrier = threading.Barrier(2)
+
+        def read_in_thread(_):
+            barrier.wait(1)
+            return number + 0
+
+        with ThreadPoolExecutor(max_workers=2) as worker:
+            list(worker.map(read_in_thread, range(8)))
+        self.assertEqual([0, 1], created)
+        self.assertEqual([0, 1], sorted(closed))
+
+        # one object per task, closed when the task is done
+        del created[:], closed[:]
+        number = scoped(SCOPE_TASK, close=close)(get)
+
+        async def read():
+            await asyncio.sleep(0)
+            return number + 0, number + 0
+
+        async def gather():
+            return await asyncio.gather(*[read() for _ in range(4)])
+
+        loop = asyncio.new_event_loop()
+        results = loop.run_until_complete(gather())
+        self.assertEqual([(0, 0), (1, 1), (2, 2), (3, 3)], sorted(results))
+        loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual([0, 1, 2, 3], sorted(closed))
+        # fall back to the thread without running task
+        self.assertEqual(4, number + 0)
+
+        # one object per loop, closed when the loop shuts down async generators
+        del created[:], closed[:]
+        number = scoped(SCOPE_LOOP, close=close)(get)
+        results = loop.run_until_complete(gather())
+        self.assertEqual([(0, 0)] * 4, results)
+        self.assertEqual([], closed)
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+        self.assertEqual([0], closed)
+
+        # the copies of context share the object, the least recently used is evicted
+        del created[:], closed[:]
+        number = scoped(SCOPE_CONTEXT, max_size=2, close=close)(get)
+        context = contextvars.copy_context()
+        self.assertEqual(0, context.run(lambda: number + 0))
+        self.assertEqual(0, context.copy().run(lambda: number + 0))
+        other, another = contextvars.Context(), contextvars.Context()
+        self.assertEqual(1, other.run(lambda: number + 0))
+        self.assertEqual([], closed)
+        self.assertEqual(2, another.run(lambda: number + 0))
+        self.assertEqual([0], closed)
+        self.assertEqual(3, context.run(lambda: number + 0))
+        # closed when the context ends
+        del other
+        self.assertEqual([0, 1], closed)
+
+        # the keyword arguments are passed to the callable as they are
+        self.assertIs(local, scoped(SCOPE_CONTEXT))
+        self.assertEqual("loop", scoped(SCOPE_THREAD)(dict, scope="loop")["scope"])
+        self.assertEqual("loop", local(dict, scope="loop")["scope"])
+        with self.assertRaises(ValueError):
+            scoped("process")
+
     def test_reset_lazy(self):
         call_mock = MagicMock()
 
@@ -215,6 +326,81 @@ class LazyTestCase(unittest.TestCase):
         aenter.assert_called_once()
         aexit.assert_called_once()
 
+    @async_test
+    async def test_alazy_load_once(self):
+        call_mock = MagicMock()
+
+        async def get() -> dict:
+            await asyncio.sleep(0.1)
+            call_mock()
+            return {"name": "client"}
+
+        client = alazy(get)
+        with self.assertRaises(RuntimeError):
+            client["name"]
+
+        async def task():
+            return await client
+
+        results = await asyncio.gather(*[task() for _ in range(4)])
+        self.assertEqual([{"name": "client"}] * 4, results)
+        self.assertEqual("client", client["name"])
+        self.assertEqual({"name": "client"}, await client)
+        self.assertEqual(1, call_mock.call_count)
+
+        reset_lazy(client)
+        await client
+        self.assertEqual(2, call_mock.call_count)
+
+    @async_test
+    async def test_alazy_exception(self):
+        call_mock = MagicMock()
+
+        async def get() -> int:
+            call_mock()
+            raise ValueError("failed")
+
+        number = alazy(get)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                await number
+        self.assertEqual(2, call_mock.call_count)
+
+        call_mock.reset_mock()
+        number = set_cache_exception(alazy(get))
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                await number
+        self.assertEqual(1, call_mock.call_count)
+
+        async def echo(**kwargs):
+            return kwargs
+
+        # the keyword arguments are passed to the coroutine function as they are
+        self.assertEqual(
+            {"cache_exception": True}, await alazy(echo, cache_exception=True)
+        )
+
+    @async_test
+    async def test_alazy_cancel_awaiter(self):
+        call_mock = MagicMock()
+
+        async def get(value: int) -> int:
+            await asyncio.sleep(0.1)
+            call_mock()
+            return value
+
+        number = alazy(get, 1)
+
+        async def wait():
+            return await number
+
+        waiter = asyncio.ensure_future(wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        self.assertEqual(1, await number)
+        self.assertEqual(1, call_mock.call_count)
+
     def test_pool(self):
         call_mock = MagicMock()
 
@@ -236,6 +422,64 @@ class LazyTestCase(unittest.TestCase):
                 pass
         self.assertEqual(4, call_mock.call_count)
 
+    @unittest.skipIf(not hasattr(os, "register_at_fork"), "fork is not supported")
+    def test_fork_policy(self):
+        reset_number = lazy(os.getpid)
+        keep_number = set_fork_policy(lazy(os.getpid), FORK_KEEP)
+        rebuild_number = set_fork_policy(lazy(os.getpid), FORK_REBUILD)
+        local_number = local(os.getpid)
+        self.assertEqual(os.getpid(), reset_number)
+        self.assertEqual(os.getpid(), keep_number)
+        self.assertEqual(os.getpid(), local_number)
+
+        def child():
+            pid = os.getpid()
+            rebuilt = object.__getattribute__(rebuild_number, "__attr__") == pid
+            return (
+                reset_number == pid,
+                keep_number == os.getppid(),
+                rebuilt,
+                local_number == pid,
+            )
+
+        self.assertEqual(str((True, True, True, True)), run_in_child(child))
+        with self.assertRaises(ValueError):
+            set_fork_policy(reset_number, "invalid")
+
+    @unittest.skipIf(not hasattr(os, "register_at_fork"), "fork is not supported")
+    def test_fork_policy_failure(self):
+        parent = os.getpid()
+
+        def get() -> int:
+            if os.getpid() != parent:
+                raise ValueError("failed")
+            return parent
+
+        failing_number = set_fork_policy(lazy(get), FORK_REBUILD)
+        reset_number = lazy(os.getpid)
+        self.assertEqual(parent, failing_number)
+        self.assertEqual(parent, reset_number)
+
+        # the patched logger is inherited by the child process
+        with patch.object(utils.logger, "exception") as exception:
+
+            def child():
+                return reset_number == os.getpid(), exception.call_count
+
+            self.assertEqual("(True, 1)", run_in_child(child))
+
+    @unittest.skipIf(not hasattr(os, "register_at_fork"), "fork is not supported")
+    def test_pool_after_fork(self):
+        pool = Pool(os.getpid)
+        with pool as pid:
+            self.assertEqual(os.getpid(), pid)
+
+        def child():
+            with pool as pid:
+                return pid == os.getpid()
+
+        self.assertEqual("True", run_in_child(child))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,7 @@ import json
 import unittest
 from unittest.mock import Mock
 
-from configalchemy.meta import ConfigMeta, ConfigMetaJSONEncoder
+from configalchemy.meta import ConfigMeta, ConfigMetaItem, ConfigMetaJSONEncoder
 
 
 class MetaTestCase(unittest.TestCase):
@@ -33,6 +33,37 @@ class MetaTestCase(unittest.TestCase):
             self.assertEqual(10, config_meta.items[3].priority)
             self.assertEqual(10, config_meta.items[3].value)
 
+    def test_priority_slots(self):
+        int_field = Mock()
+        int_field.validate = lambda value, priority, defer=False: value
+        config_meta = ConfigMeta(default_value=0, field=int_field)
+        for value in range(1, 4):
+            config_meta.set(10, value)
+        config_meta.set(5, 5)
+        self.assertEqual((0, 5, 10), config_meta.priorities)
+        self.assertEqual(3, config_meta.value)
+
+        self.assertEqual(5, config_meta.pop(5).value)
+        self.assertEqual((0, 10), config_meta.priorities)
+        self.assertEqual(3, config_meta.pop().value)
+        self.assertEqual(2, config_meta.value)
+        with self.assertRaises(KeyError):
+            config_meta.pop(5)
+
+        config_meta.remove(10)
+        self.assertEqual(0, config_meta.value)
+        config_meta.items = [ConfigMetaItem(20, 20), ConfigMetaItem(0, 1)]
+        with self.assertRaises(AttributeError):
+            config_meta.items.append(ConfigMetaItem(30, 30))
+        self.assertEqual(
+            [(0, 1), (20, 20)],
+            [(item.priority, item.value) for item in config_meta.items],
+        )
+        self.assertEqual(20, config_meta.copy().value)
+        config_meta.remove(20)
+        config_meta.remove(0)
+        self.assertEqual((), config_meta.priorities)
+
     def test_json_encode(self):
         default_value = 0
         int_field = Mock()
@@ -44,7 +75,7 @@ class MetaTestCase(unittest.TestCase):
         self.assertEqual("0", str(config_meta))
         self.assertEqual("0", repr(config_meta))
         self.assertEqual(
-            "[ConfigMetaItem(priority=0, value=0)]", str(config_meta.items)
+            "(ConfigMetaItem(priority=0, value=0),)", str(config_meta.items)
         )
 
 
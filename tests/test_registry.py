@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from configalchemy import BaseConfig
+from configalchemy.registry import TenantRegistry
+
+
+class TenantRegistryTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        class NestedConfig(BaseConfig):
+            NAME = "nested"
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+            NUMBER = 0
+            NESTED = NestedConfig()
+
+        self.base = DefaultConfig()
+        self.loads = []
+
+        def loader(tenant: str):
+            self.loads.append(tenant)
+            return {"TEST": tenant, "NESTED": {"NAME": tenant}}
+
+        self.loader = loader
+
+    def test_derive(self):
+        base = self.base
+        tenant = base.derive({"TEST": "tenant", "NESTED.NAME": "tenant"}, priority=40)
+        self.assertEqual("tenant", tenant.TEST)
+        self.assertEqual("tenant", tenant.NESTED.NAME)
+        self.assertEqual("default", base.TEST)
+        self.assertEqual("nested", base.NESTED.NAME)
+        # unchanged values are shared with base
+        self.assertIs(base.meta["NUMBER"], tenant.meta["NUMBER"])
+        self.assertIsNot(base.meta["TEST"], tenant.meta["TEST"])
+        self.assertEqual([0, 40], [item.priority for item in tenant.meta["TEST"].items])
+
+        base.NUMBER = 1
+        self.assertEqual(1, tenant.NUMBER)
+        self.assertEqual(1, tenant.freeze().NUMBER)
+        tenant.NUMBER = 2
+        del tenant["NUMBER"]
+        self.assertEqual(1, tenant.NUMBER)
+        self.assertEqual(1, base.NUMBER)
+        self.assertEqual(
+            [0, base.CONFIGALCHEMY_SETITEM_PRIORITY],
+            [item.priority for item in base.meta["NUMBER"].items],
+        )
+
+    def test_derive_after_base_removal(self):
+        base = self.base
+        base.update(EXTRA=1, OTHER="base")
+        tenant = base.derive()
+        base._remove_value("EXTRA", base.CONFIGALCHEMY_SETITEM_PRIORITY)
+        del base["OTHER"]
+        self.assertNotIn("EXTRA", base)
+        self.assertNotIn("OTHER", base)
+        # the tenant keeps the last values of keys removed from base
+        self.assertEqual(1, tenant["EXTRA"])
+        self.assertEqual("base", tenant.OTHER)
+        self.assertEqual(1, tenant.to_dict()["EXTRA"])
+        self.assertEqual("base", tenant.freeze().OTHER)
+
+        # the removal of values with others left is still visible in the tenant
+        base.TEST = "changed"
+        self.assertEqual("changed", tenant.TEST)
+        del base["TEST"]
+        self.assertEqual("default", tenant.TEST)
+
+    def test_registry(self):
+        registry = TenantRegistry(self.base, self.loader, max_size=2)
+        config = registry.get("a")
+        self.assertEqual("a", config.TEST)
+        self.assertEqual("a", config.NESTED.NAME)
+        self.assertIs(config, registry.get("a"))
+        registry.get("b")
+        registry.get("a")
+        registry.get("c")
+        self.assertNotIn("b", registry)
+        self.assertEqual(2, len(registry))
+        self.assertEqual(["a", "b", "c"], self.loads)
+
+        registry.invalidate("a")
+        self.assertNotIn("a", registry)
+        self.assertEqual("nested", self.base.NESTED.NAME)
+
+    def test_ttl(self):
+        registry = TenantRegistry(self.base, self.loader, ttl=10)
+        registry.get("a")
+        with patch.object(time, "monotonic", return_value=time.monotonic() + 11):
+            registry.get("a")
+        self.assertEqual(["a", "a"], self.loads)
+
+    def test_get_many(self):
+        event = threading.Event()
+        threads = set()
+
+        def loader(tenant: str):
+            threads.add(threading.get_ident())
+            event.wait(1)
+            self.loads.append(tenant)
+            return {"TEST": tenant}
+
+        registry = TenantRegistry(self.base, loader, max_workers=4)
+        threading.Timer(0.05, event.set).start()
+        configs = registry.get_many(["a", "b", "c", "a"])
+        registry.close()
+        self.assertEqual({"a", "b", "c"}, set(configs))
+        self.assertEqual("b", configs["b"].TEST)
+        self.assertEqual(3, len(threads))
+        self.assertEqual(["a", "b", "c"], sorted(self.loads))
+
+    def test_aget(self):
+        async def loader(tenant: str):
+            await asyncio.sleep(0.01)
+            self.loads.append(tenant)
+            return {"TEST": tenant}
+
+        registry = TenantRegistry(self.base, loader)
+
+        async def test():
+            a, b, a_again = await asyncio.gather(
+                registry.aget("a"), registry.aget("b"), registry.aget("a")
+            )
+            self.assertIs(a, a_again)
+            configs = await registry.aget_many(["a", "c"])
+            self.assertEqual("c", configs["c"].TEST)
+
+        asyncio.run(test())
+        self.assertEqual(["a", "b", "c"], sorted(self.loads))
+        self.assertEqual("b", registry.get("b").TEST)
+
+
+if __name__ == "__main__":
+    unittest.main()
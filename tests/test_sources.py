@@ -0,0 +1,314 @@
+import asyncio
+import os
+import queue
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from configalchemy import (
+    BaseConfig,
+    CompactBaseConfig,
+    ConfigSource,
+    DirectorySource,
+    FunctionSource,
+)
+from configalchemy.sources import DELETED, STREAMING
+from configalchemy.types import SecretStr
+
+
+class MemorySource(ConfigSource):
+    name = "memory"
+
+    def __init__(self, data, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+        self.loads = 0
+
+    def load(self, config):
+        self.loads += 1
+        return dict(self.data)
+
+
+class QueueSource(MemorySource):
+    name = "queue"
+    mode = STREAMING
+
+    def __init__(self, data, **kwargs):
+        super().__init__(data, **kwargs)
+        self.changes = queue.Queue()
+
+    def stream(self, config):
+        while True:
+            yield self.changes.get()
+
+
+class ConfigSourceTestCase(unittest.TestCase):
+    def test_multiple_function_sources(self):
+        async def async_flags():
+            return {"FLAG": True, "TEST": "async"}
+
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_ENABLE_FUNCTION = True
+            TEST = "default"
+            FLAG = False
+            NAME = ""
+
+            def configuration_function(self):
+                return {"TEST": "function", "NAME": "function"}
+
+            def sources(self):
+                return super().sources() + [
+                    FunctionSource(async_flags, priority=5, name="flags"),
+                    FunctionSource(lambda: {"NAME": "override"}, priority=15),
+                ]
+
+        config = DefaultConfig()
+        self.assertEqual("function", config.TEST)
+        self.assertTrue(config.FLAG)
+        self.assertEqual("override", config.NAME)
+        self.assertEqual(
+            [0, 5, 10], [item.priority for item in config.meta["TEST"].items]
+        )
+        self.assertEqual(1, config.stats()["sources"]["flags"]["loads"])
+
+        async def create():
+            return await DefaultConfig.create()
+
+        async_config = asyncio.run(create())
+        self.assertEqual(config.to_dict(), async_config.to_dict())
+
+    def test_source_priority_required(self):
+        source = MemorySource({"TEST": "memory"})
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+
+            def sources(self):
+                return [source]
+
+        with self.assertRaises(ValueError):
+            DefaultConfig()
+
+    def test_diff_apply(self):
+        source = MemorySource({"TEST": "memory", "EXTRA": 1}, priority=15)
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+            NUMBER = 0
+
+            def sources(self):
+                return [source]
+
+        config = DefaultConfig()
+        self.assertEqual("memory", config.TEST)
+        self.assertEqual(1, config.EXTRA)
+
+        source.data = {"TEST": "changed", "NUMBER": 2}
+        config.refresh_source(source)
+        self.assertEqual("changed", config.TEST)
+        self.assertEqual(2, config.NUMBER)
+        self.assertNotIn("EXTRA", config)
+        self.assertEqual(2, len(config.meta["TEST"].items))
+
+        config.TEST = "setitem"
+        source.data = {"NUMBER": 2}
+        config.refresh_source(source)
+        self.assertEqual("setitem", config.TEST)
+        self.assertEqual(
+            [0, config.CONFIGALCHEMY_SETITEM_PRIORITY],
+            [item.priority for item in config.meta["TEST"].items],
+        )
+        self.assertEqual(3, config.stats()["sources"]["memory"]["loads"])
+
+    def test_refresh_without_cache(self):
+        for base in (BaseConfig, CompactBaseConfig):
+            source = MemorySource(
+                {"TEST": "memory", "EXTRA": 1}, priority=15, cache=False
+            )
+
+            class DefaultConfig(base):
+                TEST = "default"
+
+                def sources(self):
+                    return [source]
+
+            config = DefaultConfig()
+            for _ in range(5):
+                config.refresh_source(source)
+            self.assertEqual(
+                [0, 15],
+                [
+                    item["priority"]
+                    for item in config.to_dict(history=True)["TEST"]["history"]
+                ],
+            )
+            self.assertEqual(1, config.EXTRA)
+
+            source.data = {"TEST": "changed"}
+            config.refresh_source(source)
+            self.assertEqual("changed", config.TEST)
+            self.assertNotIn("EXTRA", config)
+            with self.assertRaises(AttributeError):
+                config.EXTRA
+            self.assertIsNone(source._cache)
+
+    def test_same_priority(self):
+        for base in (BaseConfig, CompactBaseConfig):
+            source = MemorySource({"NUMBER": 1, "EXTRA": 1}, priority=10)
+
+            class DefaultConfig(base):
+                CONFIGALCHEMY_ENABLE_FUNCTION = True
+                TEST = "default"
+                NUMBER = 0
+
+                def configuration_function(self):
+                    return {"TEST": "function", "NUMBER": 2}
+
+                def sources(self):
+                    return super().sources() + [source]
+
+            config = DefaultConfig()
+            self.assertEqual(1, config.NUMBER)
+
+            source.data = {"TEST": "memory"}
+            config.refresh_source(source)
+            self.assertEqual("memory", config.TEST)
+            # the values of the function source with the same priority are kept
+            self.assertEqual(2, config.NUMBER)
+            self.assertNotIn("EXTRA", config)
+
+            source.data = {}
+            config.refresh_source(source)
+            self.assertEqual("function", config.TEST)
+            self.assertEqual(
+                [0, 10], [item.priority for item in config.meta["TEST"].items]
+            )
+
+    def test_refresh_interval(self):
+        source = MemorySource({"TEST": "memory"}, priority=15, refresh_interval=0.01)
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+
+            def sources(self):
+                return [source]
+
+        config = DefaultConfig()
+        config.start_refresh()
+        try:
+            source.data = {"TEST": "refreshed"}
+            for _ in range(100):
+                if config.TEST == "refreshed":
+                    break
+                time.sleep(0.01)
+            self.assertEqual("refreshed", config.TEST)
+        finally:
+            config.stop_refresh()
+        loads = source.loads
+        time.sleep(0.05)
+        self.assertEqual(loads, source.loads)
+
+    def test_streaming(self):
+        source = QueueSource({"TEST": "stream", "EXTRA": 1}, priority=15)
+
+        class DefaultConfig(BaseConfig):
+            TEST = "default"
+
+            def sources(self):
+                return [source]
+
+        config = DefaultConfig()
+        self.assertEqual(1, config.EXTRA)
+        config.start_refresh()
+        source.changes.put({"TEST": "changed", "EXTRA": DELETED})
+        for _ in range(100):
+            if config.TEST == "changed":
+                break
+            time.sleep(0.01)
+        config.stop_refresh(timeout=0)
+        self.assertEqual("changed", config.TEST)
+        self.assertNotIn("EXTRA", config)
+        self.assertEqual({"TEST": "changed"}, source._cache)
+
+
+class DirectorySourceTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.directory = self.tempdir.name
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def write_version(self, version: str, secrets) -> None:
+        """Write the secrets like the Kubernetes secret volume."""
+        data_dir = os.path.join(self.directory, f"..{version}")
+        os.mkdir(data_dir)
+        for filename, value in secrets.items():
+            with open(os.path.join(data_dir, filename), "w") as f:
+                f.write(value)
+            link = os.path.join(self.directory, filename)
+            if not os.path.lexists(link):
+                os.symlink(os.path.join("..data", filename), link)
+        os.symlink(data_dir, os.path.join(self.directory, "..data_tmp"))
+        os.replace(
+            os.path.join(self.directory, "..data_tmp"),
+            os.path.join(self.directory, "..data"),
+        )
+
+    def test_secrets_dir(self):
+        self.write_version("1", {"db-password": "secret\n", "port": "5432"})
+        directory = self.directory
+
+        class DefaultConfig(BaseConfig):
+            CONFIGALCHEMY_SECRETS_DIR = directory
+            DB_PASSWORD = ""
+            PORT = 0
+
+        config = DefaultConfig()
+        self.assertIsInstance(config.DB_PASSWORD, SecretStr)
+        self.assertEqual("secret", config.DB_PASSWORD)
+        self.assertEqual(5432, config.PORT)
+        self.assertEqual(
+            [0, config.CONFIGALCHEMY_SECRETS_VALUE_PRIORITY],
+            [item.priority for item in config.meta["DB_PASSWORD"].items],
+        )
+
+    def test_reload_after_swap(self):
+        self.write_version("1", {"db-password": "secret", "token": "token"})
+        source = DirectorySource(self.directory, priority=25)
+
+        class DefaultConfig(BaseConfig):
+            DB_PASSWORD = ""
+            TOKEN = ""
+
+            def sources(self):
+                return [source]
+
+        config = DefaultConfig()
+        self.assertEqual("token", config.TOKEN)
+        with patch.object(os, "scandir") as scandir:
+            self.assertFalse(config.refresh_source(source))
+            self.assertEqual(0, scandir.call_count)
+
+        self.write_version("2", {"db-password": "rotated", "token": "token"})
+        with patch.object(config, "_set_value", wraps=config._set_value) as set_value:
+            config.refresh_source(source)
+        self.assertEqual("rotated", config.DB_PASSWORD)
+        self.assertEqual(
+            ["DB_PASSWORD"], [call[0][0] for call in set_value.call_args_list]
+        )
+        self.assertEqual(2, len(config.meta["TOKEN"].items))
+
+    def test_plain_directory(self):
+        with open(os.path.join(self.directory, "token"), "w") as f:
+            f.write("token")
+        source = DirectorySource(self.directory, priority=25, secret=False)
+        self.assertEqual({"TOKEN": "token"}, source.load(BaseConfig()))
+        cached = source._files["token"]
+        source.load(BaseConfig())
+        self.assertIs(cached, source._files["token"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,12 @@
 import unittest
 
 from configalchemy import BaseConfig
-from configalchemy.utils import import_reference, find_caller
+from configalchemy.utils import (
+    import_reference,
+    find_caller,
+    capture_provenance,
+    config_source,
+)
 
 
 class UtilsTestCase(unittest.TestCase):
@@ -16,6 +21,21 @@ class UtilsTestCase(unittest.TestCase):
         stack_str = "stack_info = find_caller()"
         self.assertEqual(stack_str, stack_info[-len(stack_str) :])
 
+    def test_capture_provenance(self):
+        with config_source("env", "TEST_NAME"):
+            provenance = capture_provenance()
+        self.assertEqual("env", provenance.source)
+        self.assertEqual("TEST_NAME", provenance.name)
+        self.assertEqual(__file__, provenance.filename)
+        self.assertEqual("test_capture_provenance", provenance.code.co_name)
+        stack_str = "provenance = capture_provenance()"
+        self.assertEqual(stack_str, provenance.stack_info[-len(stack_str) :])
+        self.assertEqual(provenance.lineno, provenance.to_dict()["lineno"])
+        self.assertIn("TEST_NAME", repr(provenance))
+
+        provenance = capture_provenance()
+        self.assertEqual(("code", ""), (provenance.source, provenance.name))
+
 
 if __name__ == "__main__":
     unittest.main()